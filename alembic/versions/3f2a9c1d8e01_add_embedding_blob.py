@@ -0,0 +1,74 @@
+"""add compact binary embedding columns
+
+Revision ID: 3f2a9c1d8e01
+Revises: 
+Create Date: 2026-10-18 21:05:00.000000
+
+"""
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.embedding_codec import encode_embedding
+
+
+# revision identifiers, used by Alembic.
+revision = "3f2a9c1d8e01"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+
+def upgrade() -> None:
+    op.add_column("experiences", sa.Column("embedding_blob", sa.LargeBinary()))
+    op.add_column("experiences", sa.Column("embedding_scale", sa.Float()))
+
+    # 기존 ARRAY(Float) 임베딩을 바이너리 컬럼으로 채운다 ("array" 설정이면 float32 로)
+    storage = os.getenv("EMBEDDING_STORAGE", "float32")
+    if storage == "array":
+        storage = "float32"
+
+    experiences = sa.table(
+        "experiences",
+        sa.column("id", sa.Integer),
+        sa.column("embedding", sa.ARRAY(sa.Float)),
+        sa.column("embedding_blob", sa.LargeBinary),
+        sa.column("embedding_scale", sa.Float),
+    )
+    update = (
+        experiences.update()
+        .where(experiences.c.id == sa.bindparam("_id"))
+        .values(
+            embedding_blob=sa.bindparam("embedding_blob"),
+            embedding_scale=sa.bindparam("embedding_scale"),
+        )
+    )
+
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(experiences.c.id, experiences.c.embedding)
+            .where(experiences.c.embedding.isnot(None))
+            .where(experiences.c.id > last_id)
+            .order_by(experiences.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        params = []
+        for experience_id, embedding in rows:
+            blob, scale = encode_embedding(embedding, storage)
+            params.append(
+                {"_id": experience_id, "embedding_blob": blob, "embedding_scale": scale}
+            )
+        conn.execute(update, params)
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    op.drop_column("experiences", "embedding_scale")
+    op.drop_column("experiences", "embedding_blob")
@@ -0,0 +1,31 @@
+"""add base difficulty score for comparison re-ranking
+
+Revision ID: 5a7c3e9b1f02
+Revises: e91f3b7a2d64
+Create Date: 2026-10-18 23:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5a7c3e9b1f02"
+down_revision = "e91f3b7a2d64"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "experiences", sa.Column("base_difficulty_score", sa.Float(), nullable=True)
+    )
+    # 지금까지의 점수를 모델이 매긴 초기 점수로 간주
+    op.execute(
+        "UPDATE experiences SET base_difficulty_score = difficulty_score "
+        "WHERE base_difficulty_score IS NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("experiences", "base_difficulty_score")
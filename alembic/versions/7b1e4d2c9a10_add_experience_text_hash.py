@@ -0,0 +1,28 @@
+"""add unique experience text hash
+
+Revision ID: 7b1e4d2c9a10
+Revises: 3f2a9c1d8e01
+Create Date: 2026-10-18 21:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7b1e4d2c9a10"
+down_revision = "3f2a9c1d8e01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("experiences", sa.Column("text_hash", sa.String(length=64)))
+    op.create_index(
+        "ix_experiences_text_hash", "experiences", ["text_hash"], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_experiences_text_hash", table_name="experiences")
+    op.drop_column("experiences", "text_hash")
@@ -0,0 +1,31 @@
+"""add score_updated_at and created_at indexes for index sync
+
+Revision ID: a8d2e6f4c371
+Revises: f3a1c7e5b920
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "a8d2e6f4c371"
+down_revision = "f3a1c7e5b920"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 기존 행은 NULL: 프로세스가 시작할 때 인덱스를 전부 읽으므로 동기화 대상이 아니다
+    op.add_column("experiences", sa.Column("score_updated_at", sa.DateTime()))
+    op.create_index(
+        "ix_experiences_score_updated_at", "experiences", ["score_updated_at"]
+    )
+    op.create_index("ix_experiences_created_at", "experiences", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_experiences_created_at", table_name="experiences")
+    op.drop_index("ix_experiences_score_updated_at", table_name="experiences")
+    op.drop_column("experiences", "score_updated_at")
@@ -0,0 +1,73 @@
+"""backfill experience text hash and drop text b-tree index
+
+Revision ID: c4d8a6e2f513
+Revises: 7b1e4d2c9a10
+Create Date: 2026-10-18 22:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.text import experience_text_hash
+
+
+# revision identifiers, used by Alembic.
+revision = "c4d8a6e2f513"
+down_revision = "7b1e4d2c9a10"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    experiences = sa.table(
+        "experiences",
+        sa.column("id", sa.Integer),
+        sa.column("text", sa.String),
+        sa.column("text_hash", sa.String),
+    )
+    update = (
+        experiences.update()
+        .where(experiences.c.id == sa.bindparam("_id"))
+        .values(text_hash=sa.bindparam("text_hash"))
+    )
+
+    conn = op.get_bind()
+    seen = set(
+        conn.execute(
+            sa.select(experiences.c.text_hash).where(
+                experiences.c.text_hash.isnot(None)
+            )
+        ).scalars()
+    )
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(experiences.c.id, experiences.c.text)
+            .where(experiences.c.text_hash.is_(None))
+            .where(experiences.c.text.isnot(None))
+            .where(experiences.c.id > last_id)
+            .order_by(experiences.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        params = []
+        for experience_id, text in rows:
+            text_hash = experience_text_hash(text)
+            # 중복 텍스트는 가장 먼저 저장된 행에만 해시를 채운다 (unique 인덱스)
+            if text_hash in seen:
+                continue
+            seen.add(text_hash)
+            params.append({"_id": experience_id, "text_hash": text_hash})
+        if params:
+            conn.execute(update, params)
+        last_id = rows[-1][0]
+
+    op.execute("DROP INDEX IF EXISTS ix_experiences_text")
+
+
+def downgrade() -> None:
+    op.create_index("ix_experiences_text", "experiences", ["text"])
@@ -0,0 +1,39 @@
+"""add estimate job queue table
+
+Revision ID: e91f3b7a2d64
+Revises: c4d8a6e2f513
+Create Date: 2026-10-18 22:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e91f3b7a2d64"
+down_revision = "c4d8a6e2f513"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "estimate_jobs",
+        sa.Column("id", sa.String(length=36), primary_key=True),
+        sa.Column("text", sa.String(), nullable=False),
+        sa.Column("status", sa.String(length=16)),
+        sa.Column("result", sa.JSON()),
+        sa.Column("error", sa.String()),
+        sa.Column("attempts", sa.Integer()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("started_at", sa.DateTime()),
+        sa.Column("finished_at", sa.DateTime()),
+    )
+    op.create_index("ix_estimate_jobs_status", "estimate_jobs", ["status"])
+    op.create_index("ix_estimate_jobs_created_at", "estimate_jobs", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_estimate_jobs_created_at", table_name="estimate_jobs")
+    op.drop_index("ix_estimate_jobs_status", table_name="estimate_jobs")
+    op.drop_table("estimate_jobs")
@@ -0,0 +1,111 @@
+"""move remaining ARRAY embeddings to the binary column and clear the ARRAY copies
+
+Revision ID: f3a1c7e5b920
+Revises: 5a7c3e9b1f02
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.embedding_codec import decode_embedding, encode_embedding
+
+# revision identifiers, used by Alembic.
+revision = "f3a1c7e5b920"
+down_revision = "5a7c3e9b1f02"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+experiences = sa.table(
+    "experiences",
+    sa.column("id", sa.Integer),
+    sa.column("embedding", sa.ARRAY(sa.Float)),
+    sa.column("embedding_blob", sa.LargeBinary),
+    sa.column("embedding_scale", sa.Float),
+)
+
+
+def upgrade() -> None:
+    # EMBEDDING_STORAGE=array 면 ARRAY 만 읽는 이전 버전으로 되돌릴 수 있도록 그대로 둔다
+    storage = os.getenv("EMBEDDING_STORAGE", "float32")
+    if storage == "array":
+        return
+
+    # 3f2a9c1d8e01 이후 ARRAY 로만 저장된 행도 바이너리로 옮긴다
+    update = (
+        experiences.update()
+        .where(experiences.c.id == sa.bindparam("_id"))
+        .values(
+            embedding_blob=sa.bindparam("embedding_blob"),
+            embedding_scale=sa.bindparam("embedding_scale"),
+        )
+    )
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(experiences.c.id, experiences.c.embedding)
+            .where(experiences.c.embedding_blob.is_(None))
+            .where(experiences.c.embedding.isnot(None))
+            .where(experiences.c.id > last_id)
+            .order_by(experiences.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        params = []
+        for experience_id, embedding in rows:
+            blob, scale = encode_embedding(embedding, storage)
+            params.append(
+                {"_id": experience_id, "embedding_blob": blob, "embedding_scale": scale}
+            )
+        conn.execute(update, params)
+        last_id = rows[-1][0]
+
+    # 바이너리로 옮긴 행의 ARRAY 사본을 비워 행 크기를 줄인다
+    op.execute(
+        "UPDATE experiences SET embedding = NULL "
+        "WHERE embedding_blob IS NOT NULL AND embedding IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    # 비운 ARRAY 컬럼을 바이너리 값으로 다시 채운다 (int8 은 양자화된 값)
+    update = (
+        experiences.update()
+        .where(experiences.c.id == sa.bindparam("_id"))
+        .values(embedding=sa.bindparam("embedding"))
+    )
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(
+                experiences.c.id,
+                experiences.c.embedding_blob,
+                experiences.c.embedding_scale,
+            )
+            .where(experiences.c.embedding.is_(None))
+            .where(experiences.c.embedding_blob.isnot(None))
+            .where(experiences.c.id > last_id)
+            .order_by(experiences.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            update,
+            [
+                {
+                    "_id": experience_id,
+                    "embedding": decode_embedding(blob, scale).tolist(),
+                }
+                for experience_id, blob, scale in rows
+            ],
+        )
+        last_id = rows[-1][0]
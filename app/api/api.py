@@ -1,5 +1,6 @@
 from fastapi import APIRouter
-from app.api.endpoints import experience
+from app.api.endpoints import experience, jobs
 
 api_router = APIRouter()
 api_router.include_router(experience.router, prefix="/api", tags=["experience"])
+api_router.include_router(jobs.router, prefix="/api", tags=["jobs"])
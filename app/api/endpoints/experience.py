@@ -1,145 +1,382 @@
+import asyncio
 import logging
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+import math
+from typing import Optional, Union
+from fastapi import APIRouter, HTTPException, Depends, Header, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas import schemas
 from app.crud import crud
 from app.utils.gpt import (
     analyze_experience,
     get_embedding,
+    get_embeddings,
     compare_experience_difficulties,
     get_difficulty_scores,
+    llm_cache_bypass,
+    METRIC_COUNT,
 )
-from app.database import get_db
+from app.database import get_async_db, AsyncSessionLocal
+from app.config import settings
 from app.models import models
-from sklearn.metrics.pairwise import cosine_similarity
+from app.utils.metrics import scoring_paths, track_stage
+from app.utils.knn import (
+    PATH_DEGRADED,
+    PATH_EXISTING,
+    PATH_KNN,
+    PATH_LLM_ANALYSIS,
+    PATH_LLM_COMPARE,
+    predict_from_neighbours,
+)
+from app.utils.rank_refresher import rank_refresher
+from app.utils.rate_limit import LANE_BATCH, llm_lane
+from app.utils.resilience import CircuitOpenError
+from app.utils.singleflight import SingleFlight
+from app.utils.text import experience_text_hash
 
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+estimate_flights: SingleFlight[schemas.ExperienceResponse] = SingleFlight()
 
-def find_similar_experience(
-    new_embedding: list[float], db: Session, similarity_threshold: float = 0.95
-):
-    experiences = db.query(crud.models.Experience).all()
-    for exp in experiences:
-        similarity = cosine_similarity([new_embedding], [exp.embedding])[0][0]
-        if similarity > similarity_threshold:
-            return exp
-    return None
+# 이 값보다 유사한 경험이 있으면 LLM 에게 그 경험과 비교하도록 요청
+SIMILAR_EXPERIENCE_THRESHOLD = 0.9
 
 
-@router.post("/estimate", response_model=schemas.ExperienceResponse)
+@router.post(
+    "/estimate",
+    response_model=Union[schemas.ExperienceResponse, schemas.JobResponse],
+)
 async def estimate_difficulty(
-    experience: schemas.ExperienceCreate, db: Session = Depends(get_db)
-) -> schemas.ExperienceResponse:
+    experience: schemas.ExperienceCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    cache_control: Optional[str] = Header(None),
+    mode: Optional[str] = None,
+) -> Union[schemas.ExperienceResponse, schemas.JobResponse]:
+    # Cache-Control: no-cache 요청은 GPT 응답 캐시를 건너뛴다
+    if cache_control and "no-cache" in cache_control.lower():
+        llm_cache_bypass.set(True)
     try:
-        # 먼저 완전히 동일한 텍스트가 있는지 확인
-        existing_experience = crud.get_experience_by_text(experience.text, db)
-        if existing_experience:
-            logger.info(
-                f"Identical experience found. Using existing data for: {experience.text}"
+        # 비동기 모드에서는 작업만 등록하고 바로 job id 를 돌려준다
+        if mode == "async" or (mode is None and settings.estimate_async_mode):
+            job = await crud.create_estimate_job(experience.text, db)
+            response.status_code = 202
+            return schemas.JobResponse(job_id=job.id, status=job.status)
+
+        return await estimate_text(experience.text, db)
+
+    except CircuitOpenError as e:
+        # 임베딩 모델이 막혔거나 대체할 이웃이 없는 경우
+        logger.warning(f"Estimate rejected: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    except Exception as e:
+        logger.error(f"Error in estimate_difficulty: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def estimate_text(text: str, db: AsyncSession) -> schemas.ExperienceResponse:
+    # 먼저 완전히 동일한 텍스트가 있는지 확인
+    with track_stage("lookup"):
+        existing_experience = await crud.get_experience_by_text(text, db)
+    if existing_experience:
+        logger.info(f"Identical experience found. Using existing data for: {text}")
+        scoring_paths.inc(PATH_EXISTING)
+        with track_stage("response"):
+            return await create_experience_response(
+                existing_experience, db, scoring_path=PATH_EXISTING
             )
-            return create_experience_response(existing_experience, db)
 
-        embedding = get_embedding(experience.text)
-        similar_exp = crud.find_similar_experience(embedding, db)
+    # 같은 텍스트에 대한 동시 요청은 하나의 계산을 기다렸다가 결과를 공유
+    return await estimate_flights.do(
+        experience_text_hash(text), lambda: estimate_new_experience(text)
+    )
+
+
+async def estimate_new_experience(text: str) -> schemas.ExperienceResponse:
+    # 공유되는 계산은 요청보다 오래 살 수 있으므로 자체 세션을 사용
+    async with AsyncSessionLocal() as db:
+        with track_stage("embedding"):
+            embedding = await get_embedding(text)
+        with track_stage("similarity"):
+            neighbours = (
+                await crud.find_nearest_experiences([embedding], db, k=settings.knn_k)
+            )[0]
 
-        if similar_exp:
-            # 유사한 경험이 있을 경우, GPT에게 비교를 요청
-            difficulty_score = compare_experience_difficulties(
-                experience.text, similar_exp.text, similar_exp.difficulty_score
+        with track_stage("scoring"):
+            difficulty_score, detailed_scores, scoring_path = (
+                await score_new_experience(text, neighbours)
             )
-            logger.info(
-                f"Compared with similar experience. New score: {difficulty_score}"
+        scoring_paths.inc(scoring_path)
+
+        with track_stage("store"):
+            new_experience = await crud.create_experience(
+                text=text,
+                embedding=embedding,
+                difficulty_score=difficulty_score,
+                difficulty_scores=detailed_scores,
+                db=db,
             )
-        else:
-            # 유사한 경험이 없을 경우, 기존 방식대로 난이도 추정
-            analysis = analyze_experience(experience.text)
-            difficulty_score = analysis["single_score"]
+
+        with track_stage("response"):
+            return await create_experience_response(
+                new_experience, db, scoring_path=scoring_path
+            )
+
+
+async def score_new_experience(
+    text: str, neighbours: list[tuple[models.Experience, float]]
+) -> tuple[float, list[float], str]:
+    # 가까운 이웃들의 점수가 서로 일치하면 LLM 을 호출하지 않고 가중 평균을 사용
+    if settings.knn_enabled:
+        prediction = predict_from_neighbours(
+            [
+                (similarity, exp.difficulty_score, exp.difficulty_scores)
+                for exp, similarity in neighbours
+            ],
+            metric_count=METRIC_COUNT,
+            min_similarity=settings.knn_min_similarity,
+            min_neighbours=settings.knn_min_neighbours,
+            max_score_std=settings.knn_max_score_std,
+            max_metric_std=settings.knn_max_metric_std,
+        )
+        if prediction:
+            difficulty_score, detailed_scores = prediction
             logger.info(
-                f"No similar experience found. Using GPT analysis. Score: {difficulty_score}"
+                f"Estimated from {len(neighbours)} neighbours without GPT. "
+                f"Score: {difficulty_score}"
             )
+            return difficulty_score, detailed_scores, PATH_KNN
+
+    try:
+        return await score_with_llm(text, neighbours)
+    except CircuitOpenError:
+        # LLM 이 막혀 있으면 기다리지 않고 일치 조건을 완화한 이웃 평균으로 대체
+        prediction = predict_from_neighbours(
+            [
+                (similarity, exp.difficulty_score, exp.difficulty_scores)
+                for exp, similarity in neighbours
+            ],
+            metric_count=METRIC_COUNT,
+            min_similarity=settings.degraded_min_similarity,
+            min_neighbours=settings.degraded_min_neighbours,
+            max_score_std=float("inf"),
+            max_metric_std=float("inf"),
+        )
+        if prediction is None:
+            raise
+        difficulty_score, detailed_scores = prediction
+        logger.warning(
+            f"LLM circuit open. Estimated from {len(neighbours)} neighbours "
+            f"(degraded). Score: {difficulty_score}"
+        )
+        return difficulty_score, detailed_scores, PATH_DEGRADED
 
-        detailed_scores = get_difficulty_scores(experience.text)
 
-        new_experience = crud.create_experience(
-            text=experience.text,
-            embedding=embedding,
-            difficulty_score=difficulty_score,
-            difficulty_scores=detailed_scores,
-            db=db,
+async def score_with_llm(
+    text: str, neighbours: list[tuple[models.Experience, float]]
+) -> tuple[float, list[float], str]:
+    similar_exp, similarity = neighbours[0] if neighbours else (None, 0.0)
+    if similar_exp and similarity > SIMILAR_EXPERIENCE_THRESHOLD:
+        # 유사한 경험이 있을 경우, GPT에게 비교를 요청하고 세부 지표는 동시에 받는다
+        difficulty_score, detailed_scores = await asyncio.gather(
+            compare_experience_difficulties(
+                text, similar_exp.text, similar_exp.difficulty_score
+            ),
+            get_difficulty_scores(text),
+        )
+        logger.info(
+            f"Compared with similar experience {similar_exp.id} "
+            f"(similarity: {similarity:.4f}). New score: {difficulty_score}"
         )
+        return difficulty_score, detailed_scores, PATH_LLM_COMPARE
+
+    # 유사한 경험이 없을 경우, 전체 점수와 세부 지표를 한 번의 호출로 추정
+    analysis = await analyze_experience(text)
+    difficulty_score = analysis["single_score"]
+    detailed_scores = analysis["detailed_scores"]
+    logger.info(
+        f"No similar experience found. Using GPT analysis. Score: {difficulty_score}"
+    )
+    return difficulty_score, detailed_scores, PATH_LLM_ANALYSIS
 
-        crud.recalculate_relative_difficulties(db)
-        return create_experience_response(new_experience, db)
+
+@router.post("/estimate/batch", response_model=schemas.BatchEstimateResponse)
+async def estimate_difficulty_batch(
+    batch: schemas.BatchEstimateRequest, db: AsyncSession = Depends(get_async_db)
+) -> schemas.BatchEstimateResponse:
+    if len(batch.texts) > settings.batch_max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch size exceeds limit of {settings.batch_max_size}",
+        )
+    # 배치의 OpenAI 호출은 대화형 추정 요청보다 뒤에 스케줄된다
+    llm_lane.set(LANE_BATCH)
+    try:
+        text_hashes = [experience_text_hash(text) for text in batch.texts]
+        with track_stage("lookup"):
+            existing = await crud.get_experiences_by_text_hashes(text_hashes, db)
+
+        # 이미 저장된 텍스트와 배치 내 중복을 제외한 새 텍스트만 처리
+        pending: dict[str, str] = {}
+        for text_hash, text in zip(text_hashes, batch.texts):
+            if text_hash not in existing:
+                pending.setdefault(text_hash, text)
+        texts = list(pending.values())
+
+        with track_stage("embedding"):
+            embeddings = await get_embeddings(texts) if texts else []
+        with track_stage("similarity"):
+            neighbours = await crud.find_nearest_experiences(
+                embeddings, db, k=settings.knn_k
+            )
+
+        semaphore = asyncio.Semaphore(settings.batch_scoring_concurrency)
+
+        async def score(text, text_neighbours):
+            async with semaphore:
+                return await score_new_experience(text, text_neighbours)
+
+        with track_stage("scoring"):
+            scored = await asyncio.gather(
+                *(
+                    score(text, text_neighbours)
+                    for text, text_neighbours in zip(texts, neighbours)
+                ),
+                return_exceptions=True,
+            )
+
+        errors: dict[str, str] = {}
+        paths: dict[str, str] = {text_hash: PATH_EXISTING for text_hash in existing}
+        items = []
+        for text_hash, text, embedding, result in zip(
+            pending, texts, embeddings, scored
+        ):
+            if isinstance(result, Exception):
+                logger.error(f"Batch scoring failed for: {text}: {result}")
+                errors[text_hash] = str(result)
+                continue
+            difficulty_score, detailed_scores, paths[text_hash] = result
+            scoring_paths.inc(paths[text_hash])
+            items.append(
+                {
+                    "text": text,
+                    "embedding": embedding,
+                    "difficulty_score": difficulty_score,
+                    "difficulty_scores": detailed_scores,
+                }
+            )
+
+        with track_stage("store"):
+            created = await crud.create_experiences(items, db)
+        experiences = {**created, **existing}
+
+        results = []
+        for text_hash, text in zip(text_hashes, batch.texts):
+            experience = experiences.get(text_hash)
+            results.append(
+                schemas.BatchEstimateItem(
+                    text=text,
+                    experience=(
+                        await to_experience_with_score(experience, db)
+                        if experience
+                        else None
+                    ),
+                    error=errors.get(text_hash),
+                    scoring_path=paths.get(text_hash),
+                )
+            )
+        return schemas.BatchEstimateResponse(
+            results=results,
+            created=len(items),
+            total_experiences=await crud.get_total_experiences_count(db),
+        )
 
     except Exception as e:
-        logger.error(f"Error in estimate_difficulty: {str(e)}", exc_info=True)
+        logger.error(f"Error in estimate_difficulty_batch: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def create_experience_response(
-    experience: models.Experience, db: Session
+async def to_experience_with_score(
+    experience: models.Experience, db: AsyncSession
+) -> schemas.ExperienceWithScore:
+    # 상대적 난이도는 저장된 값 대신 순위 인덱스에서 즉석으로 계산
+    return schemas.ExperienceWithScore(
+        id=experience.id,
+        text=experience.text,
+        difficulty_score=experience.difficulty_score,
+        relative_difficulty=await crud.calculate_relative_difficulty(
+            db, experience.difficulty_score
+        ),
+    )
+
+
+async def create_experience_response(
+    experience: models.Experience,
+    db: AsyncSession,
+    scoring_path: Optional[str] = None,
 ) -> schemas.ExperienceResponse:
-    lower_exp, higher_exp = crud.get_adjacent_experiences(
+    lower_exp, higher_exp = await crud.get_adjacent_experiences(
         experience.difficulty_score, db
     )
-    total_count = crud.get_total_experiences_count(db)
+    total_count = await crud.get_total_experiences_count(db)
 
     return schemas.ExperienceResponse(
-        user_experience=schemas.ExperienceWithScore(
-            id=experience.id,
-            text=experience.text,
-            difficulty_score=experience.difficulty_score,
-            relative_difficulty=experience.relative_difficulty,
-        ),
+        user_experience=await to_experience_with_score(experience, db),
         adjacent_experiences=schemas.AdjacentExperiences(
-            lower=(
-                schemas.ExperienceWithScore(
-                    id=lower_exp.id,
-                    text=lower_exp.text,
-                    difficulty_score=lower_exp.difficulty_score,
-                    relative_difficulty=lower_exp.relative_difficulty,
-                )
-                if lower_exp
-                else None
-            ),
+            lower=await to_experience_with_score(lower_exp, db) if lower_exp else None,
             higher=(
-                schemas.ExperienceWithScore(
-                    id=higher_exp.id,
-                    text=higher_exp.text,
-                    difficulty_score=higher_exp.difficulty_score,
-                    relative_difficulty=higher_exp.relative_difficulty,
-                )
-                if higher_exp
-                else None
+                await to_experience_with_score(higher_exp, db) if higher_exp else None
             ),
         ),
         total_experiences=total_count,
+        scoring_path=scoring_path,
+        ranks_stale_seconds=rank_refresher.staleness(),
     )
 
 
 @router.post("/compare", response_model=schemas.FinalExperienceResponse)
 async def compare_experiences(
-    comparison: schemas.UserComparisonInput, db: Session = Depends(get_db)
+    comparison: schemas.UserComparisonInput, db: AsyncSession = Depends(get_async_db)
 ) -> schemas.FinalExperienceResponse:
     try:
         logger.info(
             f"Received comparison for experience ID: {comparison.experience_id}"
         )
 
-        experience = crud.get_experience_by_id(comparison.experience_id, db)
+        experience = await crud.get_experience_by_id(comparison.experience_id, db)
         if not experience:
             logger.error(f"Experience not found: {comparison.experience_id}")
             raise HTTPException(status_code=404, detail="Experience not found")
 
-        crud.create_comparison(
-            experience_id=comparison.experience_id,
-            is_more_difficult_than_lower=comparison.is_more_difficult_than_lower,
-            is_less_difficult_than_higher=comparison.is_less_difficult_than_higher,
-            db=db,
-        )
+        # 사용자가 본 이웃 (요청에 없으면 현재 점수 기준 이웃) 과의 쌍대 비교로 저장
+        lower_id, higher_id = comparison.lower_id, comparison.higher_id
+        if lower_id is None and higher_id is None:
+            lower_exp, higher_exp = await crud.get_adjacent_experiences(
+                experience.difficulty_score, db
+            )
+            lower_id = lower_exp.id if lower_exp else None
+            higher_id = higher_exp.id if higher_exp else None
+        else:
+            compared_ids = [i for i in (lower_id, higher_id) if i is not None]
+            invalid_ids = await crud.invalid_comparison_ids(
+                experience, compared_ids, db
+            )
+            if invalid_ids:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"Not a neighbour of experience {experience.id}: {invalid_ids}",
+                )
+        outcomes = []
+        if lower_id is not None:
+            outcomes.append((lower_id, comparison.is_more_difficult_than_lower))
+        if higher_id is not None:
+            outcomes.append((higher_id, not comparison.is_less_difficult_than_higher))
+        await crud.create_comparisons(experience.id, outcomes, db)
 
         # 사용자 비교 결과에 따라 난이도 점수 조정
         adjustment = 0
@@ -164,19 +401,23 @@ async def compare_experiences(
         )
         logger.info(f"Adjusted difficulty score: {new_difficulty_score}")
 
-        # 난이도 점수 업데이트 및 상대적 난이도 재계산
-        updated_experience = crud.update_experience_score(
+        # 임시 조정만 반영하고, 전체 점수는 비교 데이터로 주기적으로 다시 맞춘다 (app.rerank)
+        updated_experience = await crud.update_experience_score(
             experience_id=experience.id, new_score=new_difficulty_score, db=db
         )
-        crud.recalculate_relative_difficulties(db)
 
         return schemas.FinalExperienceResponse(
             id=updated_experience.id,
             text=updated_experience.text,
             difficulty_score=updated_experience.difficulty_score,
-            relative_difficulty=updated_experience.relative_difficulty,
+            relative_difficulty=await crud.calculate_relative_difficulty(
+                db, updated_experience.difficulty_score
+            ),
             difficulty_scores=updated_experience.difficulty_scores,
+            ranks_stale_seconds=rank_refresher.staleness(),
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in compare_experiences: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
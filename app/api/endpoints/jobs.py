@@ -0,0 +1,39 @@
+import asyncio
+import logging
+import time
+from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas import schemas
+from app.crud import crud
+from app.database import get_async_db
+from app.config import settings
+from app.models import models
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def to_job_response(job: models.EstimateJob) -> schemas.JobResponse:
+    return schemas.JobResponse(
+        job_id=job.id,
+        status=job.status,
+        result=job.result,
+        error=job.error,
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.JobResponse)
+async def get_job(
+    job_id: str, wait: float = 0, db: AsyncSession = Depends(get_async_db)
+) -> schemas.JobResponse:
+    # wait > 0 이면 작업이 끝나거나 시간이 다 될 때까지 long-poll
+    deadline = time.monotonic() + min(max(wait, 0), settings.job_max_wait)
+    while True:
+        job = await crud.get_estimate_job(job_id, db)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        if job.status in ("done", "failed") or time.monotonic() >= deadline:
+            return to_job_response(job)
+        # 기다리는 동안 커넥션을 풀에 돌려준다
+        await db.rollback()
+        await asyncio.sleep(settings.job_poll_interval)
@@ -14,6 +14,112 @@ class Settings(BaseSettings):
     app_env: str = app_env
     DEBUG: bool = False
     openai_api_key: str
+    # 비우면 OpenAI 기본 엔드포인트 (벤치마크에서는 로컬 stub 서버 주소)
+    openai_base_url: str = ""
+
+    # 비동기(asyncpg) 접속 URL, 비우면 database_url 에서 드라이버만 바꿔 사용
+    async_database_url: str = ""
+    # 커넥션 풀
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_pool_warmup: int = 2  # 시작 시 미리 열어 둘 커넥션 수 (pool_size 이하)
+
+    # 유사도 검색 백엔드: "exact"(전수 행렬곱) 또는 "ivf"(근사 최근접 이웃)
+    similarity_backend: str = "exact"
+    ivf_nlist: int = 0  # 0이면 sqrt(N)
+    ivf_nprobe: int = 8
+    ivf_min_train_size: int = 10000
+
+    # 새 임베딩 저장 형식: "float32"(4 bytes/dim), "int8"(1 byte/dim, 양자화), "array"(이전 ARRAY(Float))
+    # 전환: alembic upgrade head 가 기존 ARRAY 임베딩을 같은 형식의 바이너리 컬럼으로 옮기고
+    # ARRAY 사본을 비운다. EMBEDDING_STORAGE=array 로 실행하면 ARRAY 값을 남겨 두므로
+    # ARRAY 만 읽는 이전 버전으로 되돌릴 때만 사용한다.
+    embedding_storage: str = "float32"
+
+    # 임베딩 캐시 (경로를 비우면 영구 캐시 비활성화)
+    embedding_cache_size: int = 2048
+    embedding_cache_path: str = ".cache/embeddings.sqlite3"
+
+    # chat completion 응답 캐시 (ttl/max_entries 는 0 이면 제한 없음)
+    llm_cache_enabled: bool = True
+    llm_cache_size: int = 4096
+    llm_cache_ttl: float = 86400
+    llm_cache_path: str = ".cache/llm_responses.sqlite3"
+    llm_cache_max_entries: int = 100000
+
+    # 이웃 점수로 LLM 호출 없이 추정하는 kNN 경로
+    # (min_similarity 이상인 이웃이 min_neighbours 개 이상이고 점수 표준편차가 기준 이하일 때만)
+    knn_enabled: bool = True
+    knn_k: int = 8
+    knn_min_similarity: float = 0.9
+    knn_min_neighbours: int = 3
+    knn_max_score_std: float = 5.0
+    knn_max_metric_std: float = 10.0
+
+    # 쌍대 비교 Bradley–Terry 재순위 (rerank_interval=0 이면 주기 실행 안 함, python -m app.rerank)
+    rerank_interval: float = 0
+    rerank_scale: float = 10.0  # 점수 차 scale 이면 더 어렵다고 답할 확률이 약 73%
+    rerank_prior_weight: float = 1.0  # 모델이 매긴 초기 점수에 대한 신뢰도
+    # /api/compare 의 lower_id/higher_id 는 현재 순위에서 이 개수 이내인 경험만 허용
+    compare_neighbour_window: int = 50
+
+    # 저장된 relative_difficulty 재계산: 첫 쓰기 후 이 시간(초) 동안의 쓰기를 한 번에 반영
+    rank_refresh_interval: float = 5.0
+
+    # 다른 프로세스(작업 워커, 다른 uvicorn 워커)가 저장한 경험과 바꾼 점수를 메모리 인덱스에 반영하는 주기
+    # (0 이면 안 함). lookback 은 가장 긴 쓰기 트랜잭션 + 서버 간 시계 차이보다 길어야 한다
+    index_sync_interval: float = 10.0
+    index_sync_lookback: float = 60.0
+
+    # OpenAI 호출 스케줄러: 모델별 분당 요청/토큰 한도 + 전체 동시 실행 수 (0 이면 제한 없음)
+    # 한도를 비워 두면 응답 헤더(x-ratelimit-limit-*)의 값 x openai_limit_utilization 을 사용
+    openai_max_concurrency: int = 32
+    openai_rpm: float = 0
+    openai_tpm: float = 0
+    openai_model_limits: dict[str, tuple[float, float]] = {}  # {"model": [rpm, tpm]}
+    openai_limit_utilization: float = 0.9
+    openai_burst_seconds: float = 10.0  # 버킷 크기 = 이 시간 동안의 한도
+    openai_max_retries: int = 2  # 429/일시 오류 재시도 (SDK 자체 재시도는 끔)
+    openai_max_backoff: float = 30.0
+    openai_chat_timeout: float = 30.0  # 호출당 timeout (초)
+    openai_embedding_timeout: float = 10.0
+    openai_queue_timeout: float = 30.0  # 스케줄러 대기열에서 기다리는 최대 시간
+
+    # chat 요청 hedging: 최근 성공 지연의 llm_hedge_quantile 만큼 기다려도 응답이 없으면 한 번 더 보낸다
+    llm_hedging_enabled: bool = False
+    llm_hedge_quantile: float = 0.95
+    llm_hedge_min_delay: float = 0.5  # 초
+    llm_hedge_min_samples: int = 50  # 이만큼 지연이 쌓이기 전에는 hedge 하지 않음
+    llm_hedge_budget: float = 0.05  # hedge 호출 수 / 전체 호출 수 상한
+
+    # 모델별 circuit breaker: 최근 window 호출 중 실패(오류, timeout, slow_call 초과) 비율이
+    # failure_rate 이상이면 open_seconds 동안 호출하지 않고 이웃 점수로 대체 (degraded)
+    llm_circuit_enabled: bool = True
+    llm_circuit_window: int = 50
+    llm_circuit_min_calls: int = 20
+    llm_circuit_failure_rate: float = 0.5
+    llm_circuit_slow_call_seconds: float = 10.0
+    llm_circuit_open_seconds: float = 30.0
+    llm_circuit_half_open_calls: int = 3
+    # degraded 경로: 이 유사도 이상인 이웃이 degraded_min_neighbours 개 이상이면 가중 평균 사용
+    degraded_min_similarity: float = 0.5
+    degraded_min_neighbours: int = 1
+
+    # /api/estimate/batch
+    batch_max_size: int = 1000
+    batch_scoring_concurrency: int = 16
+
+    # 비동기 추정 작업 대기열: 기본은 python -m app.worker 로 워커를 따로 띄우고,
+    # job_workers > 0 이면 웹 프로세스 안에서도 그 수만큼 워커를 띄운다
+    estimate_async_mode: bool = False
+    job_workers: int = 0
+    job_poll_interval: float = 0.5
+    job_stale_after: float = 300
+    job_max_attempts: int = 3
+    job_max_wait: float = 30
 
     class Config:
         env_file = f".env.{app_env}"
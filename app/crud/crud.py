@@ -1,146 +1,200 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+import logging
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 import app.models.models as models
-import app.schemas.schemas as schemas
-from database import get_db
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
-from scipy import stats
 from typing import List, Optional
+from datetime import datetime, timedelta
+from app.utils.embedding_index import embedding_index
+from app.utils.score_index import score_index
+from app.utils.index_sync import index_sync
+from app.utils.ranking import fit_bradley_terry
+from app.utils.rank_refresher import rank_refresher
+from app.utils.metrics import crud_seconds, timed
+from app.utils.embedding_codec import encode_embedding, decode_embedding
+from app.utils.text import experience_text_hash
+from app.config import settings
 
+logger = logging.getLogger(__name__)
 
-def calculate_relative_difficulty(db: Session, difficulty_score: float) -> float:
-    total_experiences = db.query(func.count(models.Experience.id)).scalar()
-    lower_experiences = (
-        db.query(func.count(models.Experience.id))
-        .filter(models.Experience.difficulty_score <= difficulty_score)
-        .scalar()
-    )
-    return (
-        (lower_experiences / total_experiences) * 100 if total_experiences > 0 else 50.0
-    )
+# 순위 계산과 이웃 표시에 필요한 가벼운 컬럼
+EXPERIENCE_SUMMARY_COLUMNS = (
+    models.Experience.id,
+    models.Experience.text,
+    models.Experience.difficulty_score,
+    models.Experience.relative_difficulty,
+)
+
+
+async def load_score_index(db: AsyncSession) -> None:
+    started_at = datetime.utcnow()
+    rows = (
+        await db.execute(
+            select(models.Experience.id, models.Experience.difficulty_score).filter(
+                models.Experience.difficulty_score.isnot(None)
+            )
+        )
+    ).all()
+    score_index.load(rows)
+    index_sync.loaded(started_at)
+    logger.info(f"Loaded {len(score_index)} scores into the rank index")
 
 
-def update_all_relative_difficulties(db: Session):
-    experiences = (
-        db.query(models.Experience).order_by(models.Experience.difficulty_score).all()
-    )
-    total = len(experiences)
-    for i, exp in enumerate(experiences):
-        exp.relative_difficulty = ((i + 1) / total) * 100
-    db.commit()
+async def calculate_relative_difficulty(
+    db: AsyncSession, difficulty_score: float
+) -> float:
+    # 전체 테이블을 다시 쓰지 않고 메모리 순위 구조에서 백분위를 바로 계산
+    if not score_index.is_loaded:
+        await load_score_index(db)
+    return score_index.percentile(difficulty_score)
+
 
+async def update_all_relative_difficulties(db: AsyncSession):
+    await recalculate_relative_difficulties(db)
 
-def update_experience_score(
-    experience_id: int, new_score: float, db: Session
+
+@timed(crud_seconds, "update_experience_score")
+async def update_experience_score(
+    experience_id: int, new_score: float, db: AsyncSession
 ) -> models.Experience:
-    experience = (
-        db.query(models.Experience)
-        .filter(models.Experience.id == experience_id)
-        .first()
-    )
+    experience = await db.get(models.Experience, experience_id)
     if experience:
+        if not score_index.is_loaded:
+            await load_score_index(db)
+        score_index.add(experience.id, new_score)
         experience.difficulty_score = new_score
-        db.commit()
-        db.refresh(experience)
+        experience.score_updated_at = datetime.utcnow()
+        experience.relative_difficulty = score_index.percentile(new_score)
+        await db.commit()
+        await db.refresh(experience)
+        rank_refresher.mark_dirty()
     return experience
 
 
-def recalculate_relative_difficulties(db: Session):
-    experiences = (
-        db.query(models.Experience).order_by(models.Experience.difficulty_score).all()
+@timed(crud_seconds, "recalculate_relative_difficulties")
+async def recalculate_relative_difficulties(db: AsyncSession):
+    # 행을 가져오지 않고 UPDATE ... FROM (SELECT cume_dist() OVER ...) 한 문장으로 처리
+    # cume_dist 는 score_index.percentile 과 같은 "점수 이하 비율" 이다
+    ranked = (
+        select(
+            models.Experience.id,
+            (
+                func.cume_dist().over(order_by=models.Experience.difficulty_score) * 100
+            ).label("relative_difficulty"),
+        )
+        .filter(models.Experience.difficulty_score.isnot(None))
+        .subquery()
     )
-    total = len(experiences)
-    for i, exp in enumerate(experiences):
-        exp.relative_difficulty = ((i + 1) / total) * 100
-    db.commit()
+    await db.execute(
+        update(models.Experience)
+        .where(
+            models.Experience.id == ranked.c.id,
+            models.Experience.relative_difficulty.is_distinct_from(
+                ranked.c.relative_difficulty
+            ),
+        )
+        .values(relative_difficulty=ranked.c.relative_difficulty)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def bulk_update_experiences(
+    values: List[dict], db: AsyncSession, chunk_size: int = 5000
+) -> None:
+    # 기본키("id")를 포함한 dict 목록을 executemany UPDATE 로 반영 (객체 변경 추적 없음)
+    # 점수를 바꾸면 다른 프로세스의 인덱스 동기화가 알 수 있도록 score_updated_at 도 남긴다
+    if values and "difficulty_score" in values[0]:
+        now = datetime.utcnow()
+        values = [{**row, "score_updated_at": now} for row in values]
+    for start in range(0, len(values), chunk_size):
+        await db.execute(update(models.Experience), values[start : start + chunk_size])
+    await db.commit()
 
 
-def create_experience(
+@timed(crud_seconds, "create_experience")
+async def create_experience(
     text: str,
     embedding: list[float],
     difficulty_score: float,
     difficulty_scores: list[float],
-    db: Session,
+    db: AsyncSession,
 ) -> models.Experience:
-    relative_difficulty = calculate_relative_difficulty(db, difficulty_score)
+    relative_difficulty = await calculate_relative_difficulty(db, difficulty_score)
+    text_hash = experience_text_hash(text)
     db_experience = models.Experience(
         text=text,
-        embedding=embedding,
+        text_hash=text_hash,
         difficulty_score=difficulty_score,
+        base_difficulty_score=difficulty_score,
         relative_difficulty=relative_difficulty,
         difficulty_scores=difficulty_scores,
     )
+    set_experience_embedding(db_experience, embedding)
     db.add(db_experience)
-    db.commit()
-    db.refresh(db_experience)
-
-    # 모든 경험의 상대적 난이도 업데이트
-    update_all_relative_difficulties(db)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # 다른 워커가 같은 텍스트를 먼저 저장한 경우 그 행을 그대로 사용
+        await db.rollback()
+        existing = await get_experience_by_text_hash(text_hash, db)
+        if existing is None:
+            raise
+        logger.info(f"Experience already inserted concurrently: {existing.id}")
+        return existing
+    await db.refresh(db_experience)
+
+    # 메모리 인덱스에도 반영 (전체 행의 상대적 난이도는 다시 쓰지 않는다)
+    if embedding is not None:
+        embedding_index.add(db_experience.id, embedding)
+    score_index.add(db_experience.id, difficulty_score)
+    rank_refresher.mark_dirty()
 
     return db_experience
 
 
-def get_similar_experience(
-    embedding: list[float], threshold: float = 0.9, db: Session = next(get_db())
-) -> tuple[models.Experience | None, float]:
-    experiences = db.query(models.Experience).all()
-    if not experiences:
-        return None, 0
-
-    similarities = [
-        (exp, cosine_similarity([embedding], [exp.embedding])[0][0])
-        for exp in experiences
-    ]
-
-    most_similar = max(similarities, key=lambda x: x[1])
-    if most_similar[1] > threshold:
-        return most_similar
-    return None, 0
-
-
-import logging
-from sqlalchemy.orm import Session
-from app.models.models import Experience
-import numpy as np
-
-logger = logging.getLogger(__name__)
-
-
-def recalculate_difficulties(db: Session):
-    experiences = (
-        db.query(models.Experience)
-        .order_by(models.Experience.relative_difficulty)
-        .all()
-    )
-    total = len(experiences)
-    for i, exp in enumerate(experiences):
-        exp.relative_difficulty = ((i + 1) / total) * 100
-        exp.difficulty_score = exp.relative_difficulty  # 또는 다른 적절한 변환 로직
-    db.commit()
+async def recalculate_difficulties(db: AsyncSession):
+    ids = (
+        await db.scalars(
+            select(models.Experience.id).order_by(models.Experience.relative_difficulty)
+        )
+    ).all()
+    total = len(ids)
+    values = []
+    for i, experience_id in enumerate(ids):
+        relative_difficulty = ((i + 1) / total) * 100
+        values.append(
+            {
+                "id": experience_id,
+                "relative_difficulty": relative_difficulty,
+                "difficulty_score": relative_difficulty,  # 또는 다른 적절한 변환 로직
+            }
+        )
+    await bulk_update_experiences(values, db)
+    if values:
+        score_index.load((v["id"], v["difficulty_score"]) for v in values)
 
 
-def get_adjacent_experiences(
-    difficulty_score: float, db: Session = next(get_db())
+@timed(crud_seconds, "get_adjacent_experiences")
+async def get_adjacent_experiences(
+    difficulty_score: float, db: AsyncSession
 ) -> tuple[models.Experience | None, models.Experience | None]:
     logger.info(
         f"Getting adjacent experiences for difficulty score: {difficulty_score}"
     )
     try:
-        lower = (
-            db.query(models.Experience)
-            .filter(models.Experience.difficulty_score.isnot(None))
-            .filter(models.Experience.difficulty_score < difficulty_score)
-            .order_by(models.Experience.difficulty_score.desc())
-            .first()
-        )
-        higher = (
-            db.query(models.Experience)
-            .filter(models.Experience.difficulty_score.isnot(None))
-            .filter(models.Experience.difficulty_score > difficulty_score)
-            .order_by(models.Experience.difficulty_score)
-            .first()
-        )
+        # 이웃 id 는 점수 인덱스에서 찾고, 행은 기본키로 한 번에 가져온다
+        if not score_index.is_loaded:
+            await load_score_index(db)
+        lower_entry = score_index.lower(difficulty_score)
+        higher_entry = score_index.higher(difficulty_score)
+        ids = [entry[1] for entry in (lower_entry, higher_entry) if entry]
+        rows = await get_experiences_by_ids(ids, db, summary=True)
+        lower = rows.get(lower_entry[1]) if lower_entry else None
+        higher = rows.get(higher_entry[1]) if higher_entry else None
         logger.info(
             f"Adjacent experiences found. Lower: {'Found' if lower else 'None'}, Higher: {'Found' if higher else 'None'}"
         )
@@ -150,62 +204,425 @@ def get_adjacent_experiences(
         raise
 
 
-def create_comparison(
-    experience_id: int,
-    is_more_difficult_than_lower: bool,
-    is_less_difficult_than_higher: bool,
-    db: Session,
-) -> models.Comparison:
-    db_comparison = models.Comparison(
-        experience_id=experience_id,
-        is_more_difficult_than_lower=is_more_difficult_than_lower,
-        is_less_difficult_than_higher=is_less_difficult_than_higher,
+async def invalid_comparison_ids(
+    experience: models.Experience, ids: List[int], db: AsyncSession
+) -> List[int]:
+    # 비교 대상은 점수가 있는 다른 경험이고, 순위가 이 경험에서 compare_neighbour_window 이내여야 한다
+    # (사용자가 본 뒤 다른 저장으로 조금 밀려난 이웃은 허용)
+    if not score_index.is_loaded:
+        await load_score_index(db)
+    rows = await get_experiences_by_ids(ids, db, summary=True)
+    invalid = []
+    for compared_id in ids:
+        row = rows.get(compared_id)
+        if row is None or row.id == experience.id or row.difficulty_score is None:
+            invalid.append(compared_id)
+            continue
+        if experience.difficulty_score is None:
+            continue
+        distance = abs(
+            score_index.count_le(row.difficulty_score)
+            - score_index.count_le(experience.difficulty_score)
+        )
+        if distance > settings.compare_neighbour_window:
+            invalid.append(compared_id)
+    return invalid
+
+
+@timed(crud_seconds, "create_comparisons")
+async def create_comparisons(
+    experience_id: int, outcomes: List[tuple[int, bool]], db: AsyncSession
+) -> None:
+    # outcomes: (비교 대상 경험 id, experience 가 더 어려운지) 목록, 한 번의 INSERT 로 추가만 한다
+    if not outcomes:
+        return
+    await db.execute(
+        insert(models.Comparison),
+        [
+            {
+                "experience_id": experience_id,
+                "compared_experience_id": compared_experience_id,
+                "is_more_difficult": is_more_difficult,
+            }
+            for compared_experience_id, is_more_difficult in outcomes
+        ],
     )
-    db.add(db_comparison)
-    db.commit()
-    db.refresh(db_comparison)
-    return db_comparison
+    await db.commit()
 
 
-def update_experience_relative_difficulty(
-    experience_id: int, new_relative_difficulty: float, db: Session
-) -> models.Experience:
-    experience = (
-        db.query(models.Experience)
-        .filter(models.Experience.id == experience_id)
-        .first()
+@timed(crud_seconds, "rerank_from_comparisons")
+async def rerank_from_comparisons(db: AsyncSession) -> int:
+    # 저장된 모든 쌍대 비교로 Bradley–Terry 점수를 다시 맞추고 바뀐 행만 bulk UPDATE
+    experiences = (
+        await db.execute(
+            select(
+                models.Experience.id,
+                func.coalesce(
+                    models.Experience.base_difficulty_score,
+                    models.Experience.difficulty_score,
+                ),
+                models.Experience.difficulty_score,
+            )
+            .filter(models.Experience.difficulty_score.isnot(None))
+            .order_by(models.Experience.id)
+        )
+    ).all()
+    if not experiences:
+        return 0
+    ids = np.fromiter((row[0] for row in experiences), dtype=np.int64)
+    prior = np.fromiter((row[1] for row in experiences), dtype=np.float64)
+    current = np.fromiter((row[2] for row in experiences), dtype=np.float64)
+
+    comparisons = np.asarray(
+        (
+            await db.execute(
+                select(
+                    models.Comparison.experience_id,
+                    models.Comparison.compared_experience_id,
+                    models.Comparison.is_more_difficult,
+                ).filter(
+                    models.Comparison.compared_experience_id.isnot(None),
+                    models.Comparison.is_more_difficult.isnot(None),
+                )
+            )
+        ).all(),
+        dtype=np.int64,
+    ).reshape(-1, 3)
+
+    # id 를 배열 위치로 바꾸고, 삭제되었거나 점수가 없는 경험과의 비교는 버린다
+    left = np.searchsorted(ids, comparisons[:, 0]).clip(max=len(ids) - 1)
+    right = np.searchsorted(ids, comparisons[:, 1]).clip(max=len(ids) - 1)
+    valid = (ids[left] == comparisons[:, 0]) & (ids[right] == comparisons[:, 1])
+    left, right, more = left[valid], right[valid], comparisons[valid, 2].astype(bool)
+
+    scores = fit_bradley_terry(
+        np.where(more, left, right),
+        np.where(more, right, left),
+        prior,
+        scale=settings.rerank_scale,
+        prior_weight=settings.rerank_prior_weight,
+    ).clip(0, 100)
+
+    changed = np.flatnonzero(np.abs(scores - current) > 1e-3)
+    await bulk_update_experiences(
+        [
+            {"id": int(ids[i]), "difficulty_score": round(float(scores[i]), 2)}
+            for i in changed
+        ],
+        db,
     )
+    score_index.load(zip(ids.tolist(), np.round(scores, 2).tolist()))
+    logger.info(
+        f"Re-ranked {len(ids)} experiences from {int(valid.sum())} comparisons, "
+        f"{len(changed)} scores changed"
+    )
+    return len(changed)
+
+
+async def update_experience_relative_difficulty(
+    experience_id: int, new_relative_difficulty: float, db: AsyncSession
+) -> models.Experience:
+    experience = await db.get(models.Experience, experience_id)
     if experience:
         experience.relative_difficulty = new_relative_difficulty
-        db.commit()
-        db.refresh(experience)
+        await db.commit()
+        await db.refresh(experience)
     return experience
 
 
-def get_experience_by_id(
-    experience_id: int, db: Session = next(get_db())
+@timed(crud_seconds, "get_experience_by_id")
+async def get_experience_by_id(
+    experience_id: int, db: AsyncSession
 ) -> models.Experience:
-    return (
-        db.query(models.Experience)
-        .filter(models.Experience.id == experience_id)
-        .first()
+    return await db.get(models.Experience, experience_id)
+
+
+async def get_experiences_by_ids(
+    ids: List[int], db: AsyncSession, summary: bool = False
+) -> dict[int, models.Experience]:
+    if not ids:
+        return {}
+    stmt = select(models.Experience).filter(models.Experience.id.in_(set(ids)))
+    if summary:
+        # 목록/이웃 표시용: 세부 점수 배열도 가져오지 않는다
+        stmt = stmt.options(load_only(*EXPERIENCE_SUMMARY_COLUMNS))
+    experiences = await db.scalars(stmt)
+    return {exp.id: exp for exp in experiences}
+
+
+def embedding_column_values(embedding: Optional[List[float]]) -> dict:
+    if embedding is None or settings.embedding_storage == "array":
+        return {"embedding": embedding}
+    blob, scale = encode_embedding(embedding, settings.embedding_storage)
+    return {"embedding_blob": blob, "embedding_scale": scale}
+
+
+def set_experience_embedding(
+    experience: models.Experience, embedding: Optional[List[float]]
+) -> None:
+    for column, value in embedding_column_values(embedding).items():
+        setattr(experience, column, value)
+
+
+async def iter_embeddings(
+    db: AsyncSession, batch_size: int = 1000, created_since: Optional[datetime] = None
+):
+    # 바이너리 컬럼을 우선 사용하고, 아직 변환되지 않은 행은 ARRAY 컬럼에서 읽는다
+    stmt = select(
+        models.Experience.id,
+        models.Experience.embedding_blob,
+        models.Experience.embedding_scale,
+        models.Experience.embedding,
+    ).filter(
+        (models.Experience.embedding_blob.isnot(None))
+        | (models.Experience.embedding.isnot(None))
+    )
+    if created_since is not None:
+        stmt = stmt.filter(models.Experience.created_at >= created_since)
+    rows = await db.stream(
+        stmt.order_by(models.Experience.id).execution_options(yield_per=batch_size)
     )
+    async for experience_id, blob, scale, embedding in rows:
+        if blob is not None:
+            yield experience_id, decode_embedding(blob, scale)
+        else:
+            yield experience_id, embedding
+
+
+async def load_embedding_index(db: AsyncSession) -> None:
+    started_at = datetime.utcnow()
+    embedding_index.load([item async for item in iter_embeddings(db)])
+    index_sync.loaded(started_at)
+    logger.info(f"Loaded {len(embedding_index)} embeddings into the similarity index")
+
+
+@timed(crud_seconds, "reconcile_indexes")
+async def reconcile_indexes(db: AsyncSession) -> int:
+    # 다른 프로세스가 저장한 행과 바꾼 점수를 메모리 인덱스에 반영
+    since = index_sync.since(settings.index_sync_lookback)
+    if since is None:
+        return 0
+    started_at = datetime.utcnow()
+    added = 0
+    if embedding_index.is_loaded:
+        async for experience_id, embedding in iter_embeddings(db, created_since=since):
+            if experience_id not in embedding_index:
+                embedding_index.add(experience_id, embedding)
+                added += 1
+    if score_index.is_loaded:
+        rows = (
+            await db.execute(
+                select(models.Experience.id, models.Experience.difficulty_score).filter(
+                    models.Experience.score_updated_at >= since,
+                    models.Experience.difficulty_score.isnot(None),
+                )
+            )
+        ).all()
+        changed = [row for row in rows if score_index.get(row[0]) != row[1]]
+        if len(changed) * 10 > len(score_index):
+            # 재순위처럼 많은 점수가 한꺼번에 바뀌었으면 전부 다시 읽는 편이 빠르다
+            await load_score_index(db)
+        else:
+            for experience_id, score in changed:
+                score_index.add(experience_id, score)
+    index_sync.synced(started_at)
+    if added:
+        logger.info(f"Added {added} experiences stored by other processes to the index")
+    return added
+
+
+@timed(crud_seconds, "find_nearest_experiences")
+async def find_nearest_experiences(
+    embeddings: List[List[float]], db: AsyncSession, k: int
+) -> list[list[tuple[models.Experience, float]]]:
+    # 질의마다 유사도 내림차순 상위 k개 이웃, 행은 한 번의 쿼리로 가져온다
+    if not embedding_index.is_loaded:
+        await load_embedding_index(db)
+
+    matches = embedding_index.search_batch(embeddings, k=k)
+    rows = await get_experiences_by_ids(
+        [experience_id for found in matches for experience_id, _ in found], db
+    )
+    return [
+        [
+            (rows[experience_id], similarity)
+            for experience_id, similarity in found
+            if experience_id in rows
+        ]
+        for found in matches
+    ]
 
 
-def find_similar_experience(
-    embedding: List[float], db: Session, threshold: float = 0.9
+@timed(crud_seconds, "create_experiences")
+async def create_experiences(
+    items: List[dict], db: AsyncSession
+) -> dict[str, models.Experience]:
+    # items: text, embedding, difficulty_score, difficulty_scores 를 가진 dict 목록
+    # 한 번의 bulk INSERT 로 저장하고, 다른 워커가 먼저 넣은 텍스트는 건너뛴다
+    if not items:
+        return {}
+    if not score_index.is_loaded:
+        await load_score_index(db)
+
+    rows = []
+    for item in items:
+        rows.append(
+            {
+                "text": item["text"],
+                "text_hash": experience_text_hash(item["text"]),
+                "difficulty_score": item["difficulty_score"],
+                "base_difficulty_score": item["difficulty_score"],
+                "relative_difficulty": score_index.percentile(item["difficulty_score"]),
+                "difficulty_scores": item["difficulty_scores"],
+                **embedding_column_values(item["embedding"]),
+            }
+        )
+    stmt = (
+        pg_insert(models.Experience)
+        .on_conflict_do_nothing(index_elements=["text_hash"])
+        .returning(models.Experience.id, models.Experience.text_hash)
+    )
+    inserted = {
+        text_hash: experience_id
+        for experience_id, text_hash in (await db.execute(stmt, rows)).all()
+    }
+    await db.commit()
+
+    for item, row in zip(items, rows):
+        experience_id = inserted.get(row["text_hash"])
+        if experience_id is None:
+            continue
+        if item["embedding"] is not None:
+            embedding_index.add(experience_id, item["embedding"])
+        score_index.add(experience_id, item["difficulty_score"])
+    if inserted:
+        rank_refresher.mark_dirty()
+
+    return await get_experiences_by_text_hashes([row["text_hash"] for row in rows], db)
+
+
+@timed(crud_seconds, "get_total_experiences_count")
+async def get_total_experiences_count(db: AsyncSession) -> int:
+    if not score_index.is_loaded:
+        await load_score_index(db)
+    return len(score_index)
+
+
+async def get_experience_by_text_hash(
+    text_hash: str, db: AsyncSession
 ) -> Optional[models.Experience]:
-    experiences = db.query(models.Experience).all()
-    for exp in experiences:
-        similarity = cosine_similarity([embedding], [exp.embedding])[0][0]
-        if similarity > threshold:
-            return exp
-    return None
+    return await db.scalar(
+        select(models.Experience)
+        .filter(models.Experience.text_hash == text_hash)
+        .limit(1)
+    )
 
 
-def get_total_experiences_count(db: Session = next(get_db())) -> int:
-    return db.query(func.count(models.Experience.id)).scalar()
+async def get_experiences_by_text_hashes(
+    text_hashes: List[str], db: AsyncSession
+) -> dict[str, models.Experience]:
+    if not text_hashes:
+        return {}
+    experiences = await db.scalars(
+        select(models.Experience).filter(
+            models.Experience.text_hash.in_(set(text_hashes))
+        )
+    )
+    return {exp.text_hash: exp for exp in experiences}
 
 
-def get_experience_by_text(text: str, db: Session) -> Optional[models.Experience]:
-    return db.query(models.Experience).filter(models.Experience.text == text).first()
+@timed(crud_seconds, "get_experience_by_text")
+async def get_experience_by_text(
+    text: str, db: AsyncSession
+) -> Optional[models.Experience]:
+    # 긴 텍스트 대신 고정 길이 해시의 unique 인덱스로 조회
+    return await get_experience_by_text_hash(experience_text_hash(text), db)
+
+
+@timed(crud_seconds, "create_estimate_job")
+async def create_estimate_job(text: str, db: AsyncSession) -> models.EstimateJob:
+    job = models.EstimateJob(text=text, status="pending", attempts=0)
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+@timed(crud_seconds, "get_estimate_job")
+async def get_estimate_job(
+    job_id: str, db: AsyncSession
+) -> Optional[models.EstimateJob]:
+    return await db.get(models.EstimateJob, job_id, populate_existing=True)
+
+
+@timed(crud_seconds, "claim_estimate_job")
+async def claim_estimate_job(db: AsyncSession) -> Optional[models.EstimateJob]:
+    # 여러 워커가 동시에 가져가도 같은 작업을 두 번 잡지 않도록 SKIP LOCKED
+    job = await db.scalar(
+        select(models.EstimateJob)
+        .filter(models.EstimateJob.status == "pending")
+        .order_by(models.EstimateJob.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    if job is None:
+        await db.rollback()
+        return None
+    job.status = "running"
+    job.attempts = (job.attempts or 0) + 1
+    job.started_at = datetime.utcnow()
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+@timed(crud_seconds, "finish_estimate_job")
+async def finish_estimate_job(
+    job_id: str,
+    db: AsyncSession,
+    result: Optional[dict] = None,
+    error: Optional[str] = None,
+) -> None:
+    await db.execute(
+        update(models.EstimateJob)
+        .where(models.EstimateJob.id == job_id)
+        .values(
+            status="failed" if error else "done",
+            result=result,
+            error=error,
+            finished_at=datetime.utcnow(),
+        )
+    )
+    await db.commit()
+
+
+@timed(crud_seconds, "requeue_stale_estimate_jobs")
+async def requeue_stale_estimate_jobs(
+    db: AsyncSession, stale_after: float, max_attempts: int
+) -> int:
+    # 워커가 죽어 running 상태로 남은 작업을 다시 대기열로 돌린다
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+    stale = update(models.EstimateJob).where(
+        models.EstimateJob.status == "running",
+        models.EstimateJob.started_at < cutoff,
+    )
+    failed = (
+        await db.execute(
+            stale.where(models.EstimateJob.attempts >= max_attempts).values(
+                status="failed",
+                error="Job abandoned too many times",
+                finished_at=datetime.utcnow(),
+            )
+        )
+    ).rowcount
+    requeued = (
+        await db.execute(
+            stale.where(models.EstimateJob.attempts < max_attempts).values(
+                status="pending"
+            )
+        )
+    ).rowcount
+    await db.commit()
+    if requeued or failed:
+        logger.info(f"Requeued {requeued} stale jobs, failed {failed}")
+    return requeued
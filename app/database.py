@@ -1,15 +1,86 @@
-from sqlalchemy import create_engine
+import asyncio
+import logging
+import time
+from typing import Optional
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session
 from app.config import settings
+from app.utils.metrics import record_db_query
 
-SQLALCHEMY_DATABASE_URL = settings.database_url
-
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
+# 엔진(커넥션 풀)은 import 시점이 아니라 처음 필요할 때 프로세스당 하나만 만든다
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+
+
+def pool_options(url) -> dict:
+    # SQLite(로컬 벤치마크/테스트)는 드라이버 기본 풀을 그대로 사용
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    # 워커당 커넥션 수는 최대 pool_size + max_overflow 로 제한된다
+    return dict(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+
+
+def async_database_url() -> str:
+    # 비동기 엔진은 asyncpg 드라이버를 사용
+    if settings.async_database_url:
+        return settings.async_database_url
+    return make_url(settings.database_url).set(drivername="postgresql+asyncpg")
+
+
+def instrument_engine(engine: Engine) -> None:
+    # 쿼리 수와 지연 시간을 metrics 와 요청별 Server-Timing 에 기록
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        context.query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        record_db_query(time.perf_counter() - context.query_started)
+
+
+def get_engine() -> Engine:
+    # 동기 엔진은 마이그레이션과 스크립트 용도로만 사용
+    global _engine
+    if _engine is None:
+        url = settings.database_url
+        _engine = create_engine(url, **pool_options(url))
+        instrument_engine(_engine)
+    return _engine
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        url = async_database_url()
+        _async_engine = create_async_engine(url, **pool_options(url))
+        instrument_engine(_async_engine.sync_engine)
+    return _async_engine
+
+
+def SessionLocal() -> Session:
+    return Session(bind=get_engine(), autoflush=False)
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    return AsyncSession(
+        bind=get_async_engine(), autoflush=False, expire_on_commit=False
+    )
+
 
 def get_db():
     db = SessionLocal()
@@ -17,3 +88,33 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def warm_up_pool(size: Optional[int] = None) -> None:
+    # 첫 요청이 커넥션 수립 비용을 떠안지 않도록 풀을 미리 채워 둔다
+    size = min(settings.db_pool_warmup if size is None else size, settings.db_pool_size)
+    if size <= 0:
+        return
+    engine = get_async_engine()
+
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(ping() for _ in range(size)))
+    logger.info(f"Database pool warmed up with {size} connections")
+
+
+async def dispose_engines() -> None:
+    global _engine, _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+    if _engine is not None:
+        _engine.dispose()
+        _engine = None
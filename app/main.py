@@ -1,11 +1,40 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.api.api import api_router
-from app.database import engine
+from app.database import (
+    AsyncSessionLocal,
+    dispose_engines,
+    get_async_engine,
+    warm_up_pool,
+)
+from app.crud import crud
+from app.worker import refresh_relative_difficulties, run_index_sync, start_workers
+from app.rerank import run_reranker
+from app.utils.rank_refresher import rank_refresher
+from app.utils.embedding_index import embedding_index
+from app.utils.score_index import score_index
+from app.utils.gpt import (
+    circuit_breakers,
+    embedding_memory_cache,
+    llm_response_cache,
+    openai_scheduler,
+)
+from app.utils.resilience import CIRCUIT_STATES
+from app.utils.metrics import (
+    CallbackGauge,
+    RequestMetrics,
+    current_request,
+    http_request_db_queries,
+    http_request_seconds,
+    registry,
+)
 import app.models.models as models
 from app.config import settings
+import asyncio
 import logging
 import os
+import time
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -29,18 +58,144 @@ app.add_middleware(
 # API 라우터 포함
 app.include_router(api_router)
 
+# 요청 시점에 읽는 gauge (캐시, 메모리 인덱스, 순위 지연)
+registry.register(
+    CallbackGauge(
+        "llm_response_cache",
+        "Chat completion response cache statistics",
+        lambda: {(key,): value for key, value in llm_response_cache.stats().items()},
+        ("stat",),
+    )
+)
+registry.register(
+    CallbackGauge(
+        "embedding_cache",
+        "In-memory embedding cache statistics",
+        lambda: {
+            (key,): value for key, value in embedding_memory_cache.stats().items()
+        },
+        ("stat",),
+    )
+)
+registry.register(
+    CallbackGauge(
+        "index_size",
+        "Entries in the in-memory indexes",
+        lambda: {("embedding",): len(embedding_index), ("score",): len(score_index)},
+        ("index",),
+    )
+)
+registry.register(
+    CallbackGauge(
+        "openai_scheduler",
+        "OpenAI rate limit scheduler state (slots, queues, learned limits, 429s)",
+        openai_scheduler.stats,
+        ("model", "stat"),
+    )
+)
+registry.register(
+    CallbackGauge(
+        "llm_circuit",
+        "OpenAI circuit breakers (state 0=closed 1=half_open 2=open, transitions, rejected)",
+        lambda: {
+            (model, stat): value
+            for model, breaker in circuit_breakers.items()
+            for stat, value in (
+                ("state", CIRCUIT_STATES[breaker.state]),
+                ("transitions", breaker.transitions),
+                ("rejected", breaker.rejected),
+            )
+        },
+        ("model", "stat"),
+    )
+)
+registry.register(
+    CallbackGauge(
+        "ranks_stale_seconds",
+        "Seconds stored relative difficulties lag behind the latest write",
+        lambda: {(): rank_refresher.staleness()},
+    )
+)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    # 단계별/DB 시간을 모아 Server-Timing 헤더와 요청 지연 히스토그램에 기록
+    metrics = RequestMetrics()
+    token = current_request.set(metrics)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        current_request.reset(token)
+        elapsed = time.perf_counter() - started
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        http_request_seconds.observe(elapsed, request.method, route, status)
+        http_request_db_queries.observe(metrics.db_queries)
+    response.headers["Server-Timing"] = metrics.server_timing(elapsed)
+    return response
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+worker_stop = asyncio.Event()
+worker_tasks: list[asyncio.Task] = []
+
 
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting up the application...")
     # 데이터베이스 테이블 생성
-    models.Base.metadata.create_all(bind=engine)
+    async with get_async_engine().begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
     logger.info("Database tables created.")
+    await warm_up_pool()
+    # 유사도 검색용 임베딩 인덱스와 순위 계산용 점수 인덱스를 한 번만 메모리에 적재
+    async with AsyncSessionLocal() as db:
+        await crud.load_embedding_index(db)
+        await crud.load_score_index(db)
+    # 비동기 추정 작업 워커
+    if settings.job_workers > 0:
+        worker_tasks.extend(start_workers(settings.job_workers, worker_stop))
+    elif settings.estimate_async_mode:
+        logger.info(
+            "Estimate jobs are processed by a separate worker: python -m app.worker"
+        )
+    # 다른 프로세스가 저장한 경험을 메모리 인덱스에 주기적으로 반영
+    if settings.index_sync_interval > 0:
+        worker_tasks.append(
+            asyncio.create_task(
+                run_index_sync(worker_stop, settings.index_sync_interval)
+            )
+        )
+    # 쓰기가 몰려도 저장된 상대 난이도는 주기당 한 번만 다시 계산
+    rank_refresher.interval = settings.rank_refresh_interval
+    worker_tasks.append(
+        asyncio.create_task(
+            rank_refresher.run(worker_stop, refresh_relative_difficulties)
+        )
+    )
+    # 쌍대 비교 기반 주기적 재순위
+    if settings.rerank_interval > 0:
+        worker_tasks.append(
+            asyncio.create_task(run_reranker(worker_stop, settings.rerank_interval))
+        )
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down the application...")
+    worker_stop.set()
+    await asyncio.gather(*worker_tasks, return_exceptions=True)
+    # 종료 전에 남은 순위 변경을 반영
+    if rank_refresher.dirty_since is not None:
+        await rank_refresher.refresh_now(refresh_relative_difficulties)
+    await dispose_engines()
 
 
 @app.get("/")
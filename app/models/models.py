@@ -8,11 +8,17 @@ from sqlalchemy import (
     ForeignKey,
     Boolean,
     JSON,
+    LargeBinary,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
+import uuid
 from app.database import Base
 
+# Postgres 는 ARRAY, SQLite(로컬 벤치마크)는 JSON 으로 저장
+FloatArray = ARRAY(Float).with_variant(JSON(none_as_null=True), "sqlite")
+StringArray = ARRAY(String).with_variant(JSON(none_as_null=True), "sqlite")
+
 
 class User(Base):
     __tablename__ = "users"
@@ -21,7 +27,7 @@ class User(Base):
     username: str = Column(String, unique=True, index=True)
     age: int = Column(Integer)
     occupation: str = Column(String)
-    hobbies: list[str] = Column(ARRAY(String))
+    hobbies: list[str] = Column(StringArray)
     past_experiences: JSON = Column(JSON)  # 과거 경험을 JSON 형태로 저장
     created_at: datetime = Column(DateTime, default=datetime.utcnow)
 
@@ -33,19 +39,30 @@ class Experience(Base):
 
     id: int = Column(Integer, primary_key=True, index=True)
     user_id: int = Column(Integer, ForeignKey("users.id"))
-    text: str = Column(String, index=True)
+    text: str = Column(String)
+    text_hash: str = Column(String(64), unique=True, index=True)  # 정규화 텍스트의 SHA-256
     category: str = Column(String, index=True)  # 경험 카테고리 추가
-    tags: list[str] = Column(ARRAY(String))  # 경험 태그 추가
-    embedding: list[float] = Column(ARRAY(Float))
+    tags: list[str] = Column(StringArray)  # 경험 태그 추가
+    # 임베딩 컬럼은 명시적으로 요청할 때만 읽는다 (undefer_group("embedding"))
+    embedding = deferred(Column(FloatArray), group="embedding")
+    # float32 또는 int8 로 압축한 임베딩, int8 양자화 scale (float32 이면 NULL)
+    embedding_blob = deferred(Column(LargeBinary), group="embedding")
+    embedding_scale = deferred(Column(Float), group="embedding")
     difficulty_score: float = Column(Float)  # 절대적 난이도 점수
+    base_difficulty_score: float = Column(Float)  # 비교 반영 전 모델이 매긴 점수
     relative_difficulty: float = Column(Float)  # 상대적 난이도 (퍼센타일)
-    difficulty_scores: list[float] = Column(ARRAY(Float))  # 기존 difficulty_scores 유지
+    difficulty_scores: list[float] = Column(FloatArray)  # 기존 difficulty_scores 유지
     user_feedback_score: float = Column(Float)  # 사용자 피드백 점수 추가
-    created_at: datetime = Column(DateTime, default=datetime.utcnow)
+    created_at: datetime = Column(DateTime, default=datetime.utcnow, index=True)
+    # difficulty_score 를 저장하거나 바꾼 시각 (다른 프로세스의 메모리 인덱스 동기화 기준)
+    score_updated_at: datetime = Column(DateTime, default=datetime.utcnow, index=True)
 
     user = relationship("User", back_populates="experiences")
     comparisons = relationship(
-        "Comparison", back_populates="experience", cascade="all, delete-orphan"
+        "Comparison",
+        foreign_keys="Comparison.experience_id",
+        back_populates="experience",
+        cascade="all, delete-orphan",
     )
 
 
@@ -89,3 +106,17 @@ class ValidationFeedback(Base):
 
     experience = relationship("Experience")
     user = relationship("User")
+
+
+class EstimateJob(Base):
+    __tablename__ = "estimate_jobs"
+
+    id: str = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    text: str = Column(String, nullable=False)
+    status: str = Column(String(16), default="pending", index=True)  # pending/running/done/failed
+    result: JSON = Column(JSON)  # 완료 시 ExperienceResponse
+    error: str = Column(String)
+    attempts: int = Column(Integer, default=0)
+    created_at: datetime = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at: datetime = Column(DateTime)
+    finished_at: datetime = Column(DateTime)
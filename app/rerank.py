@@ -0,0 +1,48 @@
+import asyncio
+import logging
+from app.config import settings
+from app.crud import crud
+from app.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+async def rerank_once() -> int:
+    async with AsyncSessionLocal() as db:
+        changed = await crud.rerank_from_comparisons(db)
+        if changed:
+            await crud.recalculate_relative_difficulties(db)
+    return changed
+
+
+async def run_reranker(stop: asyncio.Event, interval: float) -> None:
+    while not stop.is_set():
+        try:
+            await rerank_once()
+        except Exception as e:
+            logger.error(f"Re-ranking failed: {str(e)}", exc_info=True)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def main(interval: float) -> None:
+    # 한 번만 실행 (cron 등): python -m app.rerank
+    # 주기 실행: python -m app.rerank --interval 600
+    if interval > 0:
+        await run_reranker(asyncio.Event(), interval)
+    else:
+        await rerank_once()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(
+        description="Re-rank difficulty scores from pairwise comparisons"
+    )
+    parser.add_argument("--interval", type=float, default=settings.rerank_interval)
+    args = parser.parse_args()
+    asyncio.run(main(args.interval))
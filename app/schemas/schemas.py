@@ -1,5 +1,8 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Literal, Optional, List
+
+# 점수 산출 경로 (app.utils.knn 의 PATH_* 값)
+ScoringPath = Literal["existing", "knn", "llm_compare", "llm_analysis", "degraded_knn"]
 
 
 class ExperienceBase(BaseModel):
@@ -25,16 +28,45 @@ class ExperienceResponse(BaseModel):
     user_experience: ExperienceWithScore
     adjacent_experiences: AdjacentExperiences
     total_experiences: int
+    scoring_path: Optional[ScoringPath] = None
+    # 저장된 relative_difficulty 가 최근 쓰기보다 뒤처진 시간(초), 응답 값은 항상 최신
+    ranks_stale_seconds: float = 0.0
+
+
+class BatchEstimateRequest(BaseModel):
+    texts: List[str]
+
+
+class BatchEstimateItem(ExperienceBase):
+    experience: Optional[ExperienceWithScore] = None
+    error: Optional[str] = None
+    scoring_path: Optional[ScoringPath] = None
+
+
+class BatchEstimateResponse(BaseModel):
+    results: List[BatchEstimateItem]
+    created: int
+    total_experiences: int
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
+    result: Optional[ExperienceResponse] = None
+    error: Optional[str] = None
 
 
 class UserComparisonInput(BaseModel):
     experience_id: int
     is_more_difficult_than_lower: bool
     is_less_difficult_than_higher: bool
+    # 응답에서 보여준 이웃 경험 id (생략하면 현재 점수 기준 이웃을 사용)
+    lower_id: Optional[int] = None
+    higher_id: Optional[int] = None
 
 
 class FinalExperienceResponse(ExperienceWithScore):
-    pass
+    ranks_stale_seconds: float = 0.0
 
 
 class Config:
@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+from app.utils.embedding_index import EmbeddingIndex
+from app.utils.similarity import normalize
+
+logger = logging.getLogger(__name__)
+
+
+def spherical_kmeans(
+    vectors: np.ndarray, n_clusters: int, n_iter: int = 10, seed: int = 0
+) -> np.ndarray:
+    # 정규화된 벡터에 대해 내적 기준으로 군집화하고 중심도 단위 벡터로 유지
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        counts = np.bincount(assignments, minlength=n_clusters)
+        # 비어 있는 군집은 임의의 벡터로 다시 시드
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            sums[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+        centroids = normalize(sums)
+    return centroids
+
+
+class IVFIndex:
+    """k-means 중심(coarse quantizer)으로 나눈 역색인(IVF) 근사 최근접 이웃 인덱스.
+
+    검색 시 질의와 가까운 nprobe개의 리스트만 훑으므로 nprobe가 클수록 재현율이 오르고
+    느려진다. 학습에 필요한 벡터 수가 모이기 전까지는 단일 리스트(정확 검색)로 동작한다.
+    """
+
+    def __init__(
+        self,
+        nlist: int = 0,
+        nprobe: int = 8,
+        min_train_size: int = 10000,
+        train_sample_size: int = 50000,
+    ):
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self.train_sample_size = train_sample_size
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: list[EmbeddingIndex] = [EmbeddingIndex()]
+        self._dim: Optional[int] = None
+        self._size = 0
+        # load 마다 증가, 학습 중에 load 되었으면 학습 결과를 버린다
+        self._version = 0
+        # 학습 중에 add 된 벡터 (학습이 없으면 None)
+        self._replay: Optional[list[tuple[int, np.ndarray]]] = None
+        self._train_scheduled = False
+        self.rebuild_task: Optional[asyncio.Task] = None
+        self.is_loaded = False
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, experience_id: int) -> bool:
+        with self._lock:
+            lists = self._lists
+        return any(experience_id in lst for lst in lists)
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self._dim
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    def load(self, items: Iterable[tuple[int, Sequence[float]]]) -> None:
+        exact = EmbeddingIndex()
+        exact.load(items)
+        ids, vectors = exact.ids(), exact.vectors()
+        with self._lock:
+            self._version += 1
+        centroids, lists = self._train(ids, vectors)
+        with self._lock:
+            self._version += 1
+            self._install(centroids, lists, len(ids), exact.dim)
+        self.is_loaded = True
+
+    def rebuild(self) -> None:
+        # 중심이 데이터 분포에서 멀어졌을 때 현재 벡터로 다시 학습
+        # 학습은 스냅샷으로 하고, 그동안 add 된 벡터는 교체 직전에 새 리스트에 다시 넣는다
+        with self._rebuild_lock:
+            with self._lock:
+                version = self._version
+                ids = np.concatenate([lst.ids() for lst in self._lists])
+                vectors = np.concatenate(
+                    [lst.vectors() for lst in self._lists if len(lst)]
+                    or [np.empty((0, self._dim or 0), dtype=np.float32)]
+                )
+                self._replay = []
+            try:
+                centroids, lists = self._train(ids, vectors)
+                with self._lock:
+                    if self._version != version:
+                        logger.info("IVF index reloaded during rebuild, discarding")
+                        return
+                    for experience_id, vector in self._replay:
+                        self._route(centroids, lists, experience_id, vector)
+                    self._install(
+                        centroids, lists, len(ids) + len(self._replay), self._dim
+                    )
+            finally:
+                with self._lock:
+                    self._replay = None
+                    self._train_scheduled = False
+
+    async def _rebuild_in_background(self) -> None:
+        try:
+            await asyncio.to_thread(self.rebuild)
+        except Exception as e:
+            logger.error(f"IVF index rebuild failed: {str(e)}", exc_info=True)
+
+    def _train(
+        self, ids: np.ndarray, vectors: np.ndarray
+    ) -> tuple[Optional[np.ndarray], list[EmbeddingIndex]]:
+        size = len(ids)
+        if size < self.min_train_size:
+            lists = [EmbeddingIndex()]
+            lists[0].load(zip(ids.tolist(), vectors))
+            return None, lists
+
+        nlist = min(self.nlist or int(np.sqrt(size)), size)
+        rng = np.random.default_rng(0)
+        sample = vectors
+        if size > self.train_sample_size:
+            sample = vectors[rng.choice(size, self.train_sample_size, replace=False)]
+        started = time.perf_counter()
+        centroids = spherical_kmeans(sample, nlist)
+        assignments = self._assign(centroids, vectors)
+        lists = []
+        for list_no in range(nlist):
+            members = np.flatnonzero(assignments == list_no)
+            lst = EmbeddingIndex()
+            lst.load(zip(ids[members].tolist(), vectors[members]))
+            lists.append(lst)
+        logger.info(
+            f"IVF index trained: {size} vectors, nlist={nlist}, "
+            f"took {time.perf_counter() - started:.2f}s"
+        )
+        return centroids, lists
+
+    def _install(
+        self,
+        centroids: Optional[np.ndarray],
+        lists: list[EmbeddingIndex],
+        size: int,
+        dim: Optional[int],
+    ) -> None:
+        # self._lock 안에서 호출
+        self._centroids = centroids
+        self._lists = lists
+        self._dim = dim or self._dim
+        self._size = size
+
+    @staticmethod
+    def _route(
+        centroids: Optional[np.ndarray],
+        lists: list[EmbeddingIndex],
+        experience_id: int,
+        vector: np.ndarray,
+    ) -> None:
+        if centroids is None:
+            target = lists[0]
+        else:
+            target = lists[int(np.argmax(centroids @ vector))]
+        target.add(experience_id, vector)
+
+    @staticmethod
+    def _assign(
+        centroids: np.ndarray, vectors: np.ndarray, chunk_size: int = 8192
+    ) -> np.ndarray:
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk_size):
+            chunk = vectors[start : start + chunk_size]
+            assignments[start : start + chunk_size] = np.argmax(
+                chunk @ centroids.T, axis=1
+            )
+        return assignments
+
+    def add(self, experience_id: int, embedding: Sequence[float]) -> None:
+        vector = normalize(np.asarray(embedding, dtype=np.float32))
+        with self._lock:
+            self._route(self._centroids, self._lists, experience_id, vector)
+            if self._replay is not None:
+                self._replay.append((experience_id, vector))
+            self._dim = self._dim or vector.shape[0]
+            self._size += 1
+            should_train = (
+                self._centroids is None
+                and self._size >= self.min_train_size
+                and not self._train_scheduled
+            )
+            if should_train:
+                self._train_scheduled = True
+        if not should_train:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 이벤트 루프 밖(스크립트)에서는 바로 학습
+            self.rebuild()
+            return
+        # 요청 처리 중에는 k-means 를 스레드에서 돌리고, 끝날 때까지 기존 리스트로 검색
+        self.rebuild_task = loop.create_task(self._rebuild_in_background())
+
+    def search(
+        self, embedding: Sequence[float], k: int = 1, nprobe: Optional[int] = None
+    ) -> list[tuple[int, float]]:
+        with self._lock:
+            centroids = self._centroids
+            lists = self._lists
+        if centroids is None:
+            return lists[0].search(embedding, k)
+
+        query = normalize(np.asarray(embedding, dtype=np.float32))
+        nprobe = min(nprobe or self.nprobe, len(lists))
+        probe = np.argpartition(centroids @ query, -nprobe)[-nprobe:]
+
+        candidates = []
+        for list_no in probe:
+            candidates.extend(lists[list_no].search(query, k))
+        candidates.sort(key=lambda match: match[1], reverse=True)
+        return candidates[:k]
+
+    def search_batch(
+        self,
+        embeddings: Sequence[Sequence[float]],
+        k: int = 1,
+        nprobe: Optional[int] = None,
+    ) -> list[list[tuple[int, float]]]:
+        with self._lock:
+            centroids = self._centroids
+            lists = self._lists
+        if centroids is None:
+            return lists[0].search_batch(embeddings, k)
+        return [self.search(embedding, k, nprobe) for embedding in embeddings]
+
+
+def recall_report(
+    items: Sequence[tuple[int, Sequence[float]]],
+    queries: np.ndarray,
+    k: int = 10,
+    nprobes: Sequence[int] = (1, 2, 4, 8, 16, 32),
+    nlist: int = 0,
+) -> list[dict]:
+    # 정확 검색 결과를 기준으로 nprobe별 recall@k 와 평균 지연 시간을 측정
+    exact = EmbeddingIndex()
+    exact.load(items)
+    ivf = IVFIndex(nlist=nlist, min_train_size=1)
+    ivf.load(items)
+
+    started = time.perf_counter()
+    truth = [{i for i, _ in exact.search(q, k)} for q in queries]
+    exact_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+    report = [{"nprobe": None, "recall": 1.0, "latency_ms": exact_ms}]
+    for nprobe in nprobes:
+        started = time.perf_counter()
+        results = [ivf.search(q, k, nprobe=nprobe) for q in queries]
+        latency_ms = (time.perf_counter() - started) * 1000 / len(queries)
+        hits = sum(
+            len(expected & {i for i, _ in found})
+            for expected, found in zip(truth, results)
+        )
+        report.append(
+            {
+                "nprobe": nprobe,
+                "recall": hits / (len(queries) * k),
+                "latency_ms": latency_ms,
+            }
+        )
+    return report
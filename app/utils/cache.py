@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[Optional[float], Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class SQLiteStore:
+    """여러 워커 프로세스가 공유할 수 있는 로컬 SQLite key-value 저장소.
+
+    파일은 처음 읽거나 쓸 때 연다. 모든 메서드가 블로킹 I/O 이므로 이벤트 루프에서는
+    asyncio.to_thread 로 호출한다.
+    """
+
+    # set 이 이만큼 호출될 때마다 만료/초과 항목을 정리
+    PRUNE_INTERVAL = 100
+    # SQLite 의 바인드 변수 수 제한(999) 안에서 한 번에 조회할 키 수
+    GET_MANY_CHUNK = 500
+
+    def __init__(
+        self,
+        path: str,
+        table: str = "cache",
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+    ):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # self._lock 안에서 호출
+        if self._conn is not None:
+            return self._conn
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        table = self.table
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, created_at REAL NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if "created_at" not in columns:
+            conn.execute(
+                f"ALTER TABLE {table} ADD COLUMN created_at REAL NOT NULL DEFAULT 0"
+            )
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_created_at ON {table} (created_at)"
+        )
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        rows = []
+        try:
+            with self._lock:
+                conn = self._connection()
+                for start in range(0, len(keys), self.GET_MANY_CHUNK):
+                    chunk = keys[start : start + self.GET_MANY_CHUNK]
+                    rows.extend(
+                        conn.execute(
+                            f"SELECT key, value, created_at FROM {self.table} "
+                            f"WHERE key IN ({','.join('?' * len(chunk))})",
+                            chunk,
+                        ).fetchall()
+                    )
+        except (sqlite3.Error, OSError) as e:
+            # 캐시 장애가 요청 실패로 이어지지 않도록 miss 로 처리
+            logger.warning(f"Cache read failed: {e}")
+            return {}
+        now = time.time()
+        return {
+            key: value
+            for key, value, created_at in rows
+            if not (self.ttl and created_at + self.ttl <= now)
+        }
+
+    def set(self, key: str, value: bytes) -> None:
+        self.set_many([(key, value)])
+
+    def set_many(self, items: list[tuple[str, bytes]]) -> None:
+        if not items:
+            return
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, created_at) VALUES (?, ?, ?)",
+                    [(key, value, now) for key, value in items],
+                )
+                previous, interval = self._writes, self.PRUNE_INTERVAL
+                self._writes += len(items)
+                # PRUNE_INTERVAL 의 배수를 지날 때마다 정리
+                if previous // interval < self._writes // interval:
+                    self._prune()
+                conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Cache write failed: {e}")
+
+    def _prune(self) -> None:
+        if self.ttl:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE created_at <= ?",
+                (time.time() - self.ttl,),
+            )
+        if self.max_entries:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+
+class TieredCache:
+    """메모리 LRU 와 (선택) SQLite 저장소를 차례로 조회하는 문자열 캐시.
+
+    메모리 적중은 바로 돌려주고, 저장소 읽기/쓰기만 asyncio.to_thread 로 실행한다.
+    """
+
+    def __init__(self, memory: LRUCache, store: Optional[SQLiteStore] = None):
+        self.memory = memory
+        self.store = store
+        self.store_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        if self.store is not None:
+            blob = await asyncio.to_thread(self.store.get, key)
+            if blob is not None:
+                value = blob.decode("utf-8")
+                self.memory.set(key, value)
+                self.store_hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        if self.store is not None:
+            await asyncio.to_thread(self.store.set, key, value.encode("utf-8"))
+
+    def stats(self) -> dict:
+        memory = self.memory.stats()
+        return {
+            "size": memory["size"],
+            "memory_hits": memory["hits"],
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "evictions": memory["evictions"],
+            "expirations": memory["expirations"],
+        }
@@ -0,0 +1,32 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
+# 저장 형식
+#   array   : 기존 ARRAY(Float) 컬럼 (double precision)
+#   float32 : little-endian float32 바이트열 (4 bytes/dim)
+#   int8    : 벡터별 scale 을 곱해 복원하는 int8 스칼라 양자화 (1 byte/dim)
+EMBEDDING_STORAGES = ("array", "float32", "int8")
+
+FLOAT32 = np.dtype("<f4")
+
+
+def encode_embedding(
+    embedding: Sequence[float], storage: str
+) -> tuple[bytes, Optional[float]]:
+    vector = np.asarray(embedding, dtype=FLOAT32)
+    if storage == "float32":
+        return vector.tobytes(), None
+    if storage == "int8":
+        max_abs = float(np.max(np.abs(vector))) if vector.size else 0.0
+        scale = max_abs / 127 if max_abs > 0 else 1.0
+        quantized = np.clip(np.rint(vector / scale), -127, 127).astype(np.int8)
+        return quantized.tobytes(), scale
+    raise ValueError(f"Unsupported binary embedding storage: {storage}")
+
+
+def decode_embedding(blob: bytes, scale: Optional[float] = None) -> np.ndarray:
+    # scale 이 없으면 float32 그대로 (np.frombuffer 로 복사 없이 읽기 전용 뷰 반환)
+    if scale is None:
+        return np.frombuffer(blob, dtype=FLOAT32)
+    return np.frombuffer(blob, dtype=np.int8).astype(np.float32) * np.float32(scale)
@@ -0,0 +1,161 @@
+import logging
+import threading
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+from app.utils.similarity import normalize, top_k
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingIndex:
+    """정규화된 float32 임베딩 행렬과 id 배열을 메모리에 유지하는 정확(brute-force) 검색 인덱스."""
+
+    def __init__(self, initial_capacity: int = 1024):
+        self._lock = threading.Lock()
+        self._initial_capacity = initial_capacity
+        self._dim: Optional[int] = None
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._id_set: set[int] = set()
+        self._size = 0
+        self.is_loaded = False
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, experience_id: int) -> bool:
+        return experience_id in self._id_set
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self._dim
+
+    def ids(self) -> np.ndarray:
+        with self._lock:
+            return self._ids[: self._size].copy()
+
+    def vectors(self) -> np.ndarray:
+        with self._lock:
+            return self._vectors[: self._size].copy()
+
+    def load(self, items: Iterable[tuple[int, Sequence[float]]]) -> None:
+        ids = []
+        vectors = []
+        dim = None
+        for experience_id, embedding in items:
+            if embedding is None:
+                continue
+            if dim is None:
+                dim = len(embedding)
+            if len(embedding) != dim:
+                logger.warning(
+                    f"Skipping experience {experience_id}: embedding dim {len(embedding)} != {dim}"
+                )
+                continue
+            ids.append(experience_id)
+            vectors.append(embedding)
+
+        size = len(ids)
+        capacity = max(self._initial_capacity, size)
+        matrix = np.zeros((capacity, dim or 0), dtype=np.float32)
+        id_array = np.zeros(capacity, dtype=np.int64)
+        if size:
+            matrix[:size] = normalize(np.asarray(vectors, dtype=np.float32))
+            id_array[:size] = ids
+
+        with self._lock:
+            self._dim = dim
+            self._vectors = matrix
+            self._ids = id_array
+            self._id_set = set(ids)
+            self._size = size
+            self.is_loaded = True
+        logger.debug(f"Embedding index loaded with {size} vectors (dim={dim})")
+
+    def add(self, experience_id: int, embedding: Sequence[float]) -> None:
+        vector = normalize(np.asarray(embedding, dtype=np.float32))
+        with self._lock:
+            if self._dim is None:
+                self._dim = vector.shape[0]
+                self._vectors = np.zeros(
+                    (self._initial_capacity, self._dim), dtype=np.float32
+                )
+                self._ids = np.zeros(self._initial_capacity, dtype=np.int64)
+            if vector.shape[0] != self._dim:
+                raise ValueError(
+                    f"Embedding dim {vector.shape[0]} does not match index dim {self._dim}"
+                )
+            if self._size == self._vectors.shape[0]:
+                # 용량이 부족하면 두 배로 늘려 재할당 (상각 O(1) 추가)
+                capacity = max(self._initial_capacity, self._size * 2)
+                vectors = np.zeros((capacity, self._dim), dtype=np.float32)
+                ids = np.zeros(capacity, dtype=np.int64)
+                vectors[: self._size] = self._vectors[: self._size]
+                ids[: self._size] = self._ids[: self._size]
+                self._vectors = vectors
+                self._ids = ids
+            self._vectors[self._size] = vector
+            self._ids[self._size] = experience_id
+            self._id_set.add(experience_id)
+            self._size += 1
+
+    def search(self, embedding: Sequence[float], k: int = 1) -> list[tuple[int, float]]:
+        with self._lock:
+            size = self._size
+            vectors = self._vectors[:size]
+            ids = self._ids[:size]
+        if size == 0 or k <= 0:
+            return []
+
+        query = normalize(np.asarray(embedding, dtype=np.float32))
+        if query.shape[0] != vectors.shape[1]:
+            raise ValueError(
+                f"Query dim {query.shape[0]} does not match index dim {vectors.shape[1]}"
+            )
+        top, top_scores = top_k(vectors @ query, k)
+        return [(int(ids[i]), float(score)) for i, score in zip(top, top_scores)]
+
+    def search_batch(
+        self, embeddings: Sequence[Sequence[float]], k: int = 1
+    ) -> list[list[tuple[int, float]]]:
+        # 여러 질의를 행렬곱 한 번으로 처리
+        with self._lock:
+            size = self._size
+            vectors = self._vectors[:size]
+            ids = self._ids[:size]
+        if len(embeddings) == 0:
+            return []
+        if size == 0 or k <= 0:
+            return [[] for _ in embeddings]
+
+        queries = normalize(np.asarray(embeddings, dtype=np.float32))
+        if queries.shape[1] != vectors.shape[1]:
+            raise ValueError(
+                f"Query dim {queries.shape[1]} does not match index dim {vectors.shape[1]}"
+            )
+        top, top_scores = top_k(queries @ vectors.T, k)
+        return [
+            [(int(ids[i]), float(score)) for i, score in zip(row, row_scores)]
+            for row, row_scores in zip(top, top_scores)
+        ]
+
+
+def create_embedding_index():
+    from app.config import settings
+
+    if settings.similarity_backend == "ivf":
+        from app.utils.ann import IVFIndex
+
+        return IVFIndex(
+            nlist=settings.ivf_nlist,
+            nprobe=settings.ivf_nprobe,
+            min_train_size=settings.ivf_min_train_size,
+        )
+    if settings.similarity_backend != "exact":
+        raise ValueError(f"Unknown similarity backend: {settings.similarity_backend}")
+    return EmbeddingIndex()
+
+
+embedding_index = create_embedding_index()
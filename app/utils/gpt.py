@@ -1,19 +1,317 @@
+import asyncio
 import os
 import json
-from openai import OpenAI
+import sys
+import time
+from contextvars import ContextVar
+from typing import Annotated, Any, Callable, TypeVar
+import numpy as np
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    InternalServerError,
+    RateLimitError,
+)
 from dotenv import load_dotenv
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from app.config import settings
+from app.utils.cache import LRUCache, SQLiteStore, TieredCache
+from app.utils.metrics import (
+    llm_hedges,
+    llm_queue_seconds,
+    llm_request_seconds,
+    llm_requests,
+    llm_tokens,
+)
+from app.utils.rate_limit import RateLimitScheduler, llm_lane
+from app.utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    HedgeBudget,
+    LatencyTracker,
+    run_hedged,
+)
+from app.utils.text import normalize_text, text_digest
 
 load_dotenv()
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# 재시도는 SDK 의 고정 backoff 대신 openai_scheduler 를 거쳐 call_openai 에서 처리
+client = AsyncOpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    base_url=settings.openai_base_url or None,
+    max_retries=0,
+)
+openai_scheduler = RateLimitScheduler(
+    max_concurrency=settings.openai_max_concurrency or sys.maxsize,
+    rpm=settings.openai_rpm,
+    tpm=settings.openai_tpm,
+    model_limits=settings.openai_model_limits,
+    burst_seconds=settings.openai_burst_seconds,
+    utilization=settings.openai_limit_utilization,
+    max_backoff=settings.openai_max_backoff,
+)
+# 모델별 circuit breaker 와 hedge 지연 계산용 최근 지연 기록
+circuit_breakers: dict[str, CircuitBreaker] = {}
+latency_tracker = LatencyTracker()
+hedge_budget = HedgeBudget(settings.llm_hedge_budget)
 
+METRIC_COUNT = 10
+EMBEDDING_MODEL = "text-embedding-3-large"
+EMBEDDING_BATCH_SIZE = 2048  # embeddings API 의 요청당 최대 input 개수
 
-def get_embedding(text: str) -> list[float]:
-    response = client.embeddings.create(input=text, model="text-embedding-3-large")
-    return response.data[0].embedding
+# 임베딩 캐시: 프로세스 내 LRU + (선택) 로컬 SQLite 파일 (파일은 처음 사용할 때 연다)
+embedding_memory_cache = LRUCache(maxsize=settings.embedding_cache_size)
+embedding_store = (
+    SQLiteStore(settings.embedding_cache_path, table="embeddings")
+    if settings.embedding_cache_path
+    else None
+)
 
 
-def get_difficulty_scores(experience: str) -> list[float]:
+# chat completion 응답 캐시: (model, prompt, 입력, temperature 등) 요청 파라미터가 키
+llm_response_cache = TieredCache(
+    LRUCache(maxsize=settings.llm_cache_size, ttl=settings.llm_cache_ttl or None),
+    (
+        SQLiteStore(
+            settings.llm_cache_path,
+            table="chat_completions",
+            ttl=settings.llm_cache_ttl or None,
+            max_entries=settings.llm_cache_max_entries or None,
+        )
+        if settings.llm_cache_path
+        else None
+    ),
+)
+# True 로 설정된 컨텍스트(요청)에서는 캐시를 읽지 않고 새로 받아 덮어쓴다
+llm_cache_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+T = TypeVar("T")
+
+
+def estimate_tokens(kind: str, params: dict) -> int:
+    # 스케줄러의 토큰 버킷용 대략적인 추정 (약 4글자당 1토큰), 응답의 usage 로 보정한다
+    if kind == "embedding":
+        texts = params["input"] if isinstance(params["input"], list) else [params["input"]]
+        return sum(len(text) for text in texts) // 4 + 1
+    prompt = sum(len(message["content"]) for message in params.get("messages", []))
+    return prompt // 4 + params.get("max_tokens", 0) + 1
+
+
+def circuit_breaker(model: str) -> CircuitBreaker:
+    breaker = circuit_breakers.get(model)
+    if breaker is None:
+        breaker = circuit_breakers[model] = CircuitBreaker(
+            model,
+            window=settings.llm_circuit_window,
+            min_calls=settings.llm_circuit_min_calls,
+            failure_rate=settings.llm_circuit_failure_rate,
+            slow_call_seconds=settings.llm_circuit_slow_call_seconds,
+            open_seconds=settings.llm_circuit_open_seconds,
+            half_open_calls=settings.llm_circuit_half_open_calls,
+        )
+    return breaker
+
+
+async def call_openai(kind: str, model: str, create: Callable, **params: Any):
+    # create 는 with_raw_response 메서드: 응답 헤더의 rate limit 정보로 스케줄러를 보정
+    # 429/일시 오류는 스케줄러를 다시 거쳐 재시도하고, 호출 결과/지연/토큰은 metrics 에 기록
+    # circuit 이 열려 있으면 대기열에 쌓지 않고 CircuitOpenError 로 바로 실패
+    lane = llm_lane.get()
+    estimated = estimate_tokens(kind, params)
+    timeout = (
+        settings.openai_embedding_timeout
+        if kind == "embedding"
+        else settings.openai_chat_timeout
+    )
+    breaker = circuit_breaker(model) if settings.llm_circuit_enabled else None
+    for attempt in range(settings.openai_max_retries + 1):
+        generation = breaker.allow() if breaker else None
+        if breaker and generation is None:
+            llm_requests.inc(kind, model, "circuit_open")
+            raise CircuitOpenError(model, breaker.retry_after())
+        healthy = None  # circuit 에 반영할 결과 (None 이면 판단하지 않음)
+        try:
+            queued = time.perf_counter()
+            try:
+                await asyncio.wait_for(
+                    openai_scheduler.acquire(model, estimated, lane),
+                    settings.openai_queue_timeout or None,
+                )
+            except asyncio.TimeoutError:
+                llm_requests.inc(kind, model, "queue_timeout")
+                raise
+            llm_queue_seconds.observe(time.perf_counter() - queued, model, lane)
+
+            started = time.perf_counter()
+            try:
+                raw = await create(model=model, timeout=timeout, **params)
+            except RateLimitError as e:
+                openai_scheduler.observe_rate_limit(model, e.response.headers)
+                llm_requests.inc(kind, model, "rate_limited")
+                if attempt == settings.openai_max_retries:
+                    raise
+                continue
+            except (APITimeoutError, APIConnectionError, InternalServerError):
+                healthy = False
+                llm_requests.inc(kind, model, "error")
+                if attempt == settings.openai_max_retries:
+                    raise
+                await asyncio.sleep(min(0.5 * 2**attempt, settings.openai_max_backoff))
+                continue
+            except Exception:
+                llm_requests.inc(kind, model, "error")
+                raise
+            finally:
+                openai_scheduler.release()
+                elapsed = time.perf_counter() - started
+                llm_request_seconds.observe(elapsed, kind, model)
+
+            healthy = True
+            latency_tracker.observe(model, elapsed)
+        finally:
+            if breaker and healthy is None:
+                breaker.release(generation)
+            elif breaker:
+                breaker.record(generation, healthy, elapsed)
+
+        openai_scheduler.observe_headers(model, raw.headers)
+        response = raw.parse()
+        llm_requests.inc(kind, model, "ok")
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            openai_scheduler.record_usage(model, estimated, usage.total_tokens or 0)
+            llm_tokens.inc(model, "prompt", value=usage.prompt_tokens or 0)
+            llm_tokens.inc(
+                model, "completion", value=getattr(usage, "completion_tokens", 0) or 0
+            )
+        return response
+
+
+async def call_openai_hedged(kind: str, model: str, create: Callable, **params: Any):
+    # 최근 성공 지연의 분위수(기본 p95) 만큼 기다려도 응답이 없으면 같은 호출을 한 번 더 보낸다
+    delay = None
+    if settings.llm_hedging_enabled:
+        delay = latency_tracker.quantile(
+            model, settings.llm_hedge_quantile, settings.llm_hedge_min_samples
+        )
+    if delay is None:
+        return await call_openai(kind, model, create, **params)
+    return await run_hedged(
+        lambda: call_openai(kind, model, create, **params),
+        max(delay, settings.llm_hedge_min_delay),
+        hedge_budget,
+        on_hedge=lambda outcome: llm_hedges.inc(model, outcome),
+    )
+
+
+async def create_chat_completion(parse: Callable[[str], T], **params: Any) -> T:
+    # 파싱에 성공한 응답만 캐시해 잘못된 응답이 계속 재사용되지 않도록 한다
+    key = text_digest(json.dumps(params, sort_keys=True, ensure_ascii=False))
+    if settings.llm_cache_enabled:
+        if llm_cache_bypass.get():
+            llm_response_cache.bypassed += 1
+        else:
+            content = await llm_response_cache.get(key)
+            if content is not None:
+                llm_requests.inc("chat", params.get("model"), "cache_hit")
+                return parse(content)
+
+    response = await call_openai_hedged(
+        "chat", create=client.chat.completions.with_raw_response.create, **params
+    )
+    content = response.choices[0].message.content
+    result = parse(content)
+    if settings.llm_cache_enabled:
+        await llm_response_cache.set(key, content)
+    return result
+
+
+def embedding_cache_key(text: str, model: str = EMBEDDING_MODEL) -> str:
+    return text_digest(model, normalize_text(text))
+
+
+async def get_cached_embeddings(keys: list[str]) -> dict[str, np.ndarray]:
+    # 메모리에 없는 키만 SQLite 에서 한 번에 읽는다 (파일 I/O 는 이벤트 루프 밖 스레드에서)
+    cached: dict[str, np.ndarray] = {}
+    missing = []
+    for key in keys:
+        vector = embedding_memory_cache.get(key)
+        if vector is None:
+            missing.append(key)
+        else:
+            cached[key] = vector
+    if missing and embedding_store is not None:
+        blobs = await asyncio.to_thread(embedding_store.get_many, missing)
+        for key, blob in blobs.items():
+            vector = np.frombuffer(blob, dtype="<f4")
+            embedding_memory_cache.set(key, vector)
+            cached[key] = vector
+    return cached
+
+
+async def cache_embeddings(embeddings: dict[str, list[float]]) -> dict[str, np.ndarray]:
+    # 저장한 float32 벡터를 돌려준다 (캐시 적중 여부와 관계없이 같은 값을 쓰도록)
+    vectors = {
+        key: np.asarray(embedding, dtype="<f4") for key, embedding in embeddings.items()
+    }
+    for key, vector in vectors.items():
+        embedding_memory_cache.set(key, vector)
+    if embedding_store is not None:
+        await asyncio.to_thread(
+            embedding_store.set_many,
+            [(key, vector.tobytes()) for key, vector in vectors.items()],
+        )
+    return vectors
+
+
+async def get_embedding(text: str) -> list[float]:
+    key = embedding_cache_key(text)
+    cached = (await get_cached_embeddings([key])).get(key)
+    if cached is not None:
+        llm_requests.inc("embedding", EMBEDDING_MODEL, "cache_hit")
+        return cached.tolist()
+
+    response = await call_openai(
+        "embedding", EMBEDDING_MODEL, client.embeddings.with_raw_response.create, input=text
+    )
+    vectors = await cache_embeddings({key: response.data[0].embedding})
+    return vectors[key].tolist()
+
+
+async def get_embeddings(
+    texts: list[str], chunk_size: int = EMBEDDING_BATCH_SIZE
+) -> list[list[float]]:
+    # 캐시에 없는 텍스트만 모아 input 리스트로 한 번에 요청
+    keys = [embedding_cache_key(text) for text in texts]
+    cached = await get_cached_embeddings(list(dict.fromkeys(keys)))
+    embeddings: dict[str, list[float]] = {}
+    missing: dict[str, str] = {}
+    for key, text in zip(keys, texts):
+        if key in cached:
+            llm_requests.inc("embedding", EMBEDDING_MODEL, "cache_hit")
+            embeddings[key] = cached[key].tolist()
+        else:
+            missing.setdefault(key, text)
+
+    missing_keys = list(missing)
+    for start in range(0, len(missing_keys), chunk_size):
+        chunk = missing_keys[start : start + chunk_size]
+        response = await call_openai(
+            "embedding",
+            EMBEDDING_MODEL,
+            client.embeddings.with_raw_response.create,
+            input=[missing[key] for key in chunk],
+        )
+        fetched = await cache_embeddings(
+            {chunk[item.index]: item.embedding for item in response.data}
+        )
+        embeddings.update((key, vector.tolist()) for key, vector in fetched.items())
+
+    return [embeddings[key] for key in keys]
+
+
+async def get_difficulty_scores(experience: str) -> list[float]:
     INITIAL_PROMPT = """You are an AI assistant specialized in estimating the difficulty of various life experiences. You will receive descriptions of experiences and should respond with a difficulty assessment based on the following 10 metrics:
 
     1. 육체적 힘듦 (Physical Difficulty)
@@ -33,7 +331,8 @@ def get_difficulty_scores(experience: str) -> list[float]:
 
     Respond with a JSON array of 10 numbers representing the scores for each metric in the order listed above. Your response should only contain this JSON array, no additional text."""
 
-    response = client.chat.completions.create(
+    return await create_chat_completion(
+        parse_difficulty_scores,
         model="gpt-3.5-turbo-0125",
         max_tokens=100,
         messages=[
@@ -42,41 +341,74 @@ def get_difficulty_scores(experience: str) -> list[float]:
         ],
         temperature=0.7,
     )
-    return json.loads(response.choices[0].message.content)
 
 
-def get_single_difficulty_score(experience: str) -> float:
-    PROMPT = """You are an AI assistant specialized in estimating the overall difficulty of various life experiences. You will receive a description of an experience and should respond with a single difficulty score.
+# 0~100 사이의 유한한 숫자만 허용 (true/"50" 같은 값을 숫자로 바꾸지 않는다)
+Score = Annotated[float, Field(strict=True, ge=0, le=100, allow_inf_nan=False)]
+Metrics = Annotated[list[Score], Field(min_length=METRIC_COUNT, max_length=METRIC_COUNT)]
+
+difficulty_scores_adapter = TypeAdapter(Metrics)
+
+
+def parse_difficulty_scores(content: str) -> list[float]:
+    try:
+        return difficulty_scores_adapter.validate_json(content)
+    except ValidationError as e:
+        raise ValueError(f"Invalid difficulty scores from GPT: {e}") from e
+
+
+class DifficultyAssessment(BaseModel):
+    overall: Score
+    metrics: Metrics
+
+
+async def get_difficulty_assessment(experience: str) -> DifficultyAssessment:
+    # 전체 점수와 10개 지표를 한 번의 JSON 응답으로 받는다
+    PROMPT = """You are an AI assistant specialized in estimating the difficulty of various life experiences. You will receive a description of an experience and should respond with an overall difficulty score and a difficulty assessment based on the following 10 metrics:
+
+    1. 육체적 힘듦 (Physical Difficulty)
+    2. 정신적 노력 (Mental Effort)
+    3. 시간 투자 (Time Investment)
+    4. 기술적 복잡성 (Technical Complexity)
+    5. 사회적 도전 (Social Challenge)
+    6. 재정적 부담 (Financial Burden)
+    7. 위험도 (Risk Level)
+    8. 지속성 요구 (Persistence Required)
+    9. 창의성 요구 (Creativity Needed)
+    10. 희소성 (Rarity)
 
-    Provide a score from 0 to 100, where 0 is extremely easy/common and 100 is extremely difficult/rare.
+    Every score is from 0 to 100, where 0 is extremely easy/common and 100 is extremely difficult/rare. The overall score may have up to two decimal places.
 
-    Consider factors like physical difficulty, mental effort, time investment, technical complexity, social challenge, financial burden, risk level, persistence required, creativity needed, and rarity.
+    Consider factors like duration, consistency, intensity, time commitment, complexity, social implications, financial costs, risks, persistence required, creativity needed, and rarity.
 
-    Your response should be a single number between 0 and 100, with up to two decimal places. Do not include any additional text or explanation."""
+    Respond with a JSON object of the form {"overall": <number>, "metrics": [<10 numbers in the order listed above>]} and nothing else."""
 
-    response = client.chat.completions.create(
+    return await create_chat_completion(
+        parse_difficulty_assessment,
         model="gpt-3.5-turbo-0125",
-        max_tokens=10,
+        max_tokens=150,
+        response_format={"type": "json_object"},
         messages=[
             {"role": "system", "content": PROMPT},
-            {
-                "role": "user",
-                "content": f"Estimate the overall difficulty of: {experience}",
-            },
+            {"role": "user", "content": f"Estimate the difficulty of: {experience}"},
         ],
         temperature=0.7,
     )
-    return float(response.choices[0].message.content.strip())
 
 
-def analyze_experience(experience: str) -> dict:
-    single_score = get_single_difficulty_score(experience)
-    detailed_scores = get_difficulty_scores(experience)
+def parse_difficulty_assessment(content: str) -> DifficultyAssessment:
+    try:
+        return DifficultyAssessment.model_validate_json(content)
+    except ValidationError as e:
+        raise ValueError(f"Invalid difficulty assessment from GPT: {e}") from e
 
-    return {"single_score": single_score, "detailed_scores": detailed_scores}
 
+async def analyze_experience(experience: str) -> dict:
+    assessment = await get_difficulty_assessment(experience)
+    return {"single_score": assessment.overall, "detailed_scores": assessment.metrics}
 
-def compare_experience_difficulties(
+
+async def compare_experience_difficulties(
     new_experience: str, existing_experience: str, existing_score: float
 ) -> float:
     PROMPT = f"""Compare the difficulty of two experiences. The first experience has a known difficulty score of {existing_score} out of 100.
@@ -86,7 +418,8 @@ def compare_experience_difficulties(
 
     Estimate the difficulty score for Experience 2 relative to Experience 1. Your response should be a single number between 0 and 100, with up to two decimal places. Do not include any additional text or explanation."""
 
-    response = client.chat.completions.create(
+    return await create_chat_completion(
+        parse_score,
         model="gpt-3.5-turbo-0125",
         max_tokens=10,
         messages=[
@@ -98,4 +431,14 @@ def compare_experience_difficulties(
         ],
         temperature=0.7,
     )
-    return float(response.choices[0].message.content.strip())
+
+
+def parse_score(content: str) -> float:
+    try:
+        score = float(content.strip())
+    except ValueError as e:
+        raise ValueError(f"Invalid difficulty score from GPT: {content!r}") from e
+    # nan/inf 와 범위를 벗어난 값은 저장하지 않는다 (nan 은 비교가 모두 False)
+    if not 0 <= score <= 100:
+        raise ValueError(f"Invalid difficulty score from GPT: {content!r}")
+    return score
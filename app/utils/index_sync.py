@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+
+class IndexSync:
+    """다른 프로세스의 쓰기를 메모리 인덱스에 반영하기 위한 기준 시각.
+
+    인덱스를 읽기 직전 시각을 기록해 두고, 주기적으로 그 뒤에 저장된 행(created_at)과
+    점수가 바뀐 행(score_updated_at)을 다시 읽는다. 두 시각은 커밋 시각이 아니고 서버마다
+    시계도 조금씩 다르므로 lookback 만큼 겹쳐 읽는다. 이미 반영한 행을 다시 읽어도 결과는 같다.
+    """
+
+    def __init__(self):
+        self.synced_at: Optional[datetime] = None
+
+    def loaded(self, started_at: datetime) -> None:
+        # 인덱스 하나를 DB 에서 전부 다시 읽었을 때 (읽기 시작한 시각)
+        if self.synced_at is None or started_at < self.synced_at:
+            self.synced_at = started_at
+
+    def since(self, lookback: float) -> Optional[datetime]:
+        if self.synced_at is None:
+            return None
+        return self.synced_at - timedelta(seconds=lookback)
+
+    def synced(self, started_at: datetime) -> None:
+        self.synced_at = started_at
+
+
+index_sync = IndexSync()
@@ -0,0 +1,48 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
+# 점수 산출 경로 (응답의 scoring_path)
+PATH_EXISTING = "existing"  # 동일한 텍스트가 이미 저장되어 있음
+PATH_KNN = "knn"  # 이웃 점수의 가중 평균, LLM 호출 없음
+PATH_LLM_COMPARE = "llm_compare"  # 유사 경험과 LLM 비교 + 세부 지표
+PATH_LLM_ANALYSIS = "llm_analysis"  # 유사 경험 없이 LLM 분석
+PATH_DEGRADED = "degraded_knn"  # LLM circuit 이 열려 있어 완화된 조건의 이웃 평균으로 대체
+
+
+def weighted_std(values: np.ndarray, weights: np.ndarray, mean) -> np.ndarray:
+    return np.sqrt(np.average((values - mean) ** 2, axis=0, weights=weights))
+
+
+def predict_from_neighbours(
+    neighbours: Sequence[tuple[float, Optional[float], Optional[Sequence[float]]]],
+    metric_count: int,
+    min_similarity: float,
+    min_neighbours: int,
+    max_score_std: float,
+    max_metric_std: float,
+) -> Optional[tuple[float, list[float]]]:
+    # neighbours: (유사도, difficulty_score, difficulty_scores) 목록
+    # 충분히 가깝고 점수가 서로 일치하는 이웃만 있을 때 유사도 가중 평균을 반환, 아니면 None
+    usable = [
+        (similarity, score, metrics)
+        for similarity, score, metrics in neighbours
+        if similarity >= min_similarity
+        and score is not None
+        and metrics is not None
+        and len(metrics) == metric_count
+    ]
+    if not usable or len(usable) < min_neighbours:
+        return None
+
+    weights = np.asarray([similarity for similarity, _, _ in usable], dtype=np.float64)
+    scores = np.asarray([score for _, score, _ in usable], dtype=np.float64)
+    metrics = np.asarray([metrics for _, _, metrics in usable], dtype=np.float64)
+
+    score = np.average(scores, weights=weights)
+    if weighted_std(scores, weights, score) > max_score_std:
+        return None
+    metric_means = np.average(metrics, axis=0, weights=weights)
+    if np.max(weighted_std(metrics, weights, metric_means)) > max_metric_std:
+        return None
+    return round(float(score), 2), [round(float(m), 2) for m in metric_means]
@@ -0,0 +1,236 @@
+import functools
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional, Sequence
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def format_labels(labelnames: Sequence[str], labels: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, labels)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, value: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + value
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # 라벨 조합별 [버킷별 개수(+Inf 포함), 합계, 개수]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for labels, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                le = format_labels(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            suffix = format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+class CallbackGauge:
+    """렌더링할 때마다 callback 으로 값을 읽는 gauge (캐시 크기/적중 수 등)."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], dict[tuple, float]],
+        labelnames: Sequence[str] = (),
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+        ]
+        for labels, value in self.callback().items():
+            lines.append(f"{self.name}{format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_seconds = registry.register(
+    Histogram(
+        "http_request_seconds", "HTTP request latency", ("method", "route", "status")
+    )
+)
+http_request_db_queries = registry.register(
+    Histogram(
+        "http_request_db_queries",
+        "Database queries per HTTP request",
+        buckets=(0, 1, 2, 5, 10, 20, 50, 100, 500),
+    )
+)
+stage_seconds = registry.register(
+    Histogram("estimate_stage_seconds", "Estimate pipeline stage latency", ("stage",))
+)
+crud_seconds = registry.register(
+    Histogram("crud_call_seconds", "crud function latency", ("function",))
+)
+db_query_seconds = registry.register(
+    Histogram("db_query_seconds", "Database query latency")
+)
+llm_requests = registry.register(
+    Counter(
+        "llm_requests_total",
+        "OpenAI calls by kind, model and outcome "
+        "(ok/error/cache_hit/rate_limited/queue_timeout/circuit_open)",
+        ("kind", "model", "outcome"),
+    )
+)
+llm_request_seconds = registry.register(
+    Histogram("llm_request_seconds", "OpenAI call latency", ("kind", "model"))
+)
+llm_queue_seconds = registry.register(
+    Histogram(
+        "llm_queue_seconds",
+        "Time OpenAI calls wait in the rate limit scheduler",
+        ("model", "lane"),
+    )
+)
+llm_hedges = registry.register(
+    Counter(
+        "llm_hedges_total",
+        "Hedged OpenAI calls by outcome (issued/won/skipped over budget)",
+        ("model", "outcome"),
+    )
+)
+llm_tokens = registry.register(
+    Counter("llm_tokens_total", "OpenAI tokens used", ("model", "type"))
+)
+scoring_paths = registry.register(
+    Counter("estimate_scoring_path_total", "New estimates by scoring path", ("path",))
+)
+
+
+class RequestMetrics:
+    __slots__ = ("stages", "db_queries", "db_seconds")
+
+    def __init__(self):
+        self.stages: dict[str, float] = {}
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+    def server_timing(self, total: float) -> str:
+        # Server-Timing 헤더 값 (ms)
+        parts = [
+            f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()
+        ]
+        parts.append(
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries"'
+        )
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+current_request: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    "current_request_metrics", default=None
+)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    stage_seconds.observe(seconds, stage)
+    request = current_request.get()
+    if request is not None:
+        request.stages[stage] = request.stages.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def track_stage(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+def record_db_query(seconds: float) -> None:
+    db_query_seconds.observe(seconds)
+    request = current_request.get()
+    if request is not None:
+        request.db_queries += 1
+        request.db_seconds += seconds
+
+
+def timed(histogram: Histogram, label: str):
+    # 코루틴 함수의 실행 시간을 histogram 에 기록하는 데코레이터
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, label)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,74 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RankRefresher:
+    """쓰기 때마다 순위를 dirty 로 표시하고, interval 동안 모인 쓰기를 한 번의 재계산으로 합친다."""
+
+    def __init__(self, interval: float = 5.0):
+        self.interval = interval
+        self._dirty = asyncio.Event()
+        self.dirty_since: Optional[float] = None
+        self.refreshed_at: Optional[float] = None
+        self.refreshes = 0
+        self.coalesced_writes = 0
+        self._pending_writes = 0
+
+    def mark_dirty(self) -> None:
+        if self.dirty_since is None:
+            self.dirty_since = time.time()
+        self._pending_writes += 1
+        self._dirty.set()
+
+    def staleness(self) -> float:
+        # 저장된 relative_difficulty 가 마지막 쓰기보다 뒤처진 시간(초), 최신이면 0
+        if self.dirty_since is None:
+            return 0.0
+        return round(time.time() - self.dirty_since, 3)
+
+    async def run(
+        self, stop: asyncio.Event, refresh: Callable[[], Awaitable[None]]
+    ) -> None:
+        while not stop.is_set():
+            waiter = asyncio.create_task(self._dirty.wait())
+            stopper = asyncio.create_task(stop.wait())
+            await asyncio.wait({waiter, stopper}, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            stopper.cancel()
+            if stop.is_set():
+                break
+            # 첫 쓰기 이후 interval 만큼 기다려 그동안의 쓰기를 한 번에 반영
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.refresh_now(refresh)
+
+    async def refresh_now(self, refresh: Callable[[], Awaitable[None]]) -> None:
+        self._dirty.clear()
+        dirty_since, writes = self.dirty_since, self._pending_writes
+        self.dirty_since, self._pending_writes = None, 0
+        started = time.perf_counter()
+        try:
+            await refresh()
+        except Exception as e:
+            logger.error(f"Rank refresh failed: {str(e)}", exc_info=True)
+            # 다음 주기에 다시 시도
+            self.dirty_since = dirty_since
+            self._pending_writes += writes
+            self._dirty.set()
+            return
+        self.refreshed_at = time.time()
+        self.refreshes += 1
+        self.coalesced_writes += writes
+        logger.info(
+            f"Relative difficulties refreshed for {writes} writes "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+
+
+rank_refresher = RankRefresher()
@@ -0,0 +1,59 @@
+import logging
+import time
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 한 반복에서 점수가 움직일 수 있는 최대 폭 (scale 단위)
+MAX_STEP = 1.0
+
+
+def fit_bradley_terry(
+    winners: np.ndarray,
+    losers: np.ndarray,
+    prior: np.ndarray,
+    scale: float = 10.0,
+    prior_weight: float = 1.0,
+    max_iter: int = 100,
+    tol: float = 1e-4,
+    initial: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """쌍대 비교 (winner 가 loser 보다 어렵다) 로 Bradley–Terry 점수를 MAP 추정한다.
+
+    P(i 가 j 보다 어렵다) = sigmoid((s_i - s_j) / scale) 이고, 각 점수에는 prior(모델이
+    처음 매긴 점수)를 평균으로 하는 가우시안 사전분포를 둔다. 비교가 없는 항목은
+    prior 를 그대로 유지한다. 매 반복은 bincount 로 계산한 대각 Newton 단계이고,
+    곡률이 작은 곳에서 단계가 튀어 진동하지 않도록 MAX_STEP 으로 자른다.
+    """
+    n = len(prior)
+    prior = np.asarray(prior, dtype=np.float64) / scale
+    theta = prior.copy() if initial is None else np.asarray(initial) / scale
+    if len(winners) == 0:
+        return theta * scale
+
+    started = time.perf_counter()
+    for iteration in range(max_iter):
+        p = 1.0 / (1.0 + np.exp(theta[losers] - theta[winners]))
+        residual = 1.0 - p
+        curvature = p * residual
+        gradient = (
+            np.bincount(winners, residual, minlength=n)
+            - np.bincount(losers, residual, minlength=n)
+            - prior_weight * (theta - prior)
+        )
+        hessian = (
+            np.bincount(winners, curvature, minlength=n)
+            + np.bincount(losers, curvature, minlength=n)
+            + prior_weight
+        )
+        step = np.clip(gradient / hessian, -MAX_STEP, MAX_STEP)
+        theta += step
+        if np.max(np.abs(step)) * scale < tol:
+            break
+    logger.info(
+        f"Bradley-Terry fit: {n} items, {len(winners)} comparisons, "
+        f"{iteration + 1} iterations, took {time.perf_counter() - started:.2f}s"
+    )
+    return theta * scale
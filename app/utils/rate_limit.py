@@ -0,0 +1,279 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import re
+import time
+from contextvars import ContextVar
+from typing import Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# 우선순위 레인: 숫자가 작을수록 먼저 처리
+LANE_INTERACTIVE = "interactive"
+LANE_BATCH = "batch"
+LANE_PRIORITIES = {LANE_INTERACTIVE: 0, LANE_BATCH: 1}
+
+# 배치 백필 등은 이 값을 LANE_BATCH 로 설정해 대화형 요청 뒤로 보낸다
+llm_lane: ContextVar[str] = ContextVar("llm_lane", default=LANE_INTERACTIVE)
+
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    # x-ratelimit-reset-* 형식 ("1s", "6m0s", "20ms") 을 초로 변환
+    if not value:
+        return None
+    parts = DURATION_PART.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(number) * DURATION_UNITS[unit] for number, unit in parts)
+
+
+def header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    milliseconds = header_float(headers, "retry-after-ms")
+    if milliseconds is not None:
+        return milliseconds / 1000
+    return header_float(headers, "retry-after")
+
+
+class TokenBucket:
+    """분당 한도를 초당 rate 로 채우는 버킷. per_minute <= 0 이면 제한 없음."""
+
+    def __init__(self, per_minute: float, burst_seconds: float):
+        self.burst_seconds = burst_seconds
+        self.set_limit(per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def set_limit(self, per_minute: float) -> None:
+        self.per_minute = per_minute
+        self.rate = per_minute / 60
+        self.capacity = max(self.rate * self.burst_seconds, 1.0)
+
+    @property
+    def unlimited(self) -> bool:
+        return self.per_minute <= 0
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        if self.unlimited:
+            return 0.0
+        self.refill(now)
+        # 버킷보다 큰 요청은 가득 찼을 때 보낸다
+        needed = min(amount, self.capacity) - self.level
+        return max(needed, 0.0) / self.rate
+
+    def take(self, amount: float) -> None:
+        # 실제 사용량이 추정보다 크면 음수가 되어 다음 요청을 그만큼 늦춘다
+        if not self.unlimited:
+            self.level -= amount
+
+
+class ModelLimiter:
+    """모델 하나의 요청/토큰 버킷과 우선순위 대기열, 429 이후 차단 시각을 관리한다."""
+
+    def __init__(self, rpm: float, tpm: float, burst_seconds: float, learn: bool):
+        self.requests = TokenBucket(rpm, burst_seconds)
+        self.tokens = TokenBucket(tpm, burst_seconds)
+        self.learn = learn  # 응답 헤더의 x-ratelimit-limit-* 로 한도를 맞출지
+        self.blocked_until = 0.0
+        self.backoff = 0.0
+        self.rate_limited = 0
+        self._queue: list[tuple[int, int]] = []
+        self._wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def notify(self) -> None:
+        wakeup, self._wakeup = self._wakeup, asyncio.Event()
+        wakeup.set()
+
+    def wait_time(self, tokens: float) -> float:
+        now = time.monotonic()
+        return max(
+            self.blocked_until - now,
+            self.requests.wait_time(1, now),
+            self.tokens.wait_time(tokens, now),
+        )
+
+    async def acquire(self, tokens: float, priority: int, seq: int) -> None:
+        # 대기열 맨 앞(우선순위, 도착 순)인 호출만 버킷에서 꺼내 간다
+        entry = (priority, seq)
+        heapq.heappush(self._queue, entry)
+        # 더 높은 우선순위가 들어왔으면 기존 맨 앞 대기자가 자리를 내주도록 깨운다
+        self.notify()
+        try:
+            while True:
+                wakeup = self._wakeup
+                timeout = None
+                if self._queue[0] == entry:
+                    timeout = self.wait_time(tokens)
+                    if timeout <= 0:
+                        self.requests.take(1)
+                        self.tokens.take(tokens)
+                        return
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+            self.notify()
+
+    def observe_headers(self, headers: Mapping[str, str], utilization: float) -> None:
+        # 다른 프로세스와 한도를 공유하므로 서버가 알려준 잔여량으로 버킷을 맞춘다
+        now = time.monotonic()
+        self.backoff = 0.0
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            limit = header_float(headers, f"x-ratelimit-limit-{kind}")
+            if self.learn and limit and limit * utilization != bucket.per_minute:
+                bucket.set_limit(limit * utilization)
+            remaining = header_float(headers, f"x-ratelimit-remaining-{kind}")
+            if remaining is None or bucket.unlimited:
+                continue
+            bucket.refill(now)
+            bucket.level = min(bucket.level, remaining)
+            if remaining <= 0:
+                reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                if reset:
+                    self.blocked_until = max(self.blocked_until, now + reset)
+
+    def observe_rate_limit(self, headers: Mapping[str, str], max_backoff: float) -> float:
+        # 429: retry-after 가 있으면 따르고, 없으면 연속 429 마다 두 배로 늘린 지연 + jitter
+        self.rate_limited += 1
+        delay = retry_after(headers)
+        if delay is None:
+            self.backoff = min(max(self.backoff * 2, 0.5), max_backoff)
+            delay = self.backoff * random.uniform(0.5, 1.0)
+        self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+        self.notify()
+        return delay
+
+
+class PrioritySemaphore:
+    """빈 슬롯을 우선순위가 높은(숫자가 작은) 대기자부터 넘겨주는 semaphore."""
+
+    def __init__(self, value: int):
+        self.value = value
+        self.in_use = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+
+    def __len__(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, priority: int, seq: int) -> None:
+        if self.in_use < self.value and not self._waiters:
+            self.in_use += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, seq, future)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                # 슬롯을 넘겨받은 직후 취소되었으면 다음 대기자에게 돌려준다
+                self.release()
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def release(self) -> None:
+        # 이미 취소된 대기자는 건너뛰고 살아 있는 대기자에게 슬롯을 넘긴다
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_use -= 1
+
+
+class RateLimitScheduler:
+    """OpenAI 호출을 모델별 요청/토큰 한도와 전체 동시 실행 수 안에서 우선순위대로 내보낸다."""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        rpm: float = 0,
+        tpm: float = 0,
+        model_limits: Optional[Mapping[str, tuple[float, float]]] = None,
+        burst_seconds: float = 10.0,
+        utilization: float = 0.9,
+        max_backoff: float = 30.0,
+    ):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.model_limits = dict(model_limits or {})
+        self.burst_seconds = burst_seconds
+        self.utilization = utilization
+        self.max_backoff = max_backoff
+        self.slots = PrioritySemaphore(max_concurrency)
+        self.limiters: dict[str, ModelLimiter] = {}
+        self._seq = itertools.count()
+
+    def limiter(self, model: str) -> ModelLimiter:
+        limiter = self.limiters.get(model)
+        if limiter is None:
+            # 설정에 한도가 없으면 응답 헤더에서 알게 될 때까지 제한 없이 시작
+            configured = self.model_limits.get(model)
+            rpm, tpm = configured or (self.rpm, self.tpm)
+            limiter = self.limiters[model] = ModelLimiter(
+                rpm, tpm, self.burst_seconds, learn=configured is None
+            )
+        return limiter
+
+    async def acquire(self, model: str, tokens: float, lane: str) -> None:
+        priority = LANE_PRIORITIES.get(lane, LANE_PRIORITIES[LANE_BATCH])
+        seq = next(self._seq)
+        await self.limiter(model).acquire(tokens, priority, seq)
+        await self.slots.acquire(priority, seq)
+
+    def release(self) -> None:
+        self.slots.release()
+
+    def record_usage(self, model: str, estimated: float, actual: float) -> None:
+        # 추정 토큰과 실제 사용량의 차이를 버킷에 반영
+        self.limiter(model).tokens.take(actual - estimated)
+
+    def observe_headers(self, model: str, headers: Mapping[str, str]) -> None:
+        self.limiter(model).observe_headers(headers, self.utilization)
+
+    def observe_rate_limit(self, model: str, headers: Mapping[str, str]) -> float:
+        delay = self.limiter(model).observe_rate_limit(headers, self.max_backoff)
+        logger.warning(f"OpenAI rate limit hit for {model}, backing off {delay:.2f}s")
+        return delay
+
+    def stats(self) -> dict[tuple, float]:
+        stats = {
+            ("all", "in_flight"): self.slots.in_use,
+            ("all", "waiting_for_slot"): len(self.slots),
+        }
+        now = time.monotonic()
+        for model, limiter in self.limiters.items():
+            stats[(model, "queued")] = len(limiter)
+            stats[(model, "rpm_limit")] = limiter.requests.per_minute
+            stats[(model, "tpm_limit")] = limiter.tokens.per_minute
+            stats[(model, "blocked_seconds")] = round(
+                max(limiter.blocked_until - now, 0.0), 3
+            )
+            stats[(model, "rate_limited")] = limiter.rate_limited
+        return stats
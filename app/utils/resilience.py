@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_HALF_OPEN = "half_open"
+CIRCUIT_OPEN = "open"
+CIRCUIT_STATES = {CIRCUIT_CLOSED: 0, CIRCUIT_HALF_OPEN: 1, CIRCUIT_OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """circuit 이 열려 있어 호출하지 않고 바로 실패한 경우."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit open for {name}, retry after {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """최근 호출 중 실패(오류, 너무 느린 응답) 비율이 기준을 넘으면 일정 시간 호출을 막는다.
+
+    open_seconds 가 지나면 half-open 으로 바뀌어 half_open_calls 개의 시험 호출만 허용하고,
+    모두 성공하면 다시 닫고 하나라도 실패하면 다시 연다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 50,
+        min_calls: int = 20,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        open_seconds: float = 30.0,
+        half_open_calls: int = 3,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.state = CIRCUIT_CLOSED
+        self.opened_at = 0.0
+        self.transitions = 0
+        self.rejected = 0
+        self._outcomes: deque[bool] = deque(maxlen=window)  # True 면 실패
+        self._probes = 0
+        self._probe_successes = 0
+        # 상태가 바뀌기 전에 시작된 호출의 결과는 새 상태에 반영하지 않는다
+        self._generation = 0
+
+    def allow(self) -> Optional[int]:
+        # 호출해도 되면 결과를 기록할 때 넘길 세대 번호, 막혔으면 None
+        if self.state == CIRCUIT_OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                self.rejected += 1
+                return None
+            self._transition(CIRCUIT_HALF_OPEN)
+        if self.state == CIRCUIT_HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                self.rejected += 1
+                return None
+            self._probes += 1
+        return self._generation
+
+    def retry_after(self) -> float:
+        return max(self.opened_at + self.open_seconds - time.monotonic(), 0.0)
+
+    def record(
+        self, generation: int, ok: bool, seconds: Optional[float] = None
+    ) -> None:
+        if generation != self._generation:
+            return
+        failed = not ok or (seconds is not None and seconds > self.slow_call_seconds)
+        if self.state == CIRCUIT_HALF_OPEN:
+            self._probes -= 1
+            if failed:
+                self._transition(CIRCUIT_OPEN)
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_calls:
+                self._transition(CIRCUIT_CLOSED)
+            return
+        self._outcomes.append(failed)
+        if (
+            self.state == CIRCUIT_CLOSED
+            and len(self._outcomes) >= self.min_calls
+            and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate
+        ):
+            self._transition(CIRCUIT_OPEN)
+
+    def release(self, generation: int) -> None:
+        # 결과를 판단할 수 없는 호출 (취소, 429, 잘못된 요청) 은 시험 호출 자리만 돌려준다
+        if generation == self._generation and self.state == CIRCUIT_HALF_OPEN:
+            self._probes -= 1
+
+    def _transition(self, state: str) -> None:
+        logger.warning(f"Circuit for {self.name}: {self.state} -> {state}")
+        self.state = state
+        self.transitions += 1
+        self._generation += 1
+        self._probes = 0
+        self._probe_successes = 0
+        if state == CIRCUIT_OPEN:
+            self.opened_at = time.monotonic()
+        if state == CIRCUIT_CLOSED:
+            self._outcomes.clear()
+
+
+class LatencyTracker:
+    """모델별 최근 성공 호출 지연을 모아 hedge 지연(분위수)을 계산한다."""
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self._samples: dict[str, deque[float]] = {}
+
+    def observe(self, key: str, seconds: float) -> None:
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def quantile(self, key: str, q: float, min_samples: int) -> Optional[float]:
+        samples = self._samples.get(key)
+        if samples is None or len(samples) < min_samples:
+            return None
+        return float(np.quantile(np.fromiter(samples, dtype=np.float64), q))
+
+
+class HedgeBudget:
+    """hedge 호출 수를 전체 호출 수의 ratio 이하로 제한한다 (호출마다 ratio 만큼 적립)."""
+
+    def __init__(self, ratio: float, burst: float = 10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.credit = 1.0
+
+    def deposit(self) -> None:
+        self.credit = min(self.credit + self.ratio, self.burst)
+
+    def try_spend(self) -> bool:
+        if self.credit < 1.0:
+            return False
+        self.credit -= 1.0
+        return True
+
+
+async def run_hedged(
+    call: Callable[[], Awaitable[T]],
+    delay: float,
+    budget: HedgeBudget,
+    on_hedge: Callable[[str], None] = lambda outcome: None,
+) -> T:
+    # delay 안에 끝나지 않으면 같은 호출을 한 번 더 보내고 먼저 성공한 결과를 쓴다
+    budget.deposit()
+    primary = asyncio.ensure_future(call())
+    pending = {primary}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if done:
+            return primary.result()
+        if not budget.try_spend():
+            on_hedge("skipped")
+            return await primary
+
+        on_hedge("issued")
+        hedge = asyncio.ensure_future(call())
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        on_hedge("won")
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,160 @@
+import logging
+import math
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ScoreIndex:
+    """(difficulty_score, id) 를 정렬된 버킷들로 유지하는 순서 통계 구조.
+
+    버킷 길이를 Fenwick 트리로 관리하므로 삽입/삭제/순위 조회가 모두 O(log N)
+    (버킷 내부 이동은 버킷 크기로 제한된 상수 비용) 이다.
+    """
+
+    def __init__(self, bucket_size: int = 1000):
+        self._lock = threading.RLock()
+        self._bucket_size = bucket_size
+        self._buckets: list[list[tuple[float, int]]] = []
+        self._maxes: list[tuple[float, int]] = []
+        self._tree: list[int] = []
+        self._scores: dict[int, float] = {}
+        self.is_loaded = False
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __contains__(self, experience_id: int) -> bool:
+        return experience_id in self._scores
+
+    def get(self, experience_id: int) -> Optional[float]:
+        return self._scores.get(experience_id)
+
+    def load(self, items: Iterable[tuple[int, Optional[float]]]) -> None:
+        scores = {
+            experience_id: score
+            for experience_id, score in items
+            if score is not None
+        }
+        entries = sorted((score, experience_id) for experience_id, score in scores.items())
+        size = self._bucket_size
+        buckets = [entries[i : i + size] for i in range(0, len(entries), size)]
+        with self._lock:
+            self._scores = scores
+            self._buckets = buckets
+            self._maxes = [bucket[-1] for bucket in buckets]
+            self._build_tree()
+            self.is_loaded = True
+        logger.debug(f"Score index loaded with {len(scores)} scores")
+
+    def add(self, experience_id: int, score: Optional[float]) -> None:
+        with self._lock:
+            if experience_id in self._scores:
+                self.remove(experience_id)
+            if score is None:
+                return
+            self._scores[experience_id] = score
+            self._insert((score, experience_id))
+
+    def remove(self, experience_id: int) -> None:
+        with self._lock:
+            score = self._scores.pop(experience_id, None)
+            if score is not None:
+                self._delete((score, experience_id))
+
+    def count_le(self, score: float) -> int:
+        # score 이하인 항목 수
+        key = (score, math.inf)
+        with self._lock:
+            b = bisect_right(self._maxes, key)
+            count = self._prefix(b)
+            if b < len(self._buckets):
+                count += bisect_right(self._buckets[b], key)
+            return count
+
+    def lower(self, score: float) -> Optional[tuple[float, int]]:
+        # score 보다 작은 항목 중 가장 큰 (score, id)
+        key = (score, -math.inf)
+        with self._lock:
+            b = bisect_left(self._maxes, key)
+            if b < len(self._buckets):
+                pos = bisect_left(self._buckets[b], key)
+                if pos > 0:
+                    return self._buckets[b][pos - 1]
+            if b > 0:
+                return self._buckets[b - 1][-1]
+            return None
+
+    def higher(self, score: float) -> Optional[tuple[float, int]]:
+        # score 보다 큰 항목 중 가장 작은 (score, id)
+        key = (score, math.inf)
+        with self._lock:
+            b = bisect_right(self._maxes, key)
+            if b < len(self._buckets):
+                bucket = self._buckets[b]
+                return bucket[bisect_right(bucket, key)]
+            return None
+
+    def percentile(self, score: float) -> float:
+        total = len(self)
+        return (self.count_le(score) / total) * 100 if total > 0 else 50.0
+
+    def _insert(self, key: tuple[float, int]) -> None:
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._build_tree()
+            return
+
+        b = min(bisect_left(self._maxes, key), len(self._buckets) - 1)
+        bucket = self._buckets[b]
+        insort(bucket, key)
+        self._maxes[b] = bucket[-1]
+        if len(bucket) > 2 * self._bucket_size:
+            # 버킷이 너무 커지면 반으로 나누고 트리를 다시 만든다 (분할은 드물다)
+            half = len(bucket) // 2
+            self._buckets[b : b + 1] = [bucket[:half], bucket[half:]]
+            self._maxes[b : b + 1] = [bucket[half - 1], bucket[-1]]
+            self._build_tree()
+        else:
+            self._tree_add(b, 1)
+
+    def _delete(self, key: tuple[float, int]) -> None:
+        b = bisect_left(self._maxes, key)
+        bucket = self._buckets[b]
+        del bucket[bisect_left(bucket, key)]
+        if bucket:
+            self._maxes[b] = bucket[-1]
+            self._tree_add(b, -1)
+        else:
+            del self._buckets[b]
+            del self._maxes[b]
+            self._build_tree()
+
+    def _build_tree(self) -> None:
+        tree = [0] * (len(self._buckets) + 1)
+        for i, bucket in enumerate(self._buckets, start=1):
+            tree[i] += len(bucket)
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, b: int, delta: int) -> None:
+        i = b + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, b: int) -> int:
+        # 앞쪽 b개 버킷의 항목 수 합
+        total = 0
+        while b > 0:
+            total += self._tree[b]
+            b -= b & -b
+        return total
+
+
+score_index = ScoreIndex()
@@ -0,0 +1,31 @@
+import numpy as np
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    # 코사인 유사도를 내적 한 번으로 계산할 수 있도록 L2 정규화 (영벡터는 그대로 둔다)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def cosine_similarity(a, b) -> np.ndarray:
+    # sklearn.metrics.pairwise.cosine_similarity 와 같은 (len(a), len(b)) 행렬
+    a = normalize(np.atleast_2d(np.asarray(a, dtype=np.float32)))
+    b = normalize(np.atleast_2d(np.asarray(b, dtype=np.float32)))
+    return a @ b.T
+
+
+def top_k(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    # 마지막 축에서 점수가 큰 k개의 위치와 점수를 내림차순으로 반환
+    size = scores.shape[-1]
+    k = min(k, size)
+    if k < size:
+        top = np.argpartition(scores, -k, axis=-1)[..., -k:]
+    else:
+        top = np.broadcast_to(np.arange(size), scores.shape[:-1] + (size,))
+    top_scores = np.take_along_axis(scores, top, axis=-1)
+    order = np.argsort(-top_scores, axis=-1)
+    return (
+        np.take_along_axis(top, order, axis=-1),
+        np.take_along_axis(top_scores, order, axis=-1),
+    )
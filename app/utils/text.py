@@ -0,0 +1,19 @@
+import hashlib
+import re
+import unicodedata
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    # 공백/대소문자/유니코드 조합 차이만 있는 입력을 같은 텍스트로 취급
+    text = unicodedata.normalize("NFC", text)
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def text_digest(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def experience_text_hash(text: str) -> str:
+    return text_digest(normalize_text(text))
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from app.api.endpoints.experience import estimate_text
+from app.config import settings
+from app.crud import crud
+from app.database import AsyncSessionLocal
+from app.utils.rank_refresher import rank_refresher
+
+logger = logging.getLogger(__name__)
+
+
+async def process_next_job() -> bool:
+    async with AsyncSessionLocal() as db:
+        job = await crud.claim_estimate_job(db)
+    if job is None:
+        return False
+
+    logger.info(f"Processing estimate job {job.id} (attempt {job.attempts})")
+    try:
+        async with AsyncSessionLocal() as db:
+            response = await estimate_text(job.text, db)
+            await crud.finish_estimate_job(job.id, db, result=response.model_dump())
+    except Exception as e:
+        logger.error(f"Estimate job {job.id} failed: {str(e)}", exc_info=True)
+        async with AsyncSessionLocal() as db:
+            await crud.finish_estimate_job(job.id, db, error=str(e))
+    return True
+
+
+async def run_worker(stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        try:
+            if await process_next_job():
+                continue
+        except Exception as e:
+            # DB 장애 등으로 작업을 가져오지 못해도 워커는 계속 살아 있어야 한다
+            logger.error(f"Estimate worker error: {str(e)}", exc_info=True)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.job_poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_reaper(stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        try:
+            async with AsyncSessionLocal() as db:
+                await crud.requeue_stale_estimate_jobs(
+                    db, settings.job_stale_after, settings.job_max_attempts
+                )
+        except Exception as e:
+            logger.error(f"Estimate job reaper error: {str(e)}", exc_info=True)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.job_stale_after / 2)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_index_sync(stop: asyncio.Event, interval: float) -> None:
+    # 다른 프로세스가 저장한 경험을 이 프로세스의 메모리 인덱스에 반영
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+        if stop.is_set():
+            break
+        try:
+            async with AsyncSessionLocal() as db:
+                await crud.reconcile_indexes(db)
+        except Exception as e:
+            logger.error(f"Index sync error: {str(e)}", exc_info=True)
+
+
+async def refresh_relative_difficulties() -> None:
+    async with AsyncSessionLocal() as db:
+        await crud.recalculate_relative_difficulties(db)
+
+
+def start_workers(count: int, stop: asyncio.Event) -> list[asyncio.Task]:
+    tasks = [asyncio.create_task(run_worker(stop)) for _ in range(count)]
+    tasks.append(asyncio.create_task(run_reaper(stop)))
+    logger.info(f"Started {count} estimate workers")
+    return tasks
+
+
+async def main(count: int) -> None:
+    # 웹 서버와 분리된 프로세스로 워커만 실행: python -m app.worker
+    async with AsyncSessionLocal() as db:
+        await crud.load_embedding_index(db)
+        await crud.load_score_index(db)
+    stop = asyncio.Event()
+    rank_refresher.interval = settings.rank_refresh_interval
+    tasks = start_workers(count, stop)
+    if settings.index_sync_interval > 0:
+        tasks.append(
+            asyncio.create_task(run_index_sync(stop, settings.index_sync_interval))
+        )
+    await asyncio.gather(
+        *tasks, rank_refresher.run(stop, refresh_relative_difficulties)
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Run estimate job workers")
+    parser.add_argument("--workers", type=int, default=max(settings.job_workers, 1))
+    args = parser.parse_args()
+    asyncio.run(main(args.workers))
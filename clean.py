@@ -1,23 +1,23 @@
-from fastapi import APIRouter, Depends
+import logging
+from sqlalchemy import delete
 from sqlalchemy.orm import Session
-from database import get_db
-from app import models
-from loguru import logger
+from app.database import SessionLocal
+from app.models import models
 
+logger = logging.getLogger(__name__)
 
-def clean_null_difficulty_scores(db: Session = next(get_db())):
-    null_records = (
-        db.query(models.Experience)
-        .filter(models.Experience.difficulty_score.is_(None))
-        .all()
+
+def clean_null_difficulty_scores(db: Session):
+    # 난이도 점수가 없는 레코드를 삭제합니다.
+    # (기본값으로 채우려면 delete 대신 update(...).values(difficulty_score=0))
+    result = db.execute(
+        delete(models.Experience).where(models.Experience.difficulty_score.is_(None))
     )
+    db.commit()
+    logger.info(f"Cleaned {result.rowcount} records with null difficulty scores")
 
-    for record in null_records:
-        # 여기서 레코드를 업데이트하거나 삭제합니다.
-        # 예: 레코드 삭제
-        db.delete(record)
-        # 또는 예: 기본값으로 업데이트
-        # record.difficulty_score = 0
 
-    db.commit()
-    logger.info(f"Cleaned {len(null_records)} records with null difficulty scores")
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    with SessionLocal() as db:
+        clean_null_difficulty_scores(db)
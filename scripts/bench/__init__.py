@@ -0,0 +1,7 @@
+"""OpenAI 키와 운영 DB 없이 돌리는 오프라인 벤치마크.
+
+openai_stub : OpenAI API 를 흉내 내는 로컬 서버 (지연/지터/429 비율 설정)
+corpus      : 합성 경험 데이터 (단위 벡터 임베딩, 무작위 점수)와 stub 이 공유하는 임베딩 함수
+stats       : 지연 백분위, 처리량, DB 쿼리 수 요약
+__main__    : 크기별 벤치마크 실행 (python -m scripts.bench)
+"""
@@ -0,0 +1,271 @@
+"""합성 데이터로 estimate / compare / 유사도 검색 / 순위 경로의 지연 시간, 처리량, DB 쿼리 수를 잰다.
+
+    python -m scripts.bench                                   # 임시 SQLite, 1k/10k/100k 행
+    python -m scripts.bench --sizes 1000000 --output bench.json
+    python -m scripts.bench --database-url postgresql://localhost/bench --latency-ms 400
+
+OpenAI 호출은 같은 프로세스에서 띄운 stub 서버로 보낸다. --database-url 로 지정한 DB 의
+테이블은 크기마다 지우고 다시 만드므로 벤치마크 전용 DB 만 사용할 것.
+임베딩 인덱스는 행 수 x dim x 4 bytes 메모리를 쓰므로 1M 행은 --dim 을 줄이거나 충분한 메모리에서 실행.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+import numpy as np
+from sqlalchemy.engine import make_url
+
+from scripts.bench.environment import (
+    configure_environment,
+    resolve_database_url,
+    seed_database,
+)
+from scripts.bench.openai_stub import StubServer, add_stub_arguments, stub_options
+from scripts.bench.stats import format_table, server_timing_queries, summarize
+
+COLUMNS = (
+    "rows",
+    "scenario",
+    "requests",
+    "errors",
+    "p50_ms",
+    "p95_ms",
+    "p99_ms",
+    "throughput_rps",
+    "db_queries_mean",
+)
+
+
+async def run_calls(calls, concurrency: int) -> dict:
+    # calls: DB 쿼리 수(모르면 None)를 돌려주는 인자 없는 코루틴 함수 목록
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, queries, errors = [], [], []
+
+    async def run(call):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                count = await call()
+            except Exception as e:
+                errors.append(repr(e))
+                return
+            latencies.append(time.perf_counter() - started)
+            queries.append(count)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run(call) for call in calls))
+    summary = summarize(latencies, time.perf_counter() - started, len(errors), queries)
+    if errors:
+        summary["first_error"] = errors[0]
+    return summary
+
+
+async def bench_size(ids: np.ndarray, args, client) -> list[dict]:
+    from app.crud import crud
+    from app.database import AsyncSessionLocal
+    from app.utils.embedding_index import embedding_index
+    from app.utils.metrics import RequestMetrics, current_request
+    from app.config import settings
+    from scripts.bench.corpus import (
+        corpus_text,
+        synthetic_embedding,
+        variant_text,
+    )
+
+    size = len(ids)
+    rng = np.random.default_rng(args.seed + size)
+    picks = rng.integers(0, size, args.requests).tolist()
+    results = []
+
+    async def record(scenario: str, calls, concurrency: int = args.concurrency):
+        summary = await run_calls(calls, concurrency)
+        results.append({"rows": size, "scenario": scenario, **summary})
+
+    def direct(fn):
+        # HTTP 를 거치지 않는 호출도 요청과 같은 방식으로 DB 쿼리 수를 센다
+        async def call():
+            metrics = RequestMetrics()
+            token = current_request.set(metrics)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await fn(db)
+            finally:
+                current_request.reset(token)
+            return metrics.db_queries
+
+        return call
+
+    def post(path: str, payload: dict):
+        async def call():
+            response = await client.post(path, json=payload)
+            response.raise_for_status()
+            return server_timing_queries(response.headers.get("server-timing"))
+
+        return call
+
+    # 유사도 검색: 메모리 인덱스만 / 이웃 행 조회 포함
+    queries = [
+        synthetic_embedding(variant_text(i, n), args.dim).tolist()
+        for n, i in enumerate(picks)
+    ]
+
+    async def index_search(query):
+        embedding_index.search(query, k=settings.knn_k)
+        return 0
+
+    await record("similarity_index", [lambda q=q: index_search(q) for q in queries], 1)
+    await record(
+        "similarity_rows",
+        [
+            direct(
+                lambda db, q=q: crud.find_nearest_experiences([q], db, settings.knn_k)
+            )
+            for q in queries
+        ],
+    )
+
+    # 순위: 백분위, 인접 경험
+    scores = rng.uniform(0, 100, args.requests).tolist()
+    await record(
+        "rank_percentile",
+        [
+            direct(lambda db, s=s: crud.calculate_relative_difficulty(db, s))
+            for s in scores
+        ],
+    )
+    await record(
+        "rank_adjacent",
+        [direct(lambda db, s=s: crud.get_adjacent_experiences(s, db)) for s in scores],
+    )
+
+    # HTTP 경로 (in-process ASGI): 동일 텍스트, 새 텍스트(LLM 분석), 유사 텍스트(LLM 비교)
+    await record(
+        "estimate_existing",
+        [post("/api/estimate", {"text": corpus_text(i)}) for i in picks],
+    )
+    await record(
+        "estimate_new",
+        [
+            post("/api/estimate", {"text": f"benchmark experience {size}-{n}"})
+            for n in range(args.requests)
+        ],
+    )
+    await record(
+        "estimate_similar",
+        [
+            post("/api/estimate", {"text": variant_text(i, size + n)})
+            for n, i in enumerate(picks)
+        ],
+    )
+    await record(
+        "compare",
+        [
+            post(
+                "/api/compare",
+                {
+                    "experience_id": int(ids[i]),
+                    "is_more_difficult_than_lower": bool(rng.random() < 0.7),
+                    "is_less_difficult_than_higher": bool(rng.random() < 0.7),
+                },
+            )
+            for i in picks
+        ],
+    )
+
+    # 전체 순위 재계산과 비교 기반 재순위 (쓰기 경로, 순차 실행)
+    await record(
+        "rank_recalculate",
+        [direct(crud.recalculate_relative_difficulties) for _ in range(args.repeat)],
+        1,
+    )
+    await record(
+        "rerank_comparisons",
+        [direct(crud.rerank_from_comparisons) for _ in range(args.repeat)],
+        1,
+    )
+    return results
+
+
+async def main(args) -> list[dict]:
+    import httpx
+
+    from app.database import dispose_engines
+    from app.main import app
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+        for size in args.sizes:
+            index_gb = size * args.dim * 4 / 2**30
+            if index_gb > args.max_index_gb:
+                print(
+                    f"Skipping {size} rows: embedding index needs {index_gb:.1f}GB "
+                    f"(> --max-index-gb {args.max_index_gb})"
+                )
+                continue
+            ids = await seed_database(size, args.dim, args.comparisons, args.seed)
+            rows = await bench_size(ids, args, client)
+            print(format_table(rows, COLUMNS))
+            results.extend(rows)
+    await dispose_engines()
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--database-url", default="")
+    parser.add_argument(
+        "--sizes",
+        default="1000,10000,100000",
+        type=lambda value: [int(size) for size in value.split(",")],
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--comparisons", type=int, default=2, help="경험당 쌍대 비교 수"
+    )
+    parser.add_argument("--max-index-gb", type=float, default=8.0)
+    parser.add_argument("--stub-port", type=int, default=8001)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="")
+    parser.add_argument("--verbose", action="store_true")
+    add_stub_arguments(parser)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    args.database_url = resolve_database_url(args.database_url)
+    configure_environment(args.database_url, args.stub_port)
+
+    with StubServer(stub_options(args), port=args.stub_port):
+        results = asyncio.run(main(args))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                    "database": make_url(args.database_url).get_backend_name(),
+                    "options": {
+                        key: value
+                        for key, value in vars(args).items()
+                        if key not in ("database_url", "output")
+                    },
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"Results written to {args.output}")
@@ -0,0 +1,95 @@
+import hashlib
+import re
+from typing import Iterator
+
+import numpy as np
+
+EMBEDDING_DIM = 3072
+
+# "<원문> #v<n>" 형식의 텍스트는 원문 임베딩 근처(코사인 ~= 1 - VARIANT_NOISE^2 / 2)에 놓인다
+VARIANT_PATTERN = re.compile(r"^(.*) #v\d+$", re.S)
+VARIANT_NOISE = 0.3
+
+
+def text_seed(text: str) -> int:
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+
+
+def unit_vector(seed: int, dim: int) -> np.ndarray:
+    vector = np.random.default_rng(seed).standard_normal(dim, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def synthetic_embedding(text: str, dim: int = EMBEDDING_DIM) -> np.ndarray:
+    # 같은 텍스트에는 항상 같은 단위 벡터를 돌려준다 (stub 서버와 시드 데이터가 공유)
+    match = VARIANT_PATTERN.match(text)
+    if match is None:
+        return unit_vector(text_seed(text), dim)
+    base = unit_vector(text_seed(match.group(1)), dim)
+    vector = base + VARIANT_NOISE * unit_vector(text_seed(text), dim)
+    return vector / np.linalg.norm(vector)
+
+
+def corpus_text(index: int) -> str:
+    return f"synthetic experience {index}"
+
+
+def variant_text(index: int, variant: int) -> str:
+    return f"{corpus_text(index)} #v{variant}"
+
+
+def corpus_rows(
+    count: int, dim: int = EMBEDDING_DIM, seed: int = 0, chunk_size: int = 2000
+) -> Iterator[list[dict]]:
+    # 경험 테이블에 넣을 행을 chunk 단위로 만든다 (임베딩은 float32 바이너리 컬럼)
+    from app.utils.embedding_codec import encode_embedding
+    from app.utils.text import experience_text_hash
+
+    rng = np.random.default_rng(seed)
+    for start in range(0, count, chunk_size):
+        size = min(chunk_size, count - start)
+        scores = np.round(rng.uniform(0, 100, size), 2)
+        metrics = np.round(rng.uniform(0, 100, (size, 10)), 2)
+        rows = []
+        for offset in range(size):
+            text = corpus_text(start + offset)
+            blob, scale = encode_embedding(synthetic_embedding(text, dim), "float32")
+            score = float(scores[offset])
+            rows.append(
+                {
+                    "text": text,
+                    "text_hash": experience_text_hash(text),
+                    "difficulty_score": score,
+                    "base_difficulty_score": score,
+                    "relative_difficulty": None,
+                    "difficulty_scores": metrics[offset].tolist(),
+                    "embedding_blob": blob,
+                    "embedding_scale": scale,
+                }
+            )
+        yield rows
+
+
+def comparison_rows(
+    ids: np.ndarray, scores: np.ndarray, per_experience: int, seed: int = 0
+) -> Iterator[list[dict]]:
+    # 점수 차에 따른 Bradley–Terry 확률로 무작위 쌍대 비교 결과를 만든다
+    rng = np.random.default_rng(seed + 1)
+    total = len(ids) * per_experience
+    chunk_size = 10000
+    for start in range(0, total, chunk_size):
+        size = min(chunk_size, total - start)
+        left = rng.integers(0, len(ids), size)
+        right = rng.integers(0, len(ids), size)
+        keep = left != right
+        left, right = left[keep], right[keep]
+        p = 1.0 / (1.0 + np.exp(-(scores[left] - scores[right]) / 10.0))
+        more = rng.random(len(left)) < p
+        yield [
+            {
+                "experience_id": int(ids[i]),
+                "compared_experience_id": int(ids[j]),
+                "is_more_difficult": bool(m),
+            }
+            for i, j, m in zip(left, right, more)
+        ]
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy.engine import make_url
+
+
+def resolve_database_url(database_url: str) -> str:
+    # 지정하지 않으면 임시 디렉터리의 SQLite 파일
+    if os.getenv("APP_ENV") == "production":
+        raise SystemExit("Refusing to run against APP_ENV=production")
+    if database_url:
+        return database_url
+    return f"sqlite:///{tempfile.mkdtemp(prefix='bench-')}/bench.db"
+
+
+def configure_environment(database_url: str, stub_port: int) -> None:
+    # app.config 의 settings 는 import 시점에 읽히므로 app 을 import 하기 전에 설정
+    # (여기서 띄우는 앱 프로세스도 같은 환경 변수를 물려받는다)
+    url = make_url(database_url)
+    os.environ["DATABASE_URL"] = database_url
+    if url.get_backend_name() == "sqlite":
+        os.environ["ASYNC_DATABASE_URL"] = str(url.set(drivername="sqlite+aiosqlite"))
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{stub_port}/v1"
+    # 운영 캐시 파일을 건드리지 않고, 매 호출이 stub 까지 가도록 영구 캐시는 끈다
+    os.environ["EMBEDDING_CACHE_PATH"] = ""
+    os.environ["LLM_CACHE_PATH"] = ""
+    os.environ["JOB_WORKERS"] = "0"
+
+
+async def seed_database(
+    size: int, dim: int, comparisons: int, seed: int = 0
+) -> np.ndarray:
+    # 테이블을 지우고 다시 만든 뒤 합성 경험/쌍대 비교를 넣고, 경험 id 배열을 돌려준다
+    from sqlalchemy import insert, select
+
+    import app.models.models as models
+    from app.crud import crud
+    from app.database import AsyncSessionLocal, get_async_engine
+    from scripts.bench.corpus import comparison_rows, corpus_rows
+
+    async with get_async_engine().begin() as conn:
+        await conn.run_sync(models.Base.metadata.drop_all)
+        await conn.run_sync(models.Base.metadata.create_all)
+
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        for rows in corpus_rows(size, dim, seed):
+            await db.execute(insert(models.Experience), rows)
+        await db.commit()
+        ids, scores = map(
+            np.asarray,
+            zip(
+                *(
+                    await db.execute(
+                        select(
+                            models.Experience.id, models.Experience.difficulty_score
+                        ).order_by(models.Experience.id)
+                    )
+                ).all()
+            ),
+        )
+        for rows in comparison_rows(ids, scores, comparisons, seed):
+            await db.execute(insert(models.Comparison), rows)
+        await db.commit()
+        await crud.recalculate_relative_difficulties(db)
+        await crud.load_embedding_index(db)
+        await crud.load_score_index(db)
+    print(f"Seeded {size} experiences in {time.perf_counter() - started:.1f}s")
+    return ids
@@ -0,0 +1,268 @@
+"""OpenAI embeddings / chat completions API 를 흉내 내는 로컬 stub 서버.
+
+python -m scripts.bench.openai_stub --port 8001 --latency-ms 300 --jitter-ms 100
+OPENAI_BASE_URL=http://127.0.0.1:8001/v1 uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from scripts.bench.corpus import EMBEDDING_DIM, synthetic_embedding, text_seed
+
+
+@dataclass
+class StubOptions:
+    latency_ms: float = 200.0  # chat completion 평균 지연
+    jitter_ms: float = 50.0  # 지연의 표준편차
+    embedding_latency_ms: float = 50.0
+    stall_rate: float = 0.0  # 이 비율의 호출은 stall_ms 만큼 더 멈춘다 (꼬리 지연)
+    stall_ms: float = 3000.0
+    error_rate: float = 0.0  # 이 비율의 호출은 429 로 거절
+    server_error_rate: float = 0.0  # 이 비율의 호출은 500 (장애 상황 재현)
+    rpm: float = (
+        0.0  # 모델별 분당 요청/토큰 한도 (0 이면 제한 없음), x-ratelimit-* 헤더로 알림
+    )
+    tpm: float = 0.0
+    dim: int = EMBEDDING_DIM
+    seed: int = 0
+
+
+class StubRateLimit:
+    """OpenAI 처럼 모델별 분당 요청/토큰 한도를 두고 남은 양을 응답 헤더로 알려준다."""
+
+    def __init__(self, rpm: float, tpm: float):
+        self.limits = {"requests": rpm, "tokens": tpm}
+        self.levels: dict[tuple[str, str], tuple[float, float]] = {}
+
+    def level(self, model: str, kind: str, now: float) -> float:
+        limit = self.limits[kind]
+        level, updated = self.levels.get((model, kind), (limit, now))
+        return min(limit, level + (now - updated) * limit / 60)
+
+    def consume(self, model: str, tokens: int) -> tuple[bool, dict[str, str]]:
+        now = time.monotonic()
+        cost = {"requests": 1, "tokens": tokens}
+        levels = {
+            kind: self.level(model, kind, now) for kind in cost if self.limits[kind]
+        }
+        allowed = all(levels[kind] >= cost[kind] for kind in levels)
+        headers = {}
+        for kind, level in levels.items():
+            if allowed:
+                level -= cost[kind]
+            self.levels[(model, kind)] = (level, now)
+            limit = self.limits[kind]
+            reset_ms = max(cost[kind] - level, 0) / (limit / 60) * 1000
+            headers[f"x-ratelimit-limit-{kind}"] = str(int(limit))
+            headers[f"x-ratelimit-remaining-{kind}"] = str(max(int(level), 0))
+            headers[f"x-ratelimit-reset-{kind}"] = f"{int(reset_ms)}ms"
+        return allowed, headers
+
+
+def create_stub_app(options: StubOptions) -> FastAPI:
+    app = FastAPI(title="OpenAI stub")
+    rng = random.Random(options.seed)
+    rate_limit = StubRateLimit(options.rpm, options.tpm)
+    app.state.calls = {"embeddings": 0, "chat": 0, "rejected": 0, "failed": 0}
+
+    def rejection(headers: dict[str, str]) -> JSONResponse:
+        app.state.calls["rejected"] += 1
+        return JSONResponse(
+            {"error": {"message": "Rate limit reached", "type": "requests"}},
+            status_code=429,
+            headers=headers,
+        )
+
+    async def simulate(
+        latency_ms: float, model: str, tokens: int
+    ) -> tuple[JSONResponse | None, dict[str, str]]:
+        headers = {}
+        if options.rpm or options.tpm:
+            allowed, headers = rate_limit.consume(model, tokens)
+            if not allowed:
+                return rejection(headers), headers
+        delay = max(0.0, rng.gauss(latency_ms, options.jitter_ms))
+        if options.stall_rate and rng.random() < options.stall_rate:
+            delay += options.stall_ms
+        await asyncio.sleep(delay / 1000)
+        if options.error_rate and rng.random() < options.error_rate:
+            return rejection({**headers, "retry-after-ms": "200"}), headers
+        if options.server_error_rate and rng.random() < options.server_error_rate:
+            app.state.calls["failed"] += 1
+            return (
+                JSONResponse(
+                    {
+                        "error": {
+                            "message": "The server had an error",
+                            "type": "server_error",
+                        }
+                    },
+                    status_code=500,
+                ),
+                headers,
+            )
+        return None, headers
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        app.state.calls["embeddings"] += 1
+        texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        tokens = sum(len(text) // 4 + 1 for text in texts)
+        rejected, headers = await simulate(
+            options.embedding_latency_ms, body.get("model"), tokens
+        )
+        if rejected is not None:
+            return rejected
+        data = []
+        for index, text in enumerate(texts):
+            vector = synthetic_embedding(text, options.dim).astype("<f4")
+            if body.get("encoding_format") == "base64":
+                embedding = base64.b64encode(vector.tobytes()).decode("ascii")
+            else:
+                embedding = vector.tolist()
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+        return JSONResponse(
+            {
+                "object": "list",
+                "data": data,
+                "model": body.get("model"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            },
+            headers=headers,
+        )
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.calls["chat"] += 1
+        prompt_tokens = sum(len(m["content"]) // 4 + 1 for m in body["messages"])
+        rejected, headers = await simulate(
+            options.latency_ms,
+            body.get("model"),
+            prompt_tokens + body.get("max_tokens", 0),
+        )
+        if rejected is not None:
+            return rejected
+        content = chat_content(body)
+        completion_tokens = len(content) // 4 + 1
+        return JSONResponse(
+            {
+                "id": f"chatcmpl-stub-{app.state.calls['chat']}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            },
+            headers=headers,
+        )
+
+    return app
+
+
+def chat_content(body: dict) -> str:
+    # 프롬프트 종류에 맞는 형식으로, 같은 요청에는 같은 점수를 돌려준다
+    rng = np.random.default_rng(text_seed(json.dumps(body["messages"], sort_keys=True)))
+    system = body["messages"][0]["content"]
+    if system.startswith("Compare the difficulty"):
+        return f"{rng.uniform(0, 100):.2f}"
+    metrics = np.round(rng.uniform(0, 100, 10), 2).tolist()
+    if body.get("response_format", {}).get("type") == "json_object":
+        return json.dumps(
+            {"overall": round(float(np.mean(metrics)), 2), "metrics": metrics}
+        )
+    return json.dumps(metrics)
+
+
+class StubServer:
+    """stub 앱을 별도 스레드의 uvicorn 으로 띄운다 (벤치마크/부하 테스트 프로세스 안에서 사용)."""
+
+    def __init__(self, options: StubOptions, host: str = "127.0.0.1", port: int = 8001):
+        import uvicorn
+
+        self.app = create_stub_app(options)
+        self.base_url = f"http://{host}:{port}/v1"
+        self.server = uvicorn.Server(
+            uvicorn.Config(self.app, host=host, port=port, log_level="warning")
+        )
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self) -> "StubServer":
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("OpenAI stub server failed to start")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=StubOptions.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=StubOptions.jitter_ms)
+    parser.add_argument(
+        "--embedding-latency-ms", type=float, default=StubOptions.embedding_latency_ms
+    )
+    parser.add_argument("--stall-rate", type=float, default=StubOptions.stall_rate)
+    parser.add_argument("--stall-ms", type=float, default=StubOptions.stall_ms)
+    parser.add_argument("--error-rate", type=float, default=StubOptions.error_rate)
+    parser.add_argument(
+        "--server-error-rate", type=float, default=StubOptions.server_error_rate
+    )
+    parser.add_argument("--rpm", type=float, default=StubOptions.rpm)
+    parser.add_argument("--tpm", type=float, default=StubOptions.tpm)
+    parser.add_argument("--dim", type=int, default=StubOptions.dim)
+
+
+def stub_options(args: argparse.Namespace) -> StubOptions:
+    return StubOptions(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        embedding_latency_ms=args.embedding_latency_ms,
+        stall_rate=args.stall_rate,
+        stall_ms=args.stall_ms,
+        error_rate=args.error_rate,
+        server_error_rate=args.server_error_rate,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        dim=args.dim,
+    )
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_stub_app(stub_options(args)), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
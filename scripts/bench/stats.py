@@ -0,0 +1,56 @@
+import re
+from typing import Optional, Sequence
+
+import numpy as np
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def server_timing_queries(header: Optional[str]) -> Optional[int]:
+    # Server-Timing 헤더의 db 항목에서 요청당 쿼리 수를 읽는다
+    match = SERVER_TIMING_QUERIES.search(header or "")
+    return int(match.group(1)) if match else None
+
+
+def summarize(
+    latencies: Sequence[float],
+    wall_seconds: float,
+    errors: int = 0,
+    db_queries: Sequence[Optional[int]] = (),
+) -> dict:
+    # latencies 는 성공한 호출의 초 단위 지연, 결과는 ms
+    values = np.asarray(latencies, dtype=np.float64) * 1000
+    total = len(values) + errors
+    summary = {
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "throughput_rps": round(len(values) / wall_seconds, 2) if wall_seconds else 0.0,
+    }
+    if len(values):
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        summary.update(
+            p50_ms=round(float(p50), 2),
+            p95_ms=round(float(p95), 2),
+            p99_ms=round(float(p99), 2),
+            mean_ms=round(float(values.mean()), 2),
+            max_ms=round(float(values.max()), 2),
+        )
+    counts = [count for count in db_queries if count is not None]
+    if counts:
+        summary["db_queries_mean"] = round(float(np.mean(counts)), 2)
+        summary["db_queries_max"] = int(max(counts))
+    return summary
+
+
+def format_table(rows: Sequence[dict], columns: Sequence[str]) -> str:
+    widths = [
+        max(len(column), *(len(str(row.get(column, "-"))) for row in rows))
+        for column in columns
+    ]
+    lines = [" ".join(c.rjust(w) for c, w in zip(columns, widths))]
+    for row in rows:
+        lines.append(
+            " ".join(str(row.get(c, "-")).rjust(w) for c, w in zip(columns, widths))
+        )
+    return "\n".join(lines)
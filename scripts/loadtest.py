@@ -0,0 +1,299 @@
+"""동시 클라이언트로 API 에 부하를 걸고 단계별 처리량, 오류율, 지연 백분위를 JSON 으로 남긴다.
+
+    python -m scripts.loadtest                                  # stub + 임시 SQLite + uvicorn 앱을 띄워 실행
+    python -m scripts.loadtest --stages 1,8,32,128 --stage-seconds 30 --app-workers 2
+    python -m scripts.loadtest --target http://localhost:8000   # 이미 떠 있는 앱 (stub 을 쓰도록 띄운 앱)
+
+시나리오 비율은 --mix new=0.2,similar=0.1,repeat=0.5,compare=0.2
+  new     : 처음 보는 텍스트 추정 (임베딩 + LLM 분석)
+  similar : 저장된 경험과 거의 같은 텍스트 추정 (LLM 비교 또는 kNN)
+  repeat  : 이미 저장된 텍스트 추정 (DB 조회만)
+  compare : 사용자 비교 제출
+단계마다 "/" 를 주기적으로 호출하는 probe 의 지연으로 이벤트 루프 블로킹을 함께 본다.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+from scripts.bench.corpus import corpus_text, variant_text
+from scripts.bench.environment import (
+    configure_environment,
+    resolve_database_url,
+    seed_database,
+)
+from scripts.bench.openai_stub import StubServer, add_stub_arguments, stub_options
+from scripts.bench.stats import server_timing_queries, summarize
+
+SCENARIOS = ("new", "similar", "repeat", "compare")
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        name, weight = item.split("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+class Workload:
+    """시나리오별 요청을 만들고, 응답으로 알게 된 경험(id, 텍스트)을 모아 재사용한다."""
+
+    def __init__(self, mix: dict[str, float], corpus_size: int, seed: int):
+        self.rng = random.Random(seed)
+        self.names = list(mix)
+        self.weights = list(mix.values())
+        self.corpus_size = corpus_size
+        self.run_id = f"{int(time.time())}-{seed}"
+        self.counter = 0
+        self.known: list[tuple[int, str]] = []
+
+    def next_request(self) -> tuple[str, str, dict]:
+        self.counter += 1
+        scenario = self.rng.choices(self.names, self.weights)[0]
+        if (
+            scenario in ("repeat", "compare")
+            and not self.known
+            and not self.corpus_size
+        ):
+            scenario = "new"
+        if scenario == "new":
+            text = f"load test experience {self.run_id}-{self.counter}"
+            return scenario, "/api/estimate", {"text": text}
+        if scenario == "similar" and self.corpus_size:
+            text = variant_text(self.rng.randrange(self.corpus_size), self.counter)
+            return scenario, "/api/estimate", {"text": text}
+        if scenario == "similar":
+            text = f"{self.rng.choice(self.known)[1]} #v{self.counter}"
+            return scenario, "/api/estimate", {"text": text}
+        experience_id, text = self.pick_known()
+        if scenario == "repeat":
+            return scenario, "/api/estimate", {"text": text}
+        return (
+            scenario,
+            "/api/compare",
+            {
+                "experience_id": experience_id,
+                "is_more_difficult_than_lower": self.rng.random() < 0.7,
+                "is_less_difficult_than_higher": self.rng.random() < 0.7,
+            },
+        )
+
+    def pick_known(self) -> tuple[int, str]:
+        # 시드 데이터(id 는 1부터)와 부하 중에 만들어진 경험에서 고른다
+        if self.known and (not self.corpus_size or self.rng.random() < 0.5):
+            return self.rng.choice(self.known)
+        index = self.rng.randrange(self.corpus_size)
+        return index + 1, corpus_text(index)
+
+    def observe(self, response: httpx.Response) -> None:
+        if response.status_code != 200 or len(self.known) >= 10000:
+            return
+        experience = response.json().get("user_experience")
+        if experience:
+            self.known.append((experience["id"], experience["text"]))
+
+
+async def run_stage(
+    client: httpx.AsyncClient, workload: Workload, concurrency: int, seconds: float
+) -> dict:
+    latencies = {name: [] for name in SCENARIOS}
+    queries = {name: [] for name in SCENARIOS}
+    errors = Counter()
+    statuses = Counter()
+    probe_latencies = []
+    deadline = time.perf_counter() + seconds
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            scenario, path, payload = workload.next_request()
+            started = time.perf_counter()
+            try:
+                response = await client.post(path, json=payload)
+            except httpx.HTTPError as e:
+                errors[scenario] += 1
+                statuses[type(e).__name__] += 1
+                continue
+            elapsed = time.perf_counter() - started
+            statuses[str(response.status_code)] += 1
+            if response.status_code >= 400:
+                errors[scenario] += 1
+                continue
+            latencies[scenario].append(elapsed)
+            queries[scenario].append(
+                server_timing_queries(response.headers.get("server-timing"))
+            )
+            workload.observe(response)
+
+    async def probe():
+        # 가장 가벼운 엔드포인트의 지연이 늘면 이벤트 루프가 막히고 있다는 뜻
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                await client.get("/")
+                probe_latencies.append(time.perf_counter() - started)
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.1)
+
+    started = time.perf_counter()
+    await asyncio.gather(probe(), *(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    all_queries = [value for values in queries.values() for value in values]
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(wall, 2),
+        **summarize(all_latencies, wall, sum(errors.values()), all_queries),
+        "status_codes": dict(statuses),
+        "scenarios": {
+            name: summarize(latencies[name], wall, errors[name], queries[name])
+            for name in SCENARIOS
+            if latencies[name] or errors[name]
+        },
+        "probe": summarize(probe_latencies, wall),
+    }
+
+
+def start_app(port: int, workers: int, log_path: str) -> subprocess.Popen:
+    # stub/DB 설정이 담긴 현재 환경 변수를 그대로 물려받고, 앱 로그는 파일로 보낸다
+    log = open(log_path, "w")
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ],
+        env=dict(os.environ),
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"App process exited during startup, see {log_path}")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1).raise_for_status()
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.5)
+    process.terminate()
+    raise SystemExit("App did not become ready within 60s")
+
+
+async def run(args, target: str) -> list[dict]:
+    workload = Workload(args.mix, args.corpus_size, args.seed)
+    limits = httpx.Limits(max_connections=max(args.stages) + 10)
+    stages = []
+    async with httpx.AsyncClient(
+        base_url=target, timeout=args.timeout, limits=limits
+    ) as client:
+        for concurrency in args.stages:
+            stage = await run_stage(client, workload, concurrency, args.stage_seconds)
+            stages.append(stage)
+            print(
+                f"concurrency={concurrency:<4} rps={stage['throughput_rps']:<8} "
+                f"errors={stage['error_rate']:<6} p50={stage.get('p50_ms', '-')}ms "
+                f"p95={stage.get('p95_ms', '-')}ms p99={stage.get('p99_ms', '-')}ms "
+                f"probe_p95={stage['probe'].get('p95_ms', '-')}ms"
+            )
+    return stages
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--target", default="", help="이미 떠 있는 앱의 주소")
+    parser.add_argument(
+        "--stages",
+        default="1,4,16,64",
+        type=lambda value: [int(c) for c in value.split(",")],
+    )
+    parser.add_argument("--stage-seconds", type=float, default=20)
+    parser.add_argument(
+        "--mix", type=parse_mix, default="new=0.2,similar=0.1,repeat=0.5,compare=0.2"
+    )
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--database-url", default="")
+    parser.add_argument("--corpus-size", type=int, default=10000)
+    parser.add_argument("--comparisons", type=int, default=2)
+    parser.add_argument("--app-port", type=int, default=8000)
+    parser.add_argument("--app-workers", type=int, default=1)
+    parser.add_argument("--app-log", default="loadtest-app.log")
+    parser.add_argument("--stub-port", type=int, default=8001)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="loadtest.json")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    stub = None
+    app_process = None
+    target = args.target
+    if not target:
+        # 로컬 실행: stub 서버, 합성 데이터 DB, uvicorn 앱을 차례로 띄운다
+        args.database_url = resolve_database_url(args.database_url)
+        configure_environment(args.database_url, args.stub_port)
+        stub = StubServer(stub_options(args), port=args.stub_port).__enter__()
+        if args.corpus_size:
+            from app.database import dispose_engines
+
+            async def seed():
+                await seed_database(
+                    args.corpus_size, args.dim, args.comparisons, args.seed
+                )
+                await dispose_engines()
+
+            asyncio.run(seed())
+        app_process = start_app(args.app_port, args.app_workers, args.app_log)
+        target = f"http://127.0.0.1:{args.app_port}"
+    else:
+        # 외부 앱의 데이터는 알 수 없으므로 응답으로 알게 된 경험만 재사용
+        args.corpus_size = 0
+
+    try:
+        stages = asyncio.run(run(args, target))
+    finally:
+        if app_process is not None:
+            app_process.terminate()
+            app_process.wait(timeout=30)
+        if stub is not None:
+            stub.__exit__(None, None, None)
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "target": "local" if not args.target else args.target,
+        "options": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("database_url", "output", "target")
+        },
+        "stages": stages,
+    }
+    if stub is not None:
+        report["openai_stub_calls"] = stub.app.state.calls
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+# app.config 의 Settings 는 import 시점에 환경 변수를 읽으므로 app 모듈보다 먼저 설정
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db(tmp_path, monkeypatch):
+    # 테스트마다 새 SQLite 파일 DB, AsyncSessionLocal 도 같은 엔진을 쓰도록 교체
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    import app.models.models as models
+    from app import database
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+    monkeypatch.setattr(database, "_async_engine", engine)
+    async with database.AsyncSessionLocal() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+def indexes(monkeypatch):
+    # crud 가 쓰는 메모리 인덱스를 테스트마다 비어 있는 새 인스턴스로 교체
+    from app.crud import crud
+    from app.utils.embedding_index import EmbeddingIndex
+    from app.utils.index_sync import IndexSync
+    from app.utils.score_index import ScoreIndex
+
+    embedding_index, score_index = EmbeddingIndex(), ScoreIndex()
+    monkeypatch.setattr(crud, "embedding_index", embedding_index)
+    monkeypatch.setattr(crud, "score_index", score_index)
+    monkeypatch.setattr(crud, "index_sync", IndexSync())
+    return embedding_index, score_index
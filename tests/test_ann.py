@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from app.utils.ann import IVFIndex
+from app.utils.embedding_index import EmbeddingIndex
+
+
+def clustered_vectors(count: int, dim: int = 16, clusters: int = 8, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    labels = rng.integers(0, clusters, count)
+    return (centers[labels] + 0.1 * rng.normal(size=(count, dim))).astype(np.float32)
+
+
+def assert_all_searchable(index: IVFIndex, vectors: np.ndarray) -> None:
+    assert len(index) == len(vectors)
+    for i, vector in enumerate(vectors):
+        assert index.search(vector, k=1, nprobe=index.nlist)[0][0] == i
+
+
+def test_exhaustive_probe_matches_exact_search():
+    vectors = clustered_vectors(500)
+    ivf = IVFIndex(nlist=8, min_train_size=1)
+    ivf.load(enumerate(vectors))
+    exact = EmbeddingIndex()
+    exact.load(enumerate(vectors))
+
+    assert ivf.is_trained
+    for query in clustered_vectors(20, seed=1):
+        assert [i for i, _ in ivf.search(query, k=5, nprobe=8)] == [
+            i for i, _ in exact.search(query, k=5)
+        ]
+
+
+def test_membership_across_lists():
+    vectors = clustered_vectors(200)
+    ivf = IVFIndex(nlist=8, min_train_size=1)
+    ivf.load(enumerate(vectors[:100]))
+    for i, vector in enumerate(vectors[100:], 100):
+        ivf.add(i, vector)
+    assert all(i in ivf for i in range(200))
+    assert 200 not in ivf
+
+
+def test_untrained_index_is_exact_until_min_train_size():
+    vectors = clustered_vectors(50)
+    index = IVFIndex(nlist=4, min_train_size=100)
+    for i, vector in enumerate(vectors):
+        index.add(i, vector)
+    assert not index.is_trained
+    assert_all_searchable(index, vectors)
+
+
+def test_add_outside_event_loop_trains_inline():
+    vectors = clustered_vectors(200)
+    index = IVFIndex(nlist=4, min_train_size=200)
+    for i, vector in enumerate(vectors):
+        index.add(i, vector)
+    assert index.is_trained
+    assert index.rebuild_task is None
+    assert_all_searchable(index, vectors)
+
+
+def test_adds_during_rebuild_are_replayed(monkeypatch):
+    vectors = clustered_vectors(400)
+    index = IVFIndex(nlist=4, min_train_size=1)
+    index.load(enumerate(vectors[:300]))
+    train = index._train
+
+    def train_while_adding(ids, snapshot):
+        # 학습이 도는 동안 다른 요청이 벡터를 추가하는 상황
+        for i in range(300, 400):
+            index.add(i, vectors[i])
+        return train(ids, snapshot)
+
+    monkeypatch.setattr(index, "_train", train_while_adding)
+    index.rebuild()
+
+    assert index._replay is None
+    assert_all_searchable(index, vectors)
+
+
+def test_load_during_rebuild_wins(monkeypatch):
+    vectors = clustered_vectors(300)
+    index = IVFIndex(nlist=4, min_train_size=1)
+    index.load(enumerate(vectors[:100]))
+    train = index._train
+
+    def train_while_reloading(ids, snapshot):
+        monkeypatch.setattr(index, "_train", train)
+        index.load(enumerate(vectors))
+        return train(ids, snapshot)
+
+    monkeypatch.setattr(index, "_train", train_while_reloading)
+    index.rebuild()
+    assert_all_searchable(index, vectors)
+
+
+@pytest.mark.anyio
+async def test_threshold_rebuild_runs_in_background():
+    vectors = clustered_vectors(300)
+    index = IVFIndex(nlist=4, min_train_size=200)
+    for i, vector in enumerate(vectors[:200]):
+        index.add(i, vector)
+
+    # 학습은 스레드에서 돌고, 그동안의 add 와 검색은 기존 리스트로 처리된다
+    assert index.rebuild_task is not None
+    for i in range(200, 300):
+        index.add(i, vectors[i])
+    await index.rebuild_task
+
+    assert index.is_trained
+    assert_all_searchable(index, vectors)
@@ -0,0 +1,92 @@
+import pytest
+
+from app.crud import crud
+
+
+def item(text: str, score: float, embedding=(1.0, 0.0)) -> dict:
+    return {
+        "text": text,
+        "embedding": list(embedding),
+        "difficulty_score": score,
+        "difficulty_scores": [score] * 10,
+    }
+
+
+@pytest.mark.anyio
+async def test_create_experiences_bulk_inserts_and_indexes(db, indexes):
+    embedding_index, score_index = indexes
+    created = await crud.create_experiences(
+        [item("a", 10.0, (1.0, 0.0)), item("b", 90.0, (0.0, 1.0))], db
+    )
+
+    assert sorted(exp.text for exp in created.values()) == ["a", "b"]
+    assert len(embedding_index) == 2
+    assert len(score_index) == 2
+    b = next(exp for exp in created.values() if exp.text == "b")
+    assert embedding_index.search([0.0, 1.0])[0][0] == b.id
+    assert await crud.get_total_experiences_count(db) == 2
+
+
+@pytest.mark.anyio
+async def test_create_experiences_skips_existing_texts(db, indexes):
+    _, score_index = indexes
+    existing = await crud.create_experience("a", [1.0, 0.0], 10.0, [10.0] * 10, db)
+    created = await crud.create_experiences([item("A ", 50.0), item("c", 30.0)], db)
+
+    assert {exp.text for exp in created.values()} == {"a", "c"}
+    assert created[existing.text_hash].difficulty_score == 10.0
+    assert len(score_index) == 2
+
+
+@pytest.fixture
+async def client(db, indexes, monkeypatch):
+    import httpx
+
+    from app.api.endpoints import experience
+    from app.main import app
+
+    embedded = []
+
+    async def fake_get_embeddings(texts):
+        embedded.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    async def fake_score(text, neighbours):
+        return float(len(text)), [float(len(text))] * 10, "llm_analysis"
+
+    monkeypatch.setattr(experience, "get_embeddings", fake_get_embeddings)
+    monkeypatch.setattr(experience, "score_new_experience", fake_score)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        c.embedded = embedded
+        yield c
+
+
+@pytest.mark.anyio
+async def test_batch_endpoint_embeds_each_new_text_once(client, db):
+    await crud.create_experience("seen", [1.0, 0.0], 5.0, [5.0] * 10, db)
+    response = await client.post(
+        "/api/estimate/batch", json={"texts": ["seen", "new", "New ", "other"]}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert client.embedded == ["new", "other"]
+    assert body["created"] == 2
+    assert body["total_experiences"] == 3
+    assert [r["scoring_path"] for r in body["results"]] == [
+        "existing",
+        "llm_analysis",
+        "llm_analysis",
+        "llm_analysis",
+    ]
+    assert body["results"][1]["experience"] == body["results"][2]["experience"]
+
+
+@pytest.mark.anyio
+async def test_batch_endpoint_rejects_oversized_batches(client, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "batch_max_size", 2)
+    response = await client.post("/api/estimate/batch", json={"texts": ["a"] * 3})
+    assert response.status_code == 413
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from app.utils.cache import LRUCache, SQLiteStore, TieredCache
+
+
+def test_store_opens_file_on_first_use(tmp_path):
+    path = tmp_path / "cache" / "store.sqlite3"
+    store = SQLiteStore(str(path), table="embeddings")
+    assert not path.parent.exists()
+
+    assert store.get("missing") is None
+    assert path.exists()
+
+
+def test_get_many_and_set_many(tmp_path):
+    store = SQLiteStore(str(tmp_path / "store.sqlite3"))
+    store.GET_MANY_CHUNK = 3
+    store.set_many([(f"key-{i}", bytes([i])) for i in range(10)])
+    store.set("key-0", b"updated")
+
+    found = store.get_many([f"key-{i}" for i in range(12)])
+    assert len(found) == 10
+    assert found["key-0"] == b"updated"
+    assert found["key-9"] == bytes([9])
+
+
+def test_shared_file_between_stores(tmp_path):
+    # 다른 워커 프로세스의 저장소가 쓴 값도 읽힌다
+    path = str(tmp_path / "store.sqlite3")
+    SQLiteStore(path).set("key", b"value")
+    assert SQLiteStore(path).get("key") == b"value"
+
+
+def test_unwritable_path_is_a_miss(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    store = SQLiteStore(str(blocker / "store.sqlite3"))
+    store.set("key", b"value")
+    assert store.get("key") is None
+
+
+def test_expired_entries_are_misses(tmp_path, monkeypatch):
+    store = SQLiteStore(str(tmp_path / "store.sqlite3"), ttl=60)
+    store.set("key", b"value")
+    assert store.get("key") == b"value"
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert store.get("key") is None
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_cache_expires_entries(monkeypatch):
+    now = time.monotonic()
+    cache = LRUCache(maxsize=10, ttl=5)
+    cache.set("key", "value")
+    monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+    assert cache.get("key") is None
+    assert cache.stats()["expirations"] == 1
+
+
+@pytest.mark.anyio
+async def test_tiered_cache_promotes_store_hits(tmp_path):
+    store = SQLiteStore(str(tmp_path / "store.sqlite3"))
+    await TieredCache(LRUCache(maxsize=10), store).set("key", "värde")
+
+    cache = TieredCache(LRUCache(maxsize=10), store)
+    assert await cache.get("key") == "värde"
+    assert await cache.get("key") == "värde"
+    assert await cache.get("missing") is None
+    stats = cache.stats()
+    assert (stats["store_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 1)
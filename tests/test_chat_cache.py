@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import gpt
+from app.utils.cache import LRUCache, SQLiteStore, TieredCache
+
+
+@pytest.fixture
+def completions(monkeypatch, tmp_path):
+    # 호출마다 미리 정한 응답을 차례로 돌려주는 가짜 chat completion
+    replies = []
+
+    async def fake_call_openai_hedged(kind, model, create, **params):
+        content = replies.pop(0)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+        )
+
+    monkeypatch.setattr(gpt, "call_openai_hedged", fake_call_openai_hedged)
+    monkeypatch.setattr(
+        gpt,
+        "llm_response_cache",
+        TieredCache(
+            LRUCache(maxsize=10),
+            SQLiteStore(str(tmp_path / "chat.sqlite3"), table="chat_completions"),
+        ),
+    )
+    return replies
+
+
+async def complete(prompt: str = "prompt") -> float:
+    return await gpt.create_chat_completion(
+        gpt.parse_score,
+        model="model",
+        messages=[{"role": "user", "content": prompt}],
+    )
+
+
+@pytest.mark.anyio
+async def test_identical_requests_hit_the_cache(completions):
+    completions.extend(["42", "43"])
+    assert await complete() == 42
+    assert await complete() == 42
+    assert await complete("other") == 43
+    assert completions == []
+
+
+@pytest.mark.anyio
+async def test_unparseable_responses_are_not_cached(completions):
+    completions.extend(["not a number", "42"])
+    with pytest.raises(ValueError):
+        await complete()
+    assert await complete() == 42
+
+
+@pytest.mark.anyio
+async def test_bypass_refreshes_the_cached_response(completions):
+    completions.extend(["42", "50"])
+    await complete()
+    token = gpt.llm_cache_bypass.set(True)
+    try:
+        assert await complete() == 50
+    finally:
+        gpt.llm_cache_bypass.reset(token)
+    assert await complete() == 50
+    assert gpt.llm_response_cache.bypassed == 1
@@ -0,0 +1,80 @@
+import httpx
+import pytest
+
+from app.crud import crud
+
+
+@pytest.fixture
+async def client(db, indexes):
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+async def create_ranked(db, count: int) -> list[int]:
+    # 점수 10, 11, 12, ... 인 경험을 만들고 id 를 점수 순서로 돌려준다
+    ids = []
+    for i in range(count):
+        exp = await crud.create_experience(
+            f"experience {i}", [1.0, 0.0], 10.0 + i, [10.0 + i] * 10, db
+        )
+        ids.append(exp.id)
+    return ids
+
+
+def comparison(experience_id: int, **ids) -> dict:
+    return {
+        "experience_id": experience_id,
+        "is_more_difficult_than_lower": True,
+        "is_less_difficult_than_higher": True,
+        **ids,
+    }
+
+
+@pytest.mark.anyio
+async def test_compare_records_neighbours(client, db):
+    ids = await create_ranked(db, 3)
+    response = await client.post(
+        "/api/compare", json=comparison(ids[1], lower_id=ids[0], higher_id=ids[2])
+    )
+    assert response.status_code == 200
+    assert response.json()["id"] == ids[1]
+
+
+@pytest.mark.anyio
+async def test_compare_rejects_unknown_id(client, db):
+    ids = await create_ranked(db, 3)
+    response = await client.post(
+        "/api/compare", json=comparison(ids[1], lower_id=ids[0], higher_id=9999)
+    )
+    assert response.status_code == 422
+    assert "9999" in response.json()["detail"]
+
+
+@pytest.mark.anyio
+async def test_compare_rejects_self_and_far_away_ids(client, db, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "compare_neighbour_window", 2)
+    ids = await create_ranked(db, 6)
+    response = await client.post(
+        "/api/compare", json=comparison(ids[0], higher_id=ids[5])
+    )
+    assert response.status_code == 422
+    response = await client.post(
+        "/api/compare", json=comparison(ids[0], lower_id=ids[0])
+    )
+    assert response.status_code == 422
+    # 창 안이면 바로 옆 이웃이 아니어도 허용
+    response = await client.post(
+        "/api/compare", json=comparison(ids[0], higher_id=ids[2])
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.anyio
+async def test_compare_unknown_experience_is_404(client, db):
+    response = await client.post("/api/compare", json=comparison(9999))
+    assert response.status_code == 404
@@ -0,0 +1,25 @@
+import pytest
+
+from app.crud import crud
+from app.utils.metrics import crud_seconds
+
+
+def call_count(function: str) -> int:
+    entry = crud_seconds._values.get((function,))
+    return entry[2] if entry else 0
+
+
+@pytest.mark.anyio
+async def test_crud_calls_are_timed_once(db, indexes):
+    before = {
+        name: call_count(name)
+        for name in ("create_experience", "calculate_relative_difficulty")
+    }
+    await crud.create_experience("Ran a marathon", [1.0, 0.0], 70.0, None, db)
+
+    assert call_count("create_experience") == before["create_experience"] + 1
+    # 안에서 부르는 조회는 따로 기록하지 않는다
+    assert (
+        call_count("calculate_relative_difficulty")
+        == before["calculate_relative_difficulty"]
+    )
@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.utils import gpt
+from app.utils.cache import LRUCache, SQLiteStore
+
+
+@pytest.fixture
+def openai_calls(monkeypatch, tmp_path):
+    # 실제 API 대신 텍스트 길이로 만든 임베딩을 돌려주고 요청된 input 을 기록
+    calls = []
+
+    async def fake_call_openai(kind, model, create, input):
+        calls.append(input)
+        texts = input if isinstance(input, list) else [input]
+        return SimpleNamespace(
+            data=[
+                SimpleNamespace(index=i, embedding=[float(len(text)), 1.0])
+                for i, text in enumerate(texts)
+            ]
+        )
+
+    monkeypatch.setattr(gpt, "call_openai", fake_call_openai)
+    monkeypatch.setattr(gpt, "embedding_memory_cache", LRUCache(maxsize=100))
+    monkeypatch.setattr(
+        gpt,
+        "embedding_store",
+        SQLiteStore(str(tmp_path / "embeddings.sqlite3"), table="embeddings"),
+    )
+    return calls
+
+
+@pytest.mark.anyio
+async def test_get_embedding_uses_normalized_cache(openai_calls):
+    assert await gpt.get_embedding("Hello  World") == [12.0, 1.0]
+    assert await gpt.get_embedding("hello world ") == [12.0, 1.0]
+    assert openai_calls == ["Hello  World"]
+
+
+@pytest.mark.anyio
+async def test_store_survives_memory_eviction(openai_calls):
+    await gpt.get_embedding("persisted")
+    gpt.embedding_memory_cache.clear()
+
+    cached = await gpt.get_cached_embeddings([gpt.embedding_cache_key("persisted")])
+    assert [vector.tolist() for vector in cached.values()] == [[9.0, 1.0]]
+    assert await gpt.get_embedding("persisted") == [9.0, 1.0]
+    assert len(openai_calls) == 1
+
+
+@pytest.mark.anyio
+async def test_get_embeddings_requests_only_missing_texts(openai_calls):
+    await gpt.get_embedding("a")
+    embeddings = await gpt.get_embeddings(["a", "bb", "bb", "ccc"], chunk_size=1)
+
+    assert embeddings == [[1.0, 1.0], [2.0, 1.0], [2.0, 1.0], [3.0, 1.0]]
+    assert openai_calls == ["a", ["bb"], ["ccc"]]
+    stored = gpt.embedding_store.get(gpt.embedding_cache_key("ccc"))
+    assert np.frombuffer(stored, dtype="<f4").tolist() == [3.0, 1.0]
+
+
+@pytest.mark.anyio
+async def test_miss_and_hit_return_same_float32_values(openai_calls, monkeypatch):
+    async def fake_call_openai(kind, model, create, input):
+        texts = input if isinstance(input, list) else [input]
+        return SimpleNamespace(
+            data=[
+                SimpleNamespace(index=i, embedding=[0.1, 0.2])
+                for i in range(len(texts))
+            ]
+        )
+
+    monkeypatch.setattr(gpt, "call_openai", fake_call_openai)
+    expected = np.asarray([0.1, 0.2], dtype=np.float32).tolist()
+    assert await gpt.get_embedding("miss") == expected
+    assert await gpt.get_embedding("miss") == expected
+    assert await gpt.get_embeddings(["batch miss", "batch miss"]) == [expected] * 2
+    assert await gpt.get_embeddings(["batch miss"]) == [expected]
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from app.utils.embedding_codec import decode_embedding, encode_embedding
+
+
+@pytest.fixture
+def embedding():
+    return np.random.default_rng(0).normal(scale=0.05, size=3072).astype(np.float32)
+
+
+def test_float32_round_trip_is_exact(embedding):
+    blob, scale = encode_embedding(embedding.tolist(), "float32")
+    assert scale is None
+    assert len(blob) == 4 * len(embedding)
+    np.testing.assert_array_equal(decode_embedding(blob, scale), embedding)
+
+
+def test_int8_round_trip_error_is_bounded(embedding):
+    blob, scale = encode_embedding(embedding, "int8")
+    assert len(blob) == len(embedding)
+    decoded = decode_embedding(blob, scale)
+
+    # 반올림 오차는 원소마다 scale 의 절반 이하
+    assert scale == pytest.approx(np.max(np.abs(embedding)) / 127)
+    assert np.max(np.abs(decoded - embedding)) <= scale / 2 + 1e-7
+    cosine = decoded @ embedding / (np.linalg.norm(decoded) * np.linalg.norm(embedding))
+    assert cosine > 0.999
+
+
+def test_int8_zero_vector():
+    blob, scale = encode_embedding([0.0, 0.0, 0.0], "int8")
+    assert scale == 1.0
+    np.testing.assert_array_equal(decode_embedding(blob, scale), [0.0, 0.0, 0.0])
+
+
+def test_unsupported_storage():
+    with pytest.raises(ValueError):
+        encode_embedding([1.0], "array")
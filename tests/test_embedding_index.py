@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from app.utils.embedding_index import EmbeddingIndex
+
+
+def brute_force(vectors: np.ndarray, query: np.ndarray, k: int) -> list[int]:
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normalized @ (query / np.linalg.norm(query))
+    return np.argsort(-scores)[:k].tolist()
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(0).normal(size=(300, 16)).astype(np.float32)
+
+
+def test_search_matches_brute_force(vectors):
+    index = EmbeddingIndex(initial_capacity=4)
+    for i, vector in enumerate(vectors):
+        index.add(i, vector)
+
+    assert len(index) == len(vectors)
+    queries = np.random.default_rng(1).normal(size=(20, 16))
+    for query in queries:
+        found = index.search(query, k=5)
+        assert [i for i, _ in found] == brute_force(vectors, query, 5)
+        scores = [score for _, score in found]
+        assert scores == sorted(scores, reverse=True)
+
+
+def test_load_and_add_agree(vectors):
+    loaded = EmbeddingIndex()
+    loaded.load(enumerate(vectors[:200]))
+    for i in range(200, len(vectors)):
+        loaded.add(i, vectors[i])
+
+    query = vectors[250] + 0.01
+    assert loaded.search(query, k=1)[0][0] == 250
+    assert [i for i, _ in loaded.search(query, k=10)] == brute_force(vectors, query, 10)
+
+
+def test_search_batch_matches_search(vectors):
+    index = EmbeddingIndex()
+    index.load(enumerate(vectors))
+    queries = vectors[:5] * 2
+    for batch, single in zip(
+        index.search_batch(queries, k=3), [index.search(q, k=3) for q in queries]
+    ):
+        assert [i for i, _ in batch] == [i for i, _ in single]
+        assert [s for _, s in batch] == pytest.approx([s for _, s in single], abs=1e-6)
+
+
+def test_load_skips_missing_and_mismatched_embeddings():
+    index = EmbeddingIndex()
+    index.load([(1, [1.0, 0.0]), (2, None), (3, [1.0, 0.0, 0.0]), (4, [0.0, 1.0])])
+    assert index.is_loaded
+    assert index.ids().tolist() == [1, 4]
+
+
+def test_empty_index_and_dim_mismatch():
+    index = EmbeddingIndex()
+    assert index.search([1.0, 0.0]) == []
+    assert index.search_batch([[1.0, 0.0]], k=2) == [[]]
+
+    index.add(1, [1.0, 0.0])
+    with pytest.raises(ValueError):
+        index.add(2, [1.0, 0.0, 0.0])
+    with pytest.raises(ValueError):
+        index.search([1.0, 0.0, 0.0])
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+import app.models.models as models
+from app import worker
+from app.crud import crud
+
+
+@pytest.mark.anyio
+async def test_claim_and_finish(db):
+    job_id = (await crud.create_estimate_job("Ran a marathon", db)).id
+
+    claimed = await crud.claim_estimate_job(db)
+    assert (claimed.id, claimed.status, claimed.attempts) == (job_id, "running", 1)
+    # running 작업은 다시 가져가지 않는다
+    assert await crud.claim_estimate_job(db) is None
+
+    await crud.finish_estimate_job(job_id, db, result={"score": 1})
+    finished = await crud.get_estimate_job(job_id, db)
+    assert finished.status == "done"
+    assert finished.result == {"score": 1}
+
+
+@pytest.mark.anyio
+async def test_claim_oldest_first(db):
+    first = await crud.create_estimate_job("first", db)
+    await crud.create_estimate_job("second", db)
+    assert (await crud.claim_estimate_job(db)).id == first.id
+
+
+async def make_stale(db, job_id, attempts):
+    await db.execute(
+        update(models.EstimateJob)
+        .where(models.EstimateJob.id == job_id)
+        .values(
+            status="running",
+            attempts=attempts,
+            started_at=datetime.utcnow() - timedelta(minutes=10),
+        )
+    )
+    await db.commit()
+
+
+@pytest.mark.anyio
+async def test_requeue_stale_jobs(db):
+    retry = await crud.create_estimate_job("retry", db)
+    abandoned = await crud.create_estimate_job("abandoned", db)
+    fresh = await crud.create_estimate_job("fresh", db)
+    await make_stale(db, retry.id, attempts=1)
+    await make_stale(db, abandoned.id, attempts=3)
+    await crud.claim_estimate_job(db)  # fresh: 방금 시작한 작업
+
+    requeued = await crud.requeue_stale_estimate_jobs(
+        db, stale_after=60, max_attempts=3
+    )
+    assert requeued == 1
+    assert (await crud.get_estimate_job(retry.id, db)).status == "pending"
+    failed = await crud.get_estimate_job(abandoned.id, db)
+    assert failed.status == "failed"
+    assert failed.error
+    assert (await crud.get_estimate_job(fresh.id, db)).status == "running"
+
+
+@pytest.mark.anyio
+async def test_worker_records_failure(db, monkeypatch):
+    async def failing_estimate(text, db):
+        raise RuntimeError("OpenAI down")
+
+    monkeypatch.setattr(worker, "estimate_text", failing_estimate)
+    job = await crud.create_estimate_job("Ran a marathon", db)
+
+    assert await worker.process_next_job() is True
+    failed = await crud.get_estimate_job(job.id, db)
+    assert failed.status == "failed"
+    assert failed.error == "OpenAI down"
+    assert await worker.process_next_job() is False
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from app.utils.gpt import (
+    parse_difficulty_assessment,
+    parse_difficulty_scores,
+    parse_score,
+)
+
+
+@pytest.mark.parametrize("content", ["42", " 42.5\n", "0", "100", "99.99"])
+def test_parse_score_accepts_scores_in_range(content):
+    assert parse_score(content) == float(content)
+
+
+@pytest.mark.parametrize(
+    "content", ["nan", "inf", "-inf", "-5", "250", "1e9", "100.01", "", "about 40"]
+)
+def test_parse_score_rejects_invalid_scores(content):
+    with pytest.raises(ValueError, match="Invalid difficulty score"):
+        parse_score(content)
+
+
+def test_parse_difficulty_scores():
+    assert parse_difficulty_scores(json.dumps([1] * 10)) == [1.0] * 10
+    assert parse_difficulty_scores("[0, 100, 55.5" + ", 10" * 7 + "]")[:3] == [
+        0.0,
+        100.0,
+        55.5,
+    ]
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        json.dumps([1] * 9),
+        json.dumps([1] * 11),
+        "[NaN" + ", 10" * 9 + "]",
+        "[Infinity" + ", 10" * 9 + "]",
+        "[-Infinity" + ", 10" * 9 + "]",
+        json.dumps([250] + [10] * 9),
+        json.dumps([-40] + [10] * 9),
+        json.dumps([True] + [10] * 9),
+        json.dumps(["50"] + [10] * 9),
+        json.dumps({"metrics": [10] * 10}),
+        "not json",
+    ],
+)
+def test_parse_difficulty_scores_rejects_invalid(content):
+    with pytest.raises(ValueError, match="Invalid difficulty scores"):
+        parse_difficulty_scores(content)
+
+
+def test_parse_difficulty_assessment():
+    assessment = parse_difficulty_assessment(
+        json.dumps({"overall": 55.5, "metrics": [10] * 10})
+    )
+    assert assessment.overall == 55.5
+    assert assessment.metrics == [10.0] * 10
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"overall": 101, "metrics": [10] * 10},
+        {"overall": 50, "metrics": [10] * 9},
+        {"overall": 50, "metrics": [10] * 9 + [-1]},
+        {"metrics": [10] * 10},
+        {"overall": True, "metrics": [10] * 10},
+        {"overall": "50", "metrics": [10] * 10},
+        {"overall": 50, "metrics": [True] + [10] * 9},
+    ],
+)
+def test_parse_difficulty_assessment_rejects_invalid(payload):
+    with pytest.raises(ValueError, match="Invalid difficulty assessment"):
+        parse_difficulty_assessment(json.dumps(payload))
+
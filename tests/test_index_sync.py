@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+import app.models.models as models
+from app.crud import crud
+from app.utils.embedding_index import EmbeddingIndex
+from app.utils.score_index import ScoreIndex
+
+
+def test_embedding_index_membership():
+    index = EmbeddingIndex()
+    index.load([(1, [1.0, 0.0])])
+    index.add(2, [0.0, 1.0])
+    assert 1 in index and 2 in index
+    assert 3 not in index
+
+
+async def insert_from_other_process(db, text, embedding, score, **columns):
+    # 인덱스를 거치지 않고 DB 에만 저장 (워커 프로세스, 다른 uvicorn 워커)
+    experience = models.Experience(
+        text=text, difficulty_score=score, base_difficulty_score=score, **columns
+    )
+    crud.set_experience_embedding(experience, embedding)
+    db.add(experience)
+    await db.commit()
+    return experience.id
+
+
+async def load_indexes(db):
+    await crud.load_embedding_index(db)
+    await crud.load_score_index(db)
+
+
+@pytest.mark.anyio
+async def test_reconcile_adds_rows_stored_by_other_processes(db, indexes):
+    embedding_index, score_index = indexes
+    first = await insert_from_other_process(db, "Ran a marathon", [1.0, 0.0], 70.0)
+    await load_indexes(db)
+
+    other = await insert_from_other_process(db, "Climbed Everest", [0.0, 1.0], 95.0)
+    local = await crud.create_experience("Baked bread", [0.6, 0.8], 20.0, None, db)
+    assert len(embedding_index) == 2
+    assert len(score_index) == 2
+
+    assert await crud.reconcile_indexes(db) == 1
+    assert sorted(embedding_index.ids()) == [first, other, local.id]
+    assert len(score_index) == 3
+    assert embedding_index.search([0.0, 1.0], k=1)[0][0] == other
+
+    # 겹쳐 읽은 행은 다시 추가하지 않는다
+    assert await crud.reconcile_indexes(db) == 0
+    assert len(embedding_index) == 3
+    assert len(score_index) == 3
+
+
+@pytest.mark.anyio
+async def test_reconcile_finds_rows_committed_out_of_id_order(db, indexes):
+    embedding_index, _ = indexes
+    await load_indexes(db)
+    await insert_from_other_process(db, "Climbed Everest", [0.0, 1.0], 95.0, id=10)
+    assert await crud.reconcile_indexes(db) == 1
+
+    # 더 작은 id 를 먼저 받은 트랜잭션이 나중에 커밋된 경우
+    started = datetime.utcnow() - timedelta(seconds=5)
+    await insert_from_other_process(
+        db, "Ran a marathon", [1.0, 0.0], 70.0, id=5, created_at=started
+    )
+    assert await crud.reconcile_indexes(db) == 1
+    assert sorted(embedding_index.ids()) == [5, 10]
+
+
+@pytest.mark.anyio
+async def test_reconcile_applies_score_changes_from_other_processes(db, indexes):
+    _, score_index = indexes
+    easy = await insert_from_other_process(db, "Walked the dog", [1.0, 0.0], 20.0)
+    hard = await insert_from_other_process(db, "Ran a marathon", [0.0, 1.0], 70.0)
+    for i in range(10):
+        await insert_from_other_process(db, f"Hard thing {i}", [0.5, 0.5], 90.0)
+    await load_indexes(db)
+    assert score_index.lower(50.0)[1] == easy
+
+    # 다른 워커의 /api/compare 가 점수를 바꿈
+    await db.execute(
+        update(models.Experience)
+        .where(models.Experience.id == hard)
+        .values(difficulty_score=10.0, score_updated_at=datetime.utcnow())
+    )
+    await db.commit()
+    await crud.reconcile_indexes(db)
+    assert score_index.lower(50.0)[1] == easy
+    assert score_index.lower(15.0)[1] == hard
+    assert score_index.percentile(20.0) == pytest.approx(100 * 2 / 12)
+
+
+@pytest.mark.anyio
+async def test_reconcile_skips_indexes_that_are_not_loaded(db, indexes):
+    embedding_index, score_index = indexes
+    await insert_from_other_process(db, "Ran a marathon", [1.0, 0.0], 70.0)
+    assert await crud.reconcile_indexes(db) == 0
+    assert len(embedding_index) == 0
+    assert len(score_index) == 0
+
+
+@pytest.mark.anyio
+async def test_rerank_in_another_process_reaches_score_index(db, indexes, monkeypatch):
+    _, score_index = indexes
+    easy = await insert_from_other_process(db, "Walked the dog", [1.0, 0.0], 40.0)
+    hard = await insert_from_other_process(db, "Ran a marathon", [0.0, 1.0], 60.0)
+    await load_indexes(db)
+    await crud.create_comparisons(easy, [(hard, True)] * 30, db)
+
+    # python -m app.rerank 처럼 이 프로세스의 인덱스를 쓰지 않는 재순위
+    monkeypatch.setattr(crud, "score_index", ScoreIndex())
+    assert await crud.rerank_from_comparisons(db) == 2
+    monkeypatch.setattr(crud, "score_index", score_index)
+    assert score_index.get(easy) == 40.0
+
+    await crud.reconcile_indexes(db)
+    assert score_index.get(easy) > score_index.get(hard)
+    assert score_index.higher(score_index.get(hard))[1] == easy
@@ -0,0 +1,43 @@
+import pytest
+
+from app.utils.knn import predict_from_neighbours
+
+METRICS = [50.0] * 10
+OPTIONS = dict(
+    metric_count=10,
+    min_similarity=0.9,
+    min_neighbours=3,
+    max_score_std=5.0,
+    max_metric_std=10.0,
+)
+
+
+def test_agreeing_neighbours_give_weighted_mean():
+    neighbours = [(0.95, 60.0, METRICS), (0.95, 62.0, METRICS), (0.95, 64.0, METRICS)]
+    score, metrics = predict_from_neighbours(neighbours, **OPTIONS)
+    assert score == pytest.approx(62.0)
+    assert metrics == METRICS
+
+
+def test_closer_neighbours_weigh_more():
+    neighbours = [(1.0, 60.0, METRICS), (0.9, 64.0, METRICS), (0.9, 64.0, METRICS)]
+    score, _ = predict_from_neighbours(neighbours, **OPTIONS)
+    assert 62.0 < score < 64.0
+
+
+def test_too_few_close_neighbours():
+    neighbours = [(0.95, 60.0, METRICS), (0.95, 60.0, METRICS), (0.5, 60.0, METRICS)]
+    assert predict_from_neighbours(neighbours, **OPTIONS) is None
+
+
+def test_disagreeing_neighbours():
+    neighbours = [(0.95, 20.0, METRICS), (0.95, 60.0, METRICS), (0.95, 90.0, METRICS)]
+    assert predict_from_neighbours(neighbours, **OPTIONS) is None
+    spread = [[0.0] * 10, [50.0] * 10, [100.0] * 10]
+    neighbours = [(0.95, 60.0, metrics) for metrics in spread]
+    assert predict_from_neighbours(neighbours, **OPTIONS) is None
+
+
+def test_neighbours_without_metrics_are_ignored():
+    neighbours = [(0.95, 60.0, METRICS)] * 2 + [(0.95, 60.0, None), (0.95, None, None)]
+    assert predict_from_neighbours(neighbours, **OPTIONS) is None
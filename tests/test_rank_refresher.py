@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from app.utils.rank_refresher import RankRefresher
+
+
+@pytest.mark.anyio
+async def test_writes_within_interval_share_one_refresh():
+    refresher = RankRefresher(interval=0.05)
+    refreshed = []
+
+    async def refresh():
+        refreshed.append(refresher.staleness())
+
+    stop = asyncio.Event()
+    runner = asyncio.create_task(refresher.run(stop, refresh))
+    for _ in range(5):
+        refresher.mark_dirty()
+        await asyncio.sleep(0.001)
+    assert refresher.staleness() >= 0
+    await asyncio.sleep(0.1)
+
+    assert len(refreshed) == 1
+    assert refresher.coalesced_writes == 5
+    assert refresher.staleness() == 0.0
+    stop.set()
+    await asyncio.wait_for(runner, 1)
+
+
+@pytest.mark.anyio
+async def test_failed_refresh_is_retried():
+    refresher = RankRefresher(interval=0)
+    calls = []
+
+    async def refresh():
+        calls.append(None)
+        if len(calls) == 1:
+            raise RuntimeError("database unavailable")
+
+    refresher.mark_dirty()
+    await refresher.refresh_now(refresh)
+    assert refresher.dirty_since is not None
+    assert refresher.refreshes == 0
+
+    await refresher.refresh_now(refresh)
+    assert refresher.dirty_since is None
+    assert refresher.coalesced_writes == 1
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+import app.models.models as models
+from app.crud import crud
+from app.utils.ranking import fit_bradley_terry
+
+EMPTY = np.array([], dtype=np.int64)
+
+
+def test_no_comparisons_keeps_prior():
+    prior = np.array([30.0, 50.0, 70.0])
+    np.testing.assert_allclose(fit_bradley_terry(EMPTY, EMPTY, prior), prior)
+
+
+def test_comparisons_reorder_scores():
+    # 0 이 1 보다 어렵다는 비교가 쌓이면 prior 와 반대로 0 이 위로 올라간다
+    prior = np.array([40.0, 60.0, 50.0])
+    winners = np.zeros(20, dtype=np.int64)
+    losers = np.ones(20, dtype=np.int64)
+    scores = fit_bradley_terry(winners, losers, prior, prior_weight=0.1)
+    assert scores[0] > scores[1]
+    # 비교가 없는 항목은 prior 그대로
+    assert scores[2] == pytest.approx(50.0)
+
+
+def test_prior_weight_limits_movement():
+    prior = np.array([50.0, 50.0])
+    winners, losers = np.array([0]), np.array([1])
+    loose = fit_bradley_terry(winners, losers, prior, prior_weight=0.1)
+    strict = fit_bradley_terry(winners, losers, prior, prior_weight=10.0)
+    assert loose[0] - loose[1] > strict[0] - strict[1] > 0
+
+
+def test_warm_start_converges_to_same_scores():
+    rng = np.random.default_rng(0)
+    prior = rng.uniform(0, 100, 50)
+    winners = rng.integers(0, 50, 200)
+    losers = (winners + rng.integers(1, 50, 200)) % 50
+    cold = fit_bradley_terry(winners, losers, prior, tol=1e-8, max_iter=500)
+    warm = fit_bradley_terry(
+        winners, losers, prior, initial=cold + 1.0, tol=1e-8, max_iter=500
+    )
+    np.testing.assert_allclose(warm, cold, atol=1e-3)
+
+
+@pytest.mark.anyio
+async def test_rerank_from_comparisons(db, indexes):
+    _, score_index = indexes
+    easy = await crud.create_experience("Walked the dog", [1.0, 0.0], 40.0, None, db)
+    hard = await crud.create_experience("Ran a marathon", [0.0, 1.0], 60.0, None, db)
+    easy_id, hard_id = easy.id, hard.id
+    await crud.create_comparisons(easy_id, [(hard_id, True)] * 30, db)
+
+    assert await crud.rerank_from_comparisons(db) == 2
+    scores = dict(
+        (
+            await db.execute(
+                select(models.Experience.id, models.Experience.difficulty_score)
+            )
+        ).all()
+    )
+    assert scores[easy_id] > scores[hard_id]
+    assert score_index.percentile(scores[easy_id]) == 100.0
+    # 다시 돌려도 바뀌는 점수는 없다
+    assert await crud.rerank_from_comparisons(db) == 0
@@ -0,0 +1,164 @@
+import asyncio
+import time
+
+import pytest
+
+from app.utils.rate_limit import (
+    LANE_BATCH,
+    LANE_INTERACTIVE,
+    ModelLimiter,
+    PrioritySemaphore,
+    RateLimitScheduler,
+    TokenBucket,
+    parse_duration,
+    retry_after,
+)
+
+
+def test_parse_duration():
+    assert parse_duration("1s") == 1
+    assert parse_duration("6m0s") == 360
+    assert parse_duration("20ms") == pytest.approx(0.02)
+    assert parse_duration("1.5") == 1.5
+    assert parse_duration("") is None
+    assert parse_duration("soon") is None
+
+
+def test_retry_after_prefers_milliseconds():
+    assert retry_after({"retry-after-ms": "200", "retry-after": "5"}) == 0.2
+    assert retry_after({"retry-after": "5"}) == 5
+    assert retry_after({}) is None
+
+
+def test_token_bucket():
+    bucket = TokenBucket(per_minute=60, burst_seconds=2)
+    now = time.monotonic()
+    assert bucket.capacity == 2
+    assert bucket.wait_time(2, now) == 0
+    bucket.take(2)
+    assert bucket.wait_time(1, now) == pytest.approx(1, abs=0.01)
+    # 버킷보다 큰 요청은 가득 찰 때까지만 기다린다
+    assert bucket.wait_time(10, now) == pytest.approx(2, abs=0.01)
+    assert TokenBucket(0, 2).wait_time(1000, now) == 0
+
+
+def test_rate_limit_blocks_until_retry_after():
+    limiter = ModelLimiter(0, 0, 10, learn=False)
+    delay = limiter.observe_rate_limit({"retry-after-ms": "500"}, max_backoff=30)
+    assert delay == 0.5
+    assert limiter.wait_time(1) == pytest.approx(0.5, abs=0.05)
+    assert limiter.rate_limited == 1
+
+
+def test_rate_limit_backoff_doubles_without_header():
+    limiter = ModelLimiter(0, 0, 10, learn=False)
+    for expected in (0.5, 1.0, 2.0):
+        delay = limiter.observe_rate_limit({}, max_backoff=30)
+        assert expected / 2 <= delay <= expected
+    # 성공 응답을 받으면 backoff 초기화
+    limiter.observe_headers({}, utilization=0.9)
+    assert limiter.backoff == 0
+
+
+def test_learns_limits_from_headers():
+    limiter = ModelLimiter(0, 0, 10, learn=True)
+    limiter.observe_headers(
+        {"x-ratelimit-limit-requests": "600", "x-ratelimit-remaining-requests": "0"},
+        utilization=0.5,
+    )
+    assert limiter.requests.per_minute == 300
+    assert limiter.requests.level == 0
+
+
+@pytest.mark.anyio
+async def test_slots_go_to_higher_priority_first():
+    slots = PrioritySemaphore(1)
+    await slots.acquire(1, 0)
+    order = []
+
+    async def waiter(priority, seq):
+        await slots.acquire(priority, seq)
+        order.append(priority)
+        slots.release()
+
+    tasks = [asyncio.create_task(waiter(p, s)) for s, p in enumerate((1, 0, 1), 1)]
+    await asyncio.sleep(0)
+    slots.release()
+    await asyncio.gather(*tasks)
+    assert order == [0, 1, 1]
+    assert slots.in_use == 0
+
+
+@pytest.mark.anyio
+async def test_release_skips_cancelled_waiter():
+    slots = PrioritySemaphore(1)
+    await slots.acquire(0, 0)
+    cancelled = asyncio.create_task(slots.acquire(0, 1))
+    waiting = asyncio.create_task(slots.acquire(1, 2))
+    await asyncio.sleep(0)
+    assert len(slots) == 2
+
+    # 취소된 대기자가 대기열에서 빠지기 전에 release 가 먼저 실행되는 경우
+    cancelled.cancel()
+    slots.release()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    await waiting
+    assert slots.in_use == 1
+    assert len(slots) == 0
+
+    slots.release()
+    assert slots.in_use == 0
+
+
+@pytest.mark.anyio
+async def test_release_without_live_waiters_frees_slot():
+    slots = PrioritySemaphore(1)
+    await slots.acquire(0, 0)
+    cancelled = asyncio.create_task(slots.acquire(0, 1))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    slots.release()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    assert slots.in_use == 0
+    assert len(slots) == 0
+    await asyncio.wait_for(slots.acquire(0, 2), 1)
+
+
+@pytest.mark.anyio
+async def test_cancel_after_handoff_passes_slot_on():
+    slots = PrioritySemaphore(1)
+    await slots.acquire(0, 0)
+    handed = asyncio.create_task(slots.acquire(0, 1))
+    waiting = asyncio.create_task(slots.acquire(1, 2))
+    await asyncio.sleep(0)
+
+    # 슬롯을 넘겨받았지만 재개되기 전에 취소됨
+    slots.release()
+    handed.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await handed
+    await asyncio.wait_for(waiting, 1)
+    assert slots.in_use == 1
+
+
+@pytest.mark.anyio
+async def test_scheduler_interactive_lane_first():
+    scheduler = RateLimitScheduler(max_concurrency=1)
+    await scheduler.acquire("gpt", 10, LANE_BATCH)
+    order = []
+
+    async def call(lane):
+        await scheduler.acquire("gpt", 10, lane)
+        order.append(lane)
+        scheduler.release()
+
+    batch = asyncio.create_task(call(LANE_BATCH))
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(call(LANE_INTERACTIVE))
+    await asyncio.sleep(0)
+    scheduler.release()
+    await asyncio.gather(batch, interactive)
+    assert order == [LANE_INTERACTIVE, LANE_BATCH]
+    assert scheduler.stats()[("all", "in_flight")] == 0
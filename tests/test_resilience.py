@@ -0,0 +1,160 @@
+import asyncio
+
+import pytest
+
+from app.utils.rate_limit import PrioritySemaphore
+from app.utils.resilience import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    CircuitBreaker,
+    HedgeBudget,
+    LatencyTracker,
+    run_hedged,
+)
+
+
+def open_breaker(**kwargs) -> CircuitBreaker:
+    breaker = CircuitBreaker("gpt", window=4, min_calls=4, failure_rate=0.5, **kwargs)
+    for ok in (True, True, False, False):
+        breaker.record(breaker.allow(), ok)
+    assert breaker.state == CIRCUIT_OPEN
+    return breaker
+
+
+def test_breaker_opens_on_failure_rate():
+    breaker = CircuitBreaker("gpt", window=4, min_calls=4, failure_rate=0.5)
+    for ok in (True, False, True):
+        breaker.record(breaker.allow(), ok)
+    assert breaker.state == CIRCUIT_CLOSED
+    # 너무 느린 응답도 실패로 센다
+    breaker.record(breaker.allow(), True, seconds=breaker.slow_call_seconds + 1)
+    assert breaker.state == CIRCUIT_OPEN
+
+
+def test_open_breaker_rejects_until_open_seconds():
+    breaker = open_breaker(open_seconds=60)
+    assert breaker.allow() is None
+    assert breaker.rejected == 1
+    assert 0 < breaker.retry_after() <= 60
+
+
+def test_half_open_closes_after_successful_probes():
+    breaker = open_breaker(open_seconds=0, half_open_calls=2)
+    probes = [breaker.allow(), breaker.allow()]
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    # 시험 호출 수를 넘으면 막는다
+    assert breaker.allow() is None
+    for generation in probes:
+        breaker.record(generation, True)
+    assert breaker.state == CIRCUIT_CLOSED
+
+
+def test_half_open_reopens_on_failed_probe():
+    breaker = open_breaker(open_seconds=0, half_open_calls=2)
+    probe = breaker.allow()
+    other = breaker.allow()
+    breaker.record(probe, False)
+    assert breaker.state == CIRCUIT_OPEN
+    # 상태가 바뀌기 전에 시작된 호출의 결과는 무시
+    breaker.record(other, True)
+    assert breaker.state == CIRCUIT_OPEN
+
+
+def test_release_returns_probe_slot():
+    breaker = open_breaker(open_seconds=0, half_open_calls=1)
+    probe = breaker.allow()
+    assert breaker.allow() is None
+    breaker.release(probe)
+    assert breaker.allow() is not None
+
+
+def test_latency_quantile_needs_min_samples():
+    tracker = LatencyTracker()
+    for seconds in (1.0, 2.0, 3.0):
+        tracker.observe("gpt", seconds)
+    assert tracker.quantile("gpt", 0.5, min_samples=5) is None
+    assert tracker.quantile("gpt", 0.5, min_samples=3) == 2.0
+
+
+def test_hedge_budget():
+    budget = HedgeBudget(ratio=0.5, burst=2)
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    budget.deposit()
+    budget.deposit()
+    assert budget.try_spend()
+
+
+@pytest.mark.anyio
+async def test_hedge_wins_and_slow_call_is_cancelled():
+    # 호출마다 scheduler 슬롯을 잡으므로 취소된 호출도 슬롯을 돌려줘야 한다
+    slots = PrioritySemaphore(2)
+    delays = iter([10.0, 0.01])
+    cancelled = []
+    outcomes = []
+
+    async def call():
+        delay = next(delays)
+        await slots.acquire(0, 0)
+        try:
+            await asyncio.sleep(delay)
+            return delay
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+        finally:
+            slots.release()
+
+    result = await run_hedged(call, 0.01, HedgeBudget(0.1), outcomes.append)
+    await asyncio.sleep(0)
+    assert result == 0.01
+    assert outcomes == ["issued", "won"]
+    assert cancelled == [10.0]
+    assert slots.in_use == 0
+
+
+@pytest.mark.anyio
+async def test_hedge_skipped_without_budget():
+    budget = HedgeBudget(0.0)
+    budget.credit = 0.0
+    outcomes = []
+
+    async def call():
+        await asyncio.sleep(0.02)
+        return "primary"
+
+    assert await run_hedged(call, 0.001, budget, outcomes.append) == "primary"
+    assert outcomes == ["skipped"]
+
+
+@pytest.mark.anyio
+async def test_hedge_falls_back_when_one_call_fails():
+    calls = iter([0.05, 0.0])
+
+    async def call():
+        delay = next(calls)
+        await asyncio.sleep(delay)
+        if delay == 0.0:
+            raise RuntimeError("hedge failed")
+        return "primary"
+
+    assert await run_hedged(call, 0.01, HedgeBudget(0.1)) == "primary"
+
+
+@pytest.mark.anyio
+async def test_caller_cancel_cancels_both_calls():
+    started = []
+
+    async def call():
+        started.append(asyncio.current_task())
+        await asyncio.sleep(10)
+
+    task = asyncio.create_task(run_hedged(call, 0.001, HedgeBudget(0.1)))
+    while len(started) < 2:
+        await asyncio.sleep(0.005)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await asyncio.sleep(0)
+    assert all(t.cancelled() for t in started)
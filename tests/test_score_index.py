@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from app.utils.score_index import ScoreIndex
+
+
+def brute_percentile(scores: dict[int, float], score: float) -> float:
+    if not scores:
+        return 50.0
+    return sum(value <= score for value in scores.values()) / len(scores) * 100
+
+
+def test_percentile_matches_brute_force_under_updates():
+    # 작은 버킷으로 분할/삭제 경로를 모두 거치게 한다
+    rng = random.Random(0)
+    index = ScoreIndex(bucket_size=4)
+    scores: dict[int, float] = {}
+    index.load([])
+    for step in range(2000):
+        experience_id = rng.randrange(300)
+        if rng.random() < 0.2:
+            index.remove(experience_id)
+            scores.pop(experience_id, None)
+        else:
+            score = round(rng.uniform(0, 100), 1)
+            index.add(experience_id, score)
+            scores[experience_id] = score
+        if step % 50 == 0:
+            assert len(index) == len(scores)
+            for query in (0, 12.3, 50, 99.9, 100, rng.uniform(0, 100)):
+                assert index.percentile(query) == pytest.approx(
+                    brute_percentile(scores, query)
+                )
+
+
+def test_load_ignores_missing_scores_and_counts_ties():
+    index = ScoreIndex(bucket_size=2)
+    index.load([(1, 10.0), (2, None), (3, 20.0), (4, 20.0), (5, 30.0)])
+    assert len(index) == 4
+    assert 2 not in index
+    assert index.count_le(20.0) == 3
+    assert index.count_le(5.0) == 0
+    assert index.percentile(30.0) == 100.0
+
+
+def test_add_replaces_existing_score():
+    index = ScoreIndex()
+    index.add(1, 10.0)
+    index.add(1, 90.0)
+    assert len(index) == 1
+    assert index.count_le(50.0) == 0
+    index.add(1, None)
+    assert len(index) == 0
+    assert index.percentile(50.0) == 50.0
+
+
+def test_lower_and_higher_match_brute_force():
+    rng = random.Random(1)
+    entries = [(round(rng.uniform(0, 100), 1), i) for i in range(500)]
+    index = ScoreIndex(bucket_size=8)
+    index.load((i, score) for score, i in entries)
+    entries.sort()
+    for query in [rng.uniform(-5, 105) for _ in range(200)] + [0.0, 100.0]:
+        below = [entry for entry in entries if entry[0] < query]
+        above = [entry for entry in entries if entry[0] > query]
+        assert index.lower(query) == (below[-1] if below else None)
+        assert index.higher(query) == (above[0] if above else None)
+
+
+def test_lower_and_higher_skip_equal_scores():
+    index = ScoreIndex(bucket_size=2)
+    index.load([(1, 10.0), (2, 20.0), (3, 20.0), (4, 30.0)])
+    assert index.lower(20.0) == (10.0, 1)
+    assert index.higher(20.0) == (30.0, 4)
+    assert index.lower(10.0) is None
+    assert index.higher(30.0) is None
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from app.utils.singleflight import SingleFlight
+
+
+@pytest.mark.anyio
+async def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+    release = asyncio.Event()
+
+    async def compute(key):
+        calls.append(key)
+        await release.wait()
+        return f"result-{key}"
+
+    tasks = [
+        asyncio.create_task(flights.do(key, lambda key=key: compute(key)))
+        for key in ("a", "a", "a", "b")
+    ]
+    await asyncio.sleep(0)
+    assert len(flights) == 2
+    release.set()
+
+    assert await asyncio.gather(*tasks) == ["result-a"] * 3 + ["result-b"]
+    assert sorted(calls) == ["a", "b"]
+    assert len(flights) == 0
+
+
+@pytest.mark.anyio
+async def test_errors_are_shared_and_not_remembered():
+    flights = SingleFlight()
+    attempts = 0
+
+    async def flaky():
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(0)
+        if attempts == 1:
+            raise RuntimeError("boom")
+        return "ok"
+
+    results = await asyncio.gather(
+        flights.do("key", flaky), flights.do("key", flaky), return_exceptions=True
+    )
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+    assert await flights.do("key", flaky) == "ok"
+    assert attempts == 2
+
+
+@pytest.mark.anyio
+async def test_cancelled_caller_does_not_cancel_shared_work():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def compute():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flights.do("key", compute))
+    second = asyncio.create_task(flights.do("key", compute))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
@@ -0,0 +1,45 @@
+import pytest
+
+from app.crud import crud
+from app.utils.text import experience_text_hash, normalize_text
+
+
+def test_normalize_text():
+    assert normalize_text("  Ran a\tMARATHON\n ") == "ran a marathon"
+    # NFD 로 입력된 한글도 NFC 와 같은 텍스트
+    assert normalize_text("\u1112\u1161\u11ab") == normalize_text("\ud55c")
+
+
+def test_text_hash_ignores_formatting_only_differences():
+    assert experience_text_hash("Climbed Everest") == experience_text_hash(
+        " climbed  everest "
+    )
+    assert experience_text_hash("Climbed Everest") != experience_text_hash("Climbed K2")
+
+
+@pytest.mark.anyio
+async def test_lookup_by_text_hash(db, indexes):
+    created = await crud.create_experience(
+        text="Ran a marathon",
+        embedding=[1.0, 0.0],
+        difficulty_score=70.0,
+        difficulty_scores=[70.0] * 10,
+        db=db,
+    )
+
+    found = await crud.get_experience_by_text("ran a  MARATHON", db)
+    assert found.id == created.id
+    assert await crud.get_experience_by_text("ran a half marathon", db) is None
+
+    by_hash = await crud.get_experiences_by_text_hashes(
+        [experience_text_hash("Ran a marathon"), experience_text_hash("other")], db
+    )
+    assert list(by_hash.values()) == [found]
+
+
+@pytest.mark.anyio
+async def test_duplicate_insert_returns_existing_row(db, indexes):
+    first = await crud.create_experience("Ran a marathon", [1.0, 0.0], 70.0, None, db)
+    second = await crud.create_experience("ran a marathon", [1.0, 0.0], 40.0, None, db)
+    assert second.id == first.id
+    assert second.difficulty_score == 70.0